@@ -0,0 +1,310 @@
+"""
+run_benchmarks.py
+
+Scaling benchmarks for the overlay's hot paths. Every benchmark is run at
+each input size from 1e2 up to its own cap (and --max-size), with fixed seeds,
+and the best-of-N wall time is recorded. Results are written as JSON to
+benchmarks/results/, and compared against benchmarks/baseline.json to flag
+regressions. Timings are machine-specific, so no baseline is committed:
+record one on the machine that runs the comparison (a missing baseline is
+an error).
+
+A setup returns the function to time, or a (prepare, run) pair whose
+prepare step (e.g. resetting on-disk state) runs untimed before each repeat.
+
+Usage:
+    python benchmarks/run_benchmarks.py                      # run and compare
+    python benchmarks/run_benchmarks.py --update-baseline    # record a new baseline
+    python benchmarks/run_benchmarks.py --only breath --max-size 1e5
+"""
+
+import argparse
+import csv
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+import numpy as np
+
+from convert_bms_log import convert_bms_log_streaming, convert_json_to_healing_format
+from engine.breath_core import BatchBreathCore, BreathCore
+from engine.memory_log import MemoryLog
+from ev_overlay.analyzer import EfficiencyAccumulator, analyze_battery_pack, evaluate_efficiency
+from ev_overlay.fleet import FleetState, simulate_fleet
+from ev_overlay.healing_parser import parse_healing_columns, parse_healing_report
+from ev_overlay.simulator import simulate_multiple_packs
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+BASELINE_PATH = os.path.join(BENCH_DIR, "baseline.json")
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+SIZES = [10 ** exponent for exponent in range(2, 8)]
+SEED = 1234
+
+
+def _diagnostics(size, rng):
+    return [
+        {
+            "miles_driven": 100,
+            "total_consumed_kWh": 25.0,
+            "capacity_loss_kWh": round(0.37 + 0.01 * rng.random(), 3),
+            "efficiency": round(0.98 + 0.01 * rng.random(), 4),
+            "remaining_capacity_kWh": round(73 + 2 * rng.random(), 2),
+            "cycle_count": round(0.4 + 0.02 * rng.random(), 2),
+        }
+        for _ in range(size)
+    ]
+
+
+def _healing(size, rng):
+    return [
+        {"cell_index": i % 96, "restored_psi": round(rng.random(), 3), "restored_tension": round(rng.random(), 3)}
+        for i in range(size)
+    ]
+
+
+def _write_bms_log(path, size, rng):
+    with open(path, "w") as f:
+        json.dump([
+            {"timestamp": "2025-07-01T08:00:00Z", "cell_id": i % 96,
+             "voltage": round(3.4 + 0.6 * rng.random(), 2), "temperature": round(22 + 15 * rng.random(), 1)}
+            for i in range(size)
+        ], f)
+
+
+def setup_simulate_multiple_packs(size, workdir, rng):
+    packs = [{"capacity_kWh": 75} for _ in range(size)]
+    return lambda: simulate_multiple_packs(packs)
+
+
+def setup_simulate_fleet(size, workdir, rng):
+    fleet = FleetState.uniform(size)
+    generator = np.random.default_rng(SEED)
+    return lambda: simulate_fleet(fleet, 100, generator)
+
+
+def setup_evaluate_efficiency(size, workdir, rng):
+    results = _diagnostics(size, rng)
+    return lambda: evaluate_efficiency(results)
+
+
+def setup_efficiency_accumulator(size, workdir, rng):
+    generator = np.random.default_rng(SEED)
+    columns = {
+        "efficiency": generator.uniform(0.97, 1.0, size),
+        "miles_driven": np.full(size, 100),
+        "capacity_loss_kWh": generator.uniform(0.36, 0.38, size),
+        "remaining_capacity_kWh": generator.uniform(73, 75, size),
+    }
+    return lambda: EfficiencyAccumulator().update_columns(columns).summary()
+
+
+def setup_analyze_battery_pack(size, workdir, rng):
+    healing = _healing(size, rng)
+    return lambda: analyze_battery_pack(healing)
+
+
+def setup_convert(size, workdir, rng):
+    source = os.path.join(workdir, "bms.json")
+    _write_bms_log(source, size, rng)
+    target = os.path.join(workdir, "healing.json")
+    return lambda: _quiet(convert_json_to_healing_format, source, target)
+
+
+def setup_convert_streaming(size, workdir, rng):
+    source = os.path.join(workdir, "bms.json")
+    _write_bms_log(source, size, rng)
+    target = os.path.join(workdir, "healing.json")
+    return lambda: _quiet(convert_bms_log_streaming, source, target)
+
+
+def _write_healing_report(size, workdir, rng):
+    path = os.path.join(workdir, "healing_report.csv")
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=["cell_index", "restored_psi", "restored_tension"])
+        writer.writeheader()
+        writer.writerows(_healing(size, rng))
+    return path
+
+
+def setup_parse_healing_report(size, workdir, rng):
+    path = _write_healing_report(size, workdir, rng)
+    return lambda: parse_healing_report(path)
+
+
+def setup_parse_healing_columns(size, workdir, rng):
+    path = _write_healing_report(size, workdir, rng)
+    return lambda: parse_healing_columns(path)
+
+
+def setup_memory_log(size, workdir, rng):
+    state = {"cell": 0.5}
+    log_dir = os.path.join(workdir, "memory_log")
+    logs = []
+
+    def prepare():
+        # Every repeat logs into a fresh, empty directory
+        shutil.rmtree(log_dir, ignore_errors=True)
+        logs[:] = [MemoryLog(log_dir=log_dir)]
+
+    def run():
+        with logs[0] as log:
+            for i in range(size):
+                log.append(i % 96, state)
+    return prepare, run
+
+
+def setup_breath_cycle(size, workdir, rng):
+    cores = [BreathCore() for _ in range(size)]
+
+    def run():
+        for core in cores:
+            core.cycle()
+    return run
+
+
+def setup_batch_breath_cycle(size, workdir, rng):
+    batch = BatchBreathCore(size)
+    return lambda: batch.cycle()
+
+
+def _quiet(func, *args):
+    stdout = sys.stdout
+    sys.stdout = open(os.devnull, "w")
+    try:
+        return func(*args)
+    finally:
+        sys.stdout.close()
+        sys.stdout = stdout
+
+
+# name -> (setup, largest size worth running by default)
+BENCHMARKS = {
+    "simulate_multiple_packs": (setup_simulate_multiple_packs, 10 ** 6),
+    "simulate_fleet": (setup_simulate_fleet, 10 ** 7),
+    "evaluate_efficiency": (setup_evaluate_efficiency, 10 ** 6),
+    "efficiency_accumulator": (setup_efficiency_accumulator, 10 ** 7),
+    "analyze_battery_pack": (setup_analyze_battery_pack, 10 ** 6),
+    "convert_json_to_healing_format": (setup_convert, 10 ** 6),
+    "convert_bms_log_streaming": (setup_convert_streaming, 10 ** 6),
+    "parse_healing_report": (setup_parse_healing_report, 10 ** 6),
+    "parse_healing_columns": (setup_parse_healing_columns, 10 ** 7),
+    "memory_log.log_cell_state": (setup_memory_log, 10 ** 5),
+    "BreathCore.cycle": (setup_breath_cycle, 10 ** 6),
+    "BatchBreathCore.cycle": (setup_batch_breath_cycle, 10 ** 7),
+}
+
+
+def measure(func, repeats, prepare=None):
+    timings = []
+    for _ in range(repeats):
+        if prepare is not None:
+            prepare()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def run_benchmarks(max_size=10 ** 7, only=None, repeats=3):
+    """
+    Runs every selected benchmark across SIZES.
+
+    Returns:
+        list: One dict per (benchmark, size) with seconds and items_per_s.
+    """
+    results = []
+    for name, (setup, cap) in BENCHMARKS.items():
+        if only and not any(token in name for token in only):
+            continue
+        for size in SIZES:
+            if size > min(cap, max_size):
+                break
+            random.seed(SEED)
+            np.random.seed(SEED)
+            workdir = tempfile.mkdtemp(prefix="axviam_bench_")
+            try:
+                func = setup(size, workdir, random.Random(SEED))
+                prepare, func = func if isinstance(func, tuple) else (None, func)
+                seconds = measure(func, repeats if size < 10 ** 6 else 1, prepare)
+            finally:
+                shutil.rmtree(workdir, ignore_errors=True)
+            results.append({
+                "benchmark": name,
+                "size": size,
+                "seconds": round(seconds, 6),
+                "items_per_s": round(size / seconds, 1) if seconds else None,
+            })
+            print(f"⏱️ {name:<34} n={size:<9} {seconds:10.4f}s  {size / seconds:14.0f} items/s")
+    return results
+
+
+def compare_to_baseline(results, baseline, tolerance, min_seconds=1e-3):
+    """
+    Flags (benchmark, size) pairs slower than baseline by more than `tolerance`.
+    Timings under `min_seconds` in the baseline are too noisy to compare and are skipped.
+    """
+    reference = {(entry["benchmark"], entry["size"]): entry["seconds"] for entry in baseline["results"]}
+    regressions = []
+    for entry in results:
+        base = reference.get((entry["benchmark"], entry["size"]))
+        if base and base >= min_seconds and entry["seconds"] > base * (1 + tolerance):
+            regressions.append(dict(entry, baseline_seconds=base, slowdown=round(entry["seconds"] / base, 2)))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="AXVIAM scaling benchmarks")
+    parser.add_argument("--max-size", type=float, default=1e7)
+    parser.add_argument("--only", nargs="*", help="Run benchmarks whose name contains any of these")
+    parser.add_argument("--repeats", type=int, default=3)
+    parser.add_argument("--tolerance", type=float, default=0.25, help="Allowed slowdown vs baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true")
+    args = parser.parse_args()
+
+    results = run_benchmarks(int(args.max_size), args.only, args.repeats)
+    report = {
+        "timestamp": time.strftime("%Y%m%d-%H%M%S"),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": SEED,
+        "results": results,
+    }
+    os.makedirs(RESULTS_DIR, exist_ok=True)
+    output = os.path.join(RESULTS_DIR, f"benchmarks_{report['timestamp']}.json")
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"📄 Results saved to: {output}")
+
+    if args.update_baseline:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📌 Baseline updated: {BASELINE_PATH}")
+        return 0
+
+    if not os.path.exists(BASELINE_PATH):
+        print(f"❌ No baseline at {BASELINE_PATH}, so nothing was compared. "
+              "Record one on this machine with --update-baseline.")
+        return 2
+    with open(BASELINE_PATH, "r") as f:
+        baseline = json.load(f)
+    if (baseline.get("machine"), baseline.get("python")) != (report["machine"], report["python"]):
+        print(f"⚠️ Baseline was recorded on {baseline.get('machine')} / Python {baseline.get('python')}; "
+              "timings may not be comparable.")
+    regressions = compare_to_baseline(results, baseline, args.tolerance)
+    for entry in regressions:
+        print(f"❌ Regression: {entry['benchmark']} n={entry['size']} "
+              f"{entry['seconds']:.4f}s vs {entry['baseline_seconds']:.4f}s ({entry['slowdown']}x)")
+    if not regressions:
+        print("✅ No regressions against baseline.")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
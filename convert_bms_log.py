@@ -2,7 +2,18 @@ import csv
 import json
 from datetime import datetime
 import os
+import argparse
+import re
 
+import numpy as np
+
+from ev_overlay.instrumentation import instrumented
+
+STREAM_CHUNK_SIZE = 65536
+READ_SIZE = 1 << 20
+_SEPARATORS = re.compile(r"[\s,]*")
+
+@instrumented("conversion", items=len)
 def convert_json_to_healing_format(input_json_path, output_json_path):
     healing_data = []
 
@@ -35,11 +46,144 @@ def convert_json_to_healing_format(input_json_path, output_json_path):
 
     print(f"✅ Converted {len(healing_data)} cells to AXVIAM healing format.")
     print(f"📄 Output saved to: {output_json_path}")
+    return healing_data
+
+def iter_bms_records(input_path, read_size=READ_SIZE):
+    """
+    Yields BMS records one at a time from either a JSON array or NDJSON file,
+    reading the file in fixed-size text blocks so memory stays bounded.
+    """
+    decoder = json.JSONDecoder()
+    with open(input_path, "r") as infile:
+        buffer = infile.read(read_size)
+        stripped = buffer.lstrip()
+        if not stripped.startswith("["):
+            # NDJSON: one record per line
+            infile.seek(0)
+            for line in infile:
+                line = line.strip()
+                if line:
+                    yield json.loads(line)
+            return
+
+        buffer = stripped[1:]
+        pos = 0
+        eof = False
+        while True:
+            pos = _SEPARATORS.match(buffer, pos).end()
+            if len(buffer) - pos < read_size and not eof:
+                block = infile.read(read_size)
+                eof = not block
+                buffer = buffer[pos:] + block
+                pos = _SEPARATORS.match(buffer, 0).end()
+            if buffer.startswith("]", pos) or pos >= len(buffer):
+                return
+            try:
+                record, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                block = infile.read(read_size)
+                eof = not block
+                buffer = buffer[pos:] + block
+                pos = 0
+                continue
+            yield record
+
+
+def _round3(values):
+    # np.round scales by 1000 first, which can tip true sub-half values onto
+    # an exact .5; re-round just those ties with Python's exact round()
+    scaled = values * 1000
+    rounded = np.round(scaled) / 1000
+    ties = np.flatnonzero(scaled - np.floor(scaled) == 0.5)
+    for i in ties.tolist():
+        rounded[i] = round(float(values[i]), 3)
+    return rounded
+
+
+def _convert_chunk(cell_indices, voltages, temperatures):
+    voltages = np.asarray(voltages, dtype=np.float64)
+    temperatures = np.asarray(temperatures, dtype=np.float64)
+    restored_psi = np.clip(_round3((voltages - 2.5) / 1.5), 0.0, 1.0)
+    restored_tension = np.clip(_round3(1.0 - (temperatures - 20) / 40), 0.0, 1.0)
+    return [
+        {"cell_index": cell, "restored_psi": psi, "restored_tension": tension}
+        for cell, psi, tension in zip(cell_indices, restored_psi.tolist(), restored_tension.tolist())
+    ]
+
+
+@instrumented("conversion", items=int)
+def convert_bms_log_streaming(input_path, output_json_path, chunk_size=STREAM_CHUNK_SIZE):
+    """
+    Streaming variant of convert_json_to_healing_format for multi-GB logs.
+
+    Records are read incrementally (JSON array or NDJSON), converted in
+    vectorized chunks of `chunk_size`, and written to the output JSON array
+    as each chunk completes, so memory is bounded by the chunk size.
+
+    Returns:
+        int: Number of converted cells, or None if the input is not valid
+             JSON (the partial output file is removed).
+    """
+    converted = 0
+    first = True
+    cell_indices, voltages, temperatures = [], [], []
+
+    def write_chunk(outfile):
+        nonlocal converted, first
+        for row in _convert_chunk(cell_indices, voltages, temperatures):
+            outfile.write(("\n  " if first else ",\n  ") + json.dumps(row))
+            first = False
+        converted += len(cell_indices)
+        del cell_indices[:], voltages[:], temperatures[:]
+
+    try:
+        with open(output_json_path, "w") as outfile:
+            outfile.write("[")
+            for entry in iter_bms_records(input_path):
+                try:
+                    cell_index = int(entry.get("cell_id", entry.get("cell_index", 0)))
+                    voltage = float(entry["voltage"])
+                    temperature = float(entry["temperature"])
+                except (ValueError, KeyError, TypeError, AttributeError):
+                    continue
+                cell_indices.append(cell_index)
+                voltages.append(voltage)
+                temperatures.append(temperature)
+                if len(cell_indices) >= chunk_size:
+                    write_chunk(outfile)
+            if cell_indices:
+                write_chunk(outfile)
+            outfile.write("\n]\n")
+    except json.JSONDecodeError:
+        # Don't leave a well-formed but truncated output behind
+        os.remove(output_json_path)
+        print(f"❌ Failed to parse input JSON after {converted} cells; no output written.")
+        return None
+
+    print(f"✅ Converted {converted} cells to AXVIAM healing format.")
+    print(f"📄 Output saved to: {output_json_path}")
+    return converted
+
 
 if __name__ == "__main__":
-    input_file = "real_input/sample_bms_log.json"
+    parser = argparse.ArgumentParser(description="Convert a BMS log into AXVIAM healing format.")
+    parser.add_argument("--input", default="real_input/sample_bms_log.json")
+    parser.add_argument("--stream", action="store_true", help="Convert incrementally with bounded memory")
+    parser.add_argument("--chunk-size", type=int, default=STREAM_CHUNK_SIZE)
+    args, _ = parser.parse_known_args()
+
+    input_file = args.input
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     output_file = f"reports/converted_healing_input_{timestamp}.json"
 
     os.makedirs("reports", exist_ok=True)
-    convert_json_to_healing_format(input_file, output_file)
\ No newline at end of file
+    if args.stream:
+        result = convert_bms_log_streaming(input_file, output_file, chunk_size=args.chunk_size)
+    else:
+        result = convert_json_to_healing_format(input_file, output_file)
+
+    if result is not None:
+        from ev_overlay.catalog import register_artifact
+        register_artifact(output_file)
\ No newline at end of file
@@ -1,8 +1,29 @@
 import json
 from ev_overlay.factory_init import initialize_factory_pack
 from ev_overlay.healing_parser import run_healing_diagnostics
-from ev_overlay.simulator import simulate_ev_drive
+from ev_overlay.simulator import generate_output_filename, simulate_ev_drive
 from ev_overlay.analyzer import evaluate_efficiency
+from ev_overlay.catalog import DIAGNOSTICS, HEALING_INPUT, latest_artifact, register_artifact
+
+def run_demo(healing_data, metadata_path="metadata.json", output_file=None):
+    """
+    Simulates the factory demo pack carrying the given healing diagnostics.
+
+    Returns:
+        dict: factory pack, simulation output and efficiency analysis.
+    """
+    factory = initialize_factory_pack("default_pack", metadata_path)
+    simulation_result = simulate_ev_drive([{
+        "pack_id": factory["pack_id"],
+        "healing_data": healing_data,
+        "capacity_kWh": factory["factory_metadata"].get("capacity_kWh", 75),
+        "cycles": 0
+    }], output_prefix="demo_runner_real", output_file=output_file)
+    return {
+        "factory": factory,
+        "simulation": simulation_result,
+        "analysis": evaluate_efficiency(simulation_result)
+    }
 
 def main():
     print("🧪 Running AXVIAM EV Simulation Runner...")
@@ -12,14 +33,10 @@ def main():
     print("🏭 Factory Pack Initialized:", factory)
 
     # Step 2: Run healing diagnostics
-    import glob
-    import os
-
     # Find the latest converted healing input file
-    healing_files = glob.glob("reports/converted_healing_input_*.json")
-    if not healing_files:
+    latest_healing_file = latest_artifact("convert", HEALING_INPUT)
+    if latest_healing_file is None:
         raise FileNotFoundError("No converted healing input files found in reports/")
-    latest_healing_file = max(healing_files, key=os.path.getmtime)
 
     with open(latest_healing_file, "r") as f:
         healing_data = json.load(f)
@@ -29,21 +46,17 @@ def main():
 
     # Step 3: Simulate EV drive
     print("\n🚦 Simulating EV drive with healed pack...")
-    output_prefix = "demo_runner_real"
-    simulation_result = simulate_ev_drive([{
-        "pack_id": factory["pack_id"],
-        "healing_data": healing_data,
-        "capacity_kWh": factory["factory_metadata"].get("capacity_kWh", 75),
-        "cycles": 0
-    }], output_prefix=output_prefix)
+    output_file = generate_output_filename("demo_runner_real")
+    demo = run_demo(healing_data, output_file=output_file)
+    register_artifact(output_file, kind=DIAGNOSTICS, parents=[latest_healing_file])
 
     print("\n🔋 Simulation output:")
-    for result in simulation_result:
+    for result in demo["simulation"]:
         print(result)
 
     # Step 4: Evaluate efficiency
     print("\n📊 Efficiency analysis:")
-    print(evaluate_efficiency(simulation_result))
+    print(demo["analysis"])
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -5,9 +5,11 @@ Encodes symbolic responses to stress signatures in EV battery systems. Rather th
 this module leverages tension and imbalance to improve energy distribution efficiency, optimize cell recovery curves,
 and extend second-life viability via symbolic inference.
 
-Core Method: antifragile_adjustment(trace_signature)
+Core Methods: antifragile_adjustment(trace_signature), antifragile_adjustment_batch(psi, tension, entropy)
 """
 
+import numpy as np
+
 def antifragile_adjustment(trace_signature):
     """
     Uses symbolic tension feedback loops to adaptively reconfigure battery pack parameters,
@@ -38,3 +40,64 @@ def antifragile_adjustment(trace_signature):
             "rebalancing_protocol": "none",
             "resilience_inflection": False
         }
+
+
+PROTOCOLS = ("none", "ψ̃↺")
+
+
+def antifragile_adjustment_batch(psi_variation, tension_variation, entropy_shift=None):
+    """
+    Columnar antifragile_adjustment for many cells at once. Applies the same
+    resilience threshold with masked vectorized math instead of one dict per cell.
+
+    Args:
+        psi_variation (array-like): psi variation per cell (scalars give 0-d results).
+        tension_variation (array-like): tension variation per cell.
+        entropy_shift (array-like): entropy delta per cell; zeros if omitted.
+
+    Returns:
+        dict: "adjustment_gain" (float64 array) and "resilience_inflection" (bool array).
+              The rebalancing protocol is PROTOCOLS[int(resilience_inflection)].
+    """
+    delta_psi = np.asarray(psi_variation, dtype=np.float64)
+    delta_tension = np.asarray(tension_variation, dtype=np.float64)
+    inflection = (delta_psi > 0.12) & (delta_tension > 0.15)
+
+    gain = delta_psi * delta_tension
+    if entropy_shift is not None:
+        gain += 0.1 * np.asarray(entropy_shift, dtype=np.float64)
+    # np.where rather than masked assignment, so 0-d (scalar) inputs work as well
+    gain = np.where(inflection, gain, 0.0)
+
+    return {
+        "adjustment_gain": gain,
+        "resilience_inflection": inflection
+    }
+
+
+def stream_adjustments(signature_batches):
+    """
+    Streaming adapter: turns an iterable of trace-signature column batches
+    (dicts with psi_variation, tension_variation and optional entropy_shift)
+    into a stream of adjustment batches, one per input batch.
+    """
+    for batch in signature_batches:
+        yield antifragile_adjustment_batch(
+            batch["psi_variation"], batch["tension_variation"], batch.get("entropy_shift")
+        )
+
+
+def apply_adjustment(pack_state, adjustment, start=0):
+    """
+    Feeds a batch of adjustments back into columnar pack state (anything with
+    restored_psi / restored_tension arrays, e.g. ev_overlay.fleet.FleetState).
+    Cells with a resilience inflection have both values scaled by
+    (1 + adjustment_gain), capped at 1.0; rows [start, start + batch) are updated.
+    """
+    gain = adjustment["adjustment_gain"]
+    stop = start + gain.shape[0]
+    for values in (pack_state.restored_psi, pack_state.restored_tension):
+        window = values[start:stop]
+        window *= 1.0 + gain
+        np.minimum(window, 1.0, out=window)
+    return pack_state
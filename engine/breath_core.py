@@ -1,5 +1,9 @@
+import functools
+import hashlib
 import math
 
+import numpy as np
+
 class BreathCore:
     def __init__(self, initial_pressure=1.0):
         self.pressure = initial_pressure
@@ -36,6 +40,115 @@ class BreathCore:
         self.exhale(delta)
         return self.restore()
 
+    def fast_forward(self, cycles, delta=0.1, duration=1.0):
+        """
+        Advances the core by `cycles` full cycles in constant time and returns
+        the same snapshot the last cycle() call would have. Matches the
+        iterative path within floating-point tolerance.
+        """
+        _, tension, curvature = _fast_forward_state(
+            self.pressure, self.tension, self.curvature, cycles, delta, duration
+        )
+        self.tension, self.curvature = float(tension), float(curvature)
+        return self.restore()
+
+
+# Phase codes for BatchBreathCore, in cycle order
+INHALATION, HELD, EXHALATION, RESTORATION = range(4)
+PHASE_NAMES = ("inhalation", "held", "exhalation", "restoration")
+
+
+class BatchBreathCore:
+    """
+    Array-backed BreathCore for N packs at once. Pressure, tension and
+    curvature live in contiguous float64 arrays and the phase in a uint8
+    array of phase codes; every step updates the whole batch in place.
+    delta and duration may be scalars or one value per pack.
+    """
+
+    def __init__(self, size, initial_pressure=1.0):
+        self.pressure = np.full(size, initial_pressure, dtype=np.float64)
+        self.tension = np.full(size, 0.5, dtype=np.float64)
+        self.curvature = np.zeros(size, dtype=np.float64)
+        self.phase = np.full(size, INHALATION, dtype=np.uint8)
+        self._scratch = np.empty(size, dtype=np.float64)
+
+    def __len__(self):
+        return self.pressure.shape[0]
+
+    @classmethod
+    def from_cores(cls, cores):
+        """
+        Packs a list of BreathCore objects into one batch.
+        """
+        batch = cls(len(cores))
+        batch.pressure[:] = [core.pressure for core in cores]
+        batch.tension[:] = [core.tension for core in cores]
+        batch.curvature[:] = [core.curvature for core in cores]
+        batch.phase[:] = [PHASE_NAMES.index(core.phase) for core in cores]
+        return batch
+
+    def phase_names(self):
+        return [PHASE_NAMES[code] for code in self.phase.tolist()]
+
+    def inhale(self, delta):
+        self.pressure += delta
+        self.tension += np.multiply(0.05, delta)
+        self.phase.fill(HELD)
+
+    def hold(self, duration):
+        np.multiply(self.tension, np.sin(duration), out=self._scratch)
+        self.curvature += self._scratch
+        self.phase.fill(EXHALATION)
+
+    def exhale(self, delta):
+        self.pressure -= delta
+        self.tension -= np.multiply(0.03, delta)
+        self.phase.fill(RESTORATION)
+
+    def restore(self, snapshot=True):
+        self.phase.fill(INHALATION)
+        if not snapshot:
+            return None
+        return {
+            "restored_pressure": np.round(self.pressure, 3),
+            "restored_tension": np.round(self.tension, 3),
+            "curvature_signature": np.round(self.curvature, 5)
+        }
+
+    def cycle(self, delta=0.1, duration=1.0, snapshot=True):
+        """
+        One inhale/hold/exhale/restore step for every pack. With snapshot=False
+        no rounded output arrays are built, for tight multi-cycle loops.
+        """
+        self.inhale(delta)
+        self.hold(duration)
+        self.exhale(delta)
+        return self.restore(snapshot)
+
+    def fast_forward(self, cycles, delta=0.1, duration=1.0, snapshot=True):
+        """
+        Jumps every pack ahead in constant time; cycles, delta and duration
+        may each be a scalar or one value per pack.
+        """
+        self.pressure, self.tension, self.curvature = _fast_forward_state(
+            self.pressure, self.tension, self.curvature, np.asarray(cycles), delta, duration
+        )
+        return self.restore(snapshot)
+
+
+def _fast_forward_state(pressure, tension, curvature, cycles, delta, duration):
+    # Per cycle, inhale/exhale cancel on pressure, tension drifts by
+    # (0.05 - 0.03) * delta, and hold adds sin(duration) times the post-inhale
+    # tension, so curvature gains an arithmetic series over the k cycles.
+    drift = 0.02 * delta
+    held_sum = cycles * (tension + 0.05 * delta) + drift * cycles * (cycles - 1) / 2
+    return (
+        pressure,
+        tension + drift * cycles,
+        curvature + np.sin(duration) * held_sum
+    )
+
 
 # Factory-level symbolic breath signature generator
 def generate_breath_signature(pack_id, metadata):
@@ -51,5 +164,16 @@ def generate_breath_signature(pack_id, metadata):
     """
     return {
         "pack_id": pack_id,
-        "signature": f"ψₐ:{hash(pack_id) % 10000}-∇̃:{len(metadata)}-Ω"
+        "signature": f"ψₐ:{stable_pack_hash(pack_id) % 10000}-∇̃:{len(metadata)}-Ω"
     }
+
+
+@functools.lru_cache(maxsize=1 << 18)
+def stable_pack_hash(pack_id):
+    """
+    Process-independent 64-bit hash of a pack ID (BLAKE2b), unlike the salted
+    built-in hash(), so signatures can be cached, persisted and compared
+    across runs and worker processes.
+    """
+    digest = hashlib.blake2b(str(pack_id).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big")
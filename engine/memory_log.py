@@ -1,34 +1,257 @@
+"""
+memory_log.py
 
+Append-only resonance trace per cell. Entries are buffered in memory and
+flushed in batches to newline-delimited JSON segments under MEMORY_LOG_DIR.
+Each flush sorts its batch by cell so every cell's entries form one
+contiguous byte range, and records that range (segment, offset, length,
+first/last timestamp) in a small index file. The index is loaded once into
+a per-cell table sorted by time, so get_log bisects to the ranges of the
+requested cell and time window and reads only those.
+
+Entries are buffered until FLUSH_EVERY accumulate. Buffers are flushed by
+close(), on leaving a `with MemoryLog(...)` block, when the log is garbage
+collected, and at interpreter exit; a hard kill loses whatever was still
+buffered (use flush_every=1 when every entry must be durable).
+
+A single-file log from earlier releases (LEGACY_LOG_PATH) is imported into
+the segments the first time the default log is opened, then renamed to
+*.migrated.
+
+Core Methods: log_cell_state(cell_index, state_data), get_log(cell_index, start, end), flush_log()
+"""
+
+import atexit
+import bisect
 import json
 import os
+import weakref
 from datetime import datetime
 
-MEMORY_LOG_PATH = "runtime/memory_log.json"
+MEMORY_LOG_DIR = "runtime/memory_log"
+LEGACY_LOG_PATH = "runtime/memory_log.json"
+INDEX_FILE = "index.ndjson"
+SEGMENT_MAX_BYTES = 64 * 1024 * 1024
+FLUSH_EVERY = 512
+
+
+class MemoryLog:
+    """
+    Segmented append-only log with a buffered batch writer. Buffered entries
+    are written by flush(), close(), leaving a with-block, or at exit.
+
+    Args:
+        log_dir (str): Directory holding the segments and index.
+        flush_every (int): Buffered entries that trigger an automatic flush.
+        segment_max_bytes (int): Size at which a new segment is started.
+        legacy_path (str): Single-file JSON log to import on first use, if present.
+    """
+
+    def __init__(self, log_dir=MEMORY_LOG_DIR, flush_every=FLUSH_EVERY, segment_max_bytes=SEGMENT_MAX_BYTES,
+                 legacy_path=None):
+        self.log_dir = log_dir
+        self.legacy_path = legacy_path
+        self.flush_every = flush_every
+        self.segment_max_bytes = segment_max_bytes
+        self.buffer = []
+        self._index = None
+        _open_logs.add(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self.flush()
+
+    def __del__(self):
+        try:
+            self.flush()
+        except Exception:
+            pass  # interpreter shutdown; the atexit hook normally got here first
+
+    @property
+    def index_path(self):
+        return os.path.join(self.log_dir, INDEX_FILE)
+
+    def append(self, cell_index, state_data, timestamp=None):
+        self.buffer.append({
+            "timestamp": timestamp or datetime.utcnow().isoformat(),
+            "cell_index": cell_index,
+            "state": state_data
+        })
+        if len(self.buffer) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """
+        Writes buffered entries to the active segment, fsyncs it, then appends
+        their index records. Data always lands before the index that points
+        at it, so an interrupted flush can leave unindexed bytes but never a
+        dangling index entry.
+        """
+        if not self.buffer:
+            return
+        os.makedirs(self.log_dir, exist_ok=True)
+        index = self.load_index()
+        batch = sorted(self.buffer, key=lambda entry: entry["cell_index"])
+        self.buffer = []
+
+        segment = self._active_segment()
+        ranges = []
+        with open(os.path.join(self.log_dir, segment), "ab") as f:
+            offset = f.tell()
+            chunks = []
+            start = 0
+            while start < len(batch):
+                cell = batch[start]["cell_index"]
+                stop = start
+                lines = []
+                while stop < len(batch) and batch[stop]["cell_index"] == cell:
+                    lines.append(json.dumps(batch[stop]).encode() + b"\n")
+                    stop += 1
+                data = b"".join(lines)
+                chunks.append(data)
+                timestamps = [entry["timestamp"] for entry in batch[start:stop]]
+                ranges.append({
+                    "segment": segment,
+                    "offset": offset,
+                    "length": len(data),
+                    "cell_index": cell,
+                    "first": min(timestamps),
+                    "last": max(timestamps)
+                })
+                offset += len(data)
+                start = stop
+            f.write(b"".join(chunks))
+            f.flush()
+            os.fsync(f.fileno())
+
+        with open(self.index_path, "a") as f:
+            f.write("".join(json.dumps(entry) + "\n" for entry in ranges))
+            f.flush()
+            os.fsync(f.fileno())
+        for entry_range in ranges:
+            index.add(entry_range)
+
+    def load_index(self):
+        if self._index is None:
+            self._index = _CellIndex()
+            if os.path.exists(self.index_path):
+                with open(self.index_path, "r") as f:
+                    for line in f:
+                        if line.strip():
+                            self._index.add(json.loads(line))
+            if self.legacy_path and os.path.exists(self.legacy_path):
+                self._import_legacy()
+        return self._index
+
+    def _import_legacy(self):
+        # Old entries go through the normal flush path (data, then index);
+        # the legacy file is only renamed once they are durable
+        with open(self.legacy_path, "r") as f:
+            legacy = json.load(f).get("log", [])
+        pending, self.buffer = self.buffer, legacy
+        self.flush()
+        self.buffer = pending
+        os.replace(self.legacy_path, self.legacy_path + ".migrated")
+
+    def read(self, cell_index=None, start=None, end=None):
+        """
+        Returns logged entries, optionally limited to one cell and/or a
+        [start, end] timestamp window (datetimes or ISO strings).
+        """
+        self.flush()
+        start = start.isoformat() if isinstance(start, datetime) else start
+        end = end.isoformat() if isinstance(end, datetime) else end
+
+        entries = []
+        for _, _, segment, offset, length in self.load_index().ranges(cell_index, start, end):
+            with open(os.path.join(self.log_dir, segment), "rb") as f:
+                f.seek(offset)
+                data = f.read(length)
+            for line in data.splitlines():
+                entry = json.loads(line)
+                if start is not None and entry["timestamp"] < start:
+                    continue
+                if end is not None and entry["timestamp"] > end:
+                    continue
+                entries.append(entry)
+        entries.sort(key=lambda entry: entry["timestamp"])
+        return entries
+
+    def _active_segment(self):
+        segments = sorted(name for name in os.listdir(self.log_dir) if name.startswith("segment_"))
+        if not segments:
+            return "segment_00000.ndjson"
+        latest = segments[-1]
+        if os.path.getsize(os.path.join(self.log_dir, latest)) < self.segment_max_bytes:
+            return latest
+        return f"segment_{int(latest[8:13]) + 1:05d}.ndjson"
+
+
+class _CellIndex:
+    """
+    In-memory index: cell_index -> (first, last, segment, offset, length)
+    ranges sorted by first timestamp, with a running maximum of `last` so a
+    time window is found by bisection on both ends.
+    """
+
+    def __init__(self):
+        self.cells = {}
+
+    def add(self, entry_range):
+        ranges, firsts, max_lasts = self.cells.setdefault(entry_range["cell_index"], ([], [], []))
+        item = (entry_range["first"], entry_range["last"], entry_range["segment"],
+                entry_range["offset"], entry_range["length"])
+        if not firsts or item[0] >= firsts[-1]:
+            ranges.append(item)
+            firsts.append(item[0])
+            max_lasts.append(max(item[1], max_lasts[-1]) if max_lasts else item[1])
+            return
+        # Out-of-order timestamps (caller-supplied): insert and rebuild this cell's running maximum
+        bisect.insort(ranges, item)
+        firsts[:] = [r[0] for r in ranges]
+        max_lasts[:] = []
+        for r in ranges:
+            max_lasts.append(max(r[1], max_lasts[-1]) if max_lasts else r[1])
+
+    def ranges(self, cell_index=None, start=None, end=None):
+        """
+        Ranges of one cell (all cells if None) that may hold entries in [start, end].
+        """
+        cells = self.cells.values() if cell_index is None else [self.cells.get(cell_index, ([], [], []))]
+        for ranges, firsts, max_lasts in cells:
+            # Ranges before `low` all end before start; ranges from `high` on all begin after end
+            low = bisect.bisect_left(max_lasts, start) if start is not None else 0
+            high = bisect.bisect_right(firsts, end) if end is not None else len(ranges)
+            for item in ranges[low:high]:
+                if start is None or item[1] >= start:
+                    yield item
+
+
+_open_logs = weakref.WeakSet()
+
+
+@atexit.register
+def _flush_open_logs():
+    for log in list(_open_logs):
+        log.flush()
+
+
+_default_log = MemoryLog(legacy_path=LEGACY_LOG_PATH)
+
 
 def initialize_log():
-    if not os.path.exists(MEMORY_LOG_PATH):
-        with open(MEMORY_LOG_PATH, "w") as f:
-            json.dump({"log": []}, f)
+    os.makedirs(_default_log.log_dir, exist_ok=True)
 
 def log_cell_state(cell_index, state_data):
-    initialize_log()
-    with open(MEMORY_LOG_PATH, "r") as f:
-        log = json.load(f)
-
-    timestamped_entry = {
-        "timestamp": datetime.utcnow().isoformat(),
-        "cell_index": cell_index,
-        "state": state_data
-    }
-
-    log["log"].append(timestamped_entry)
-
-    with open(MEMORY_LOG_PATH, "w") as f:
-        json.dump(log, f, indent=2)
-
-def get_log():
-    if not os.path.exists(MEMORY_LOG_PATH):
-        return []
-    with open(MEMORY_LOG_PATH, "r") as f:
-        log = json.load(f)
-    return log["log"]
+    _default_log.append(cell_index, state_data)
+
+def flush_log():
+    _default_log.flush()
+
+def get_log(cell_index=None, start=None, end=None):
+    return _default_log.read(cell_index, start, end)
@@ -0,0 +1,210 @@
+"""
+trace_signature.py
+
+Incremental extraction of the trace_signature consumed by
+antifragility.antifragile_adjustment. Each cell keeps a fixed-size ring buffer
+of its most recent psi/tension readings (derived from BMS voltage and
+temperature) plus sliding mean/M2 accumulators, so every new sample updates the
+signature in O(1) and memory per cell is bounded by the window length.
+
+Signature fields per cell:
+    psi_variation      standard deviation of psi over the window
+    tension_variation  standard deviation of tension over the window
+    entropy_shift      net tension drift across the window (newest - oldest)
+
+Core Methods: TraceSignatureTracker(num_cells, window), update(cell, voltage, temperature), signatures()
+"""
+
+import numpy as np
+
+DEFAULT_WINDOW = 32
+
+
+def voltage_to_psi(voltage):
+    # Same mapping convert_bms_log uses for restored_psi, without rounding
+    return np.clip((np.asarray(voltage, dtype=np.float64) - 2.5) / 1.5, 0.0, 1.0)
+
+
+def temperature_to_tension(temperature):
+    # Same mapping convert_bms_log uses for restored_tension, without rounding
+    return np.clip(1.0 - (np.asarray(temperature, dtype=np.float64) - 20) / 40, 0.0, 1.0)
+
+
+class TraceSignatureTracker:
+    """
+    Sliding-window trace signatures for many cells.
+
+    Args:
+        num_cells (int): Initial number of cell slots; grows on demand.
+        window (int): Samples kept per cell.
+    """
+
+    def __init__(self, num_cells=96, window=DEFAULT_WINDOW):
+        self.window = window
+        self.psi = _Channel(num_cells, window)
+        self.tension = _Channel(num_cells, window)
+        self.count = np.zeros(num_cells, dtype=np.int64)
+        self.head = np.zeros(num_cells, dtype=np.int64)
+        self.drift = np.zeros(num_cells, dtype=np.float64)
+
+    @property
+    def num_cells(self):
+        return self.count.shape[0]
+
+    def update(self, cell_index, voltage, temperature):
+        """
+        Adds one BMS sample for one cell in O(1).
+        """
+        self.update_batch([cell_index], [voltage], [temperature])
+
+    def update_batch(self, cell_indices, voltages, temperatures):
+        """
+        Adds many samples at once. Samples for the same cell are applied in
+        their given order. Cells with at least `window` samples in the batch
+        have their windows rebuilt from their last `window` samples; the rest
+        advance in at most window - 1 vectorized steps.
+        """
+        cells = np.asarray(cell_indices, dtype=np.int64)
+        if cells.size == 0:
+            return
+        self._ensure_capacity(int(cells.max()) + 1)
+        psi = voltage_to_psi(voltages)
+        tension = temperature_to_tension(temperatures)
+
+        # Group samples by cell once (stable, so each cell keeps its given order)
+        order = np.argsort(cells, kind="stable")
+        sorted_cells = cells[order]
+        group_start = np.r_[0, np.flatnonzero(np.diff(sorted_cells)) + 1]
+        group_size = np.diff(np.r_[group_start, cells.size])
+
+        # Cells with a full window's worth of samples: only their last `window`
+        # samples survive, so their windows are rebuilt directly
+        deep = group_size >= self.window
+        if deep.any():
+            self._replace_windows(
+                sorted_cells[group_start[deep]], group_size[deep],
+                order[(group_start[deep] + group_size[deep] - self.window)[:, None] + np.arange(self.window)],
+                psi, tension
+            )
+
+        # The rest have fewer than `window` samples each: one vectorized step per
+        # rank, taken as contiguous slices of a single sort by rank
+        shallow = np.repeat(~deep, group_size)
+        if not shallow.any():
+            return
+        rank = np.arange(cells.size) - np.repeat(group_start, group_size)
+        samples, rank = order[shallow], rank[shallow]
+        by_rank = np.argsort(rank, kind="stable")
+        samples, rank = samples[by_rank], rank[by_rank]
+        bounds = np.r_[0, np.flatnonzero(np.diff(rank)) + 1, rank.size]
+        for start, stop in zip(bounds[:-1], bounds[1:]):
+            selected = samples[start:stop]
+            self._step(cells[selected], psi[selected], tension[selected])
+
+    def update_records(self, records):
+        """
+        Feeds BMS log records (dicts with cell_id/cell_index, voltage, temperature).
+        """
+        cells, voltages, temperatures = [], [], []
+        for entry in records:
+            try:
+                cells.append(int(entry.get("cell_id", entry.get("cell_index", 0))))
+                voltages.append(float(entry["voltage"]))
+                temperatures.append(float(entry["temperature"]))
+            except (ValueError, KeyError, TypeError):
+                continue
+        self.update_batch(cells, voltages, temperatures)
+
+    def _step(self, cells, psi, tension):
+        # cells are distinct within a step
+        slot = self.head[cells]
+        full = self.count[cells] >= self.window
+        self.psi.push(cells, slot, psi, self.count[cells], full)
+        oldest_slot = np.where(full, (slot + 1) % self.window, 0)
+        self.tension.push(cells, slot, tension, self.count[cells], full)
+        self.drift[cells] = tension - self.tension.buffer[cells, oldest_slot]
+        self.head[cells] = (slot + 1) % self.window
+        self.count[cells] = np.minimum(self.count[cells] + 1, self.window)
+
+    def _replace_windows(self, cells, group_size, samples, psi, tension):
+        # samples: (len(cells), window) indices of each cell's last `window` samples, oldest first
+        first_rank = group_size - self.window
+        slots = (self.head[cells, None] + first_rank[:, None] + np.arange(self.window)) % self.window
+        self.psi.replace(cells, slots, psi[samples])
+        self.tension.replace(cells, slots, tension[samples])
+        self.head[cells] = (self.head[cells] + group_size) % self.window
+        self.count[cells] = self.window
+        # newest sample minus the oldest one left in the window
+        self.drift[cells] = tension[samples[:, -1]] - self.tension.buffer[cells, self.head[cells]]
+
+    def _ensure_capacity(self, size):
+        if size <= self.num_cells:
+            return
+        size = max(size, 2 * self.num_cells)
+        extra = size - self.num_cells
+        self.count = np.concatenate([self.count, np.zeros(extra, dtype=np.int64)])
+        self.head = np.concatenate([self.head, np.zeros(extra, dtype=np.int64)])
+        self.drift = np.concatenate([self.drift, np.zeros(extra)])
+        self.psi.grow(extra)
+        self.tension.grow(extra)
+
+    def signature(self, cell_index):
+        """
+        Returns one cell's trace_signature dict, as antifragile_adjustment expects.
+        """
+        columns = self.signatures(np.array([cell_index]))
+        return {name: float(values[0]) for name, values in columns.items() if name != "cell_index"}
+
+    def signatures(self, cells=None):
+        """
+        Returns trace signatures as columns (ready for antifragile_adjustment_batch).
+
+        Args:
+            cells (array-like): Cells to include; all cells with samples if omitted.
+        """
+        if cells is None:
+            cells = np.flatnonzero(self.count)
+        cells = np.asarray(cells, dtype=np.int64)
+        count = np.maximum(self.count[cells], 1)
+        return {
+            "cell_index": cells,
+            "psi_variation": np.sqrt(np.maximum(self.psi.m2[cells], 0.0) / count),
+            "tension_variation": np.sqrt(np.maximum(self.tension.m2[cells], 0.0) / count),
+            "entropy_shift": self.drift[cells],
+        }
+
+
+class _Channel:
+    # Ring buffer plus sliding mean/M2 for one measured quantity
+
+    def __init__(self, num_cells, window):
+        self.buffer = np.zeros((num_cells, window), dtype=np.float64)
+        self.mean = np.zeros(num_cells, dtype=np.float64)
+        self.m2 = np.zeros(num_cells, dtype=np.float64)
+
+    def push(self, cells, slot, values, count, full):
+        window = self.buffer.shape[1]
+        old = self.buffer[cells, slot]
+        mean = self.mean[cells]
+        # Welford insert while the window fills, sliding replace once it is full
+        n = np.where(full, window, count + 1)
+        outgoing = np.where(full, old, mean)
+        new_mean = mean + (values - outgoing) / n
+        self.m2[cells] += np.where(
+            full,
+            (values - old) * (values - new_mean + old - mean),
+            (values - mean) * (values - new_mean),
+        )
+        self.mean[cells] = new_mean
+        self.buffer[cells, slot] = values
+
+    def replace(self, cells, slots, values):
+        # Overwrites whole windows and recomputes their mean/M2 from scratch
+        self.buffer[cells[:, None], slots] = values
+        self.mean[cells] = values.mean(axis=1)
+        self.m2[cells] = ((values - self.mean[cells, None]) ** 2).sum(axis=1)
+
+    def grow(self, extra):
+        self.buffer = np.vstack([self.buffer, np.zeros((extra, self.buffer.shape[1]))])
+        self.mean = np.concatenate([self.mean, np.zeros(extra)])
+        self.m2 = np.concatenate([self.m2, np.zeros(extra)])
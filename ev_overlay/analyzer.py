@@ -1,5 +1,21 @@
+import math
+import re
 import statistics
 
+import numpy as np
+
+from ev_overlay.instrumentation import count_rows, instrumented
+
+# Window units accepted by analyze_cells, in seconds (matched case-insensitively)
+WINDOW_UNITS = {
+    "w": 604800, "week": 604800, "weeks": 604800,
+    "d": 86400, "day": 86400, "days": 86400,
+    "h": 3600, "hr": 3600, "hour": 3600, "hours": 3600,
+    "m": 60, "min": 60, "mins": 60, "minute": 60, "minutes": 60,
+    "s": 1, "sec": 1, "secs": 1, "second": 1, "seconds": 1,
+}
+_WINDOW_PART = re.compile(r"\s*(\d+(?:\.\d*)?)?\s*([A-Za-z]+)")
+
 def analyze_battery_pack(healing_data):
     """
     Analyze EV battery pack healing data and return key diagnostics.
@@ -30,6 +46,7 @@ def analyze_battery_pack(healing_data):
         "overall_health_score": health_score
     }
 
+@instrumented("analysis", items=count_rows, from_input=True)
 def evaluate_efficiency(simulation_results):
     """
     Analyze simulation results from EV drive to assess battery efficiency.
@@ -60,3 +77,398 @@ def evaluate_efficiency(simulation_results):
         "total_capacity_loss_kWh": round(total_kwh_lost, 3),
         "average_remaining_capacity_kWh": round(statistics.mean(remaining_capacities), 3) if remaining_capacities else None
     }
+
+
+class QuantileSketch:
+    """
+    Mergeable relative-error quantile sketch (log-bucketed histogram).
+    Any quantile is returned within `relative_accuracy` of the true value,
+    and sketches from different shards merge by adding bucket counts.
+    """
+
+    def __init__(self, relative_accuracy=0.001):
+        self.relative_accuracy = relative_accuracy
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.positive = {}
+        self.negative = {}
+        self.zero_count = 0
+        self.count = 0
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        self.count += values.size
+        self.zero_count += int(np.count_nonzero(values == 0))
+        for store, part in ((self.positive, values[values > 0]), (self.negative, -values[values < 0])):
+            if part.size:
+                keys, counts = np.unique(np.ceil(np.log(part) / self._log_gamma).astype(np.int64), return_counts=True)
+                for key, count in zip(keys.tolist(), counts.tolist()):
+                    store[key] = store.get(key, 0) + count
+
+    def merge(self, other):
+        for store, other_store in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_store.items():
+                store[key] = store.get(key, 0) + count
+        self.zero_count += other.zero_count
+        self.count += other.count
+        return self
+
+    def quantile(self, q):
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return -self._bucket_value(key)
+        seen += self.zero_count
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return self._bucket_value(key)
+        return self._bucket_value(max(self.positive)) if self.positive else 0.0
+
+    def _bucket_value(self, key):
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+
+class RunningStats:
+    """
+    Single-pass count/mean/variance/min/max with a quantile sketch.
+    Batches are folded in with Chan's parallel update, so partial stats
+    from different shards or files merge exactly.
+    """
+
+    def __init__(self, relative_accuracy=0.001):
+        self.count = 0
+        self.mean = 0.0
+        self.m2 = 0.0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, values):
+        values = np.asarray(values, dtype=np.float64).ravel()
+        values = values[~np.isnan(values)]
+        if not values.size:
+            return self
+        batch_mean = float(values.mean())
+        batch_m2 = float(((values - batch_mean) ** 2).sum())
+        self._combine(values.size, batch_mean, batch_m2)
+        self.total += float(values.sum())
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add(values)
+        return self
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2)
+            self.total += other.total
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self.sketch.merge(other.sketch)
+        return self
+
+    def _combine(self, count, mean, m2):
+        combined = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / combined
+        self.m2 += m2 + delta * delta * self.count * count / combined
+        self.count = combined
+
+    @property
+    def variance(self):
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    def quantile(self, q):
+        if not self.count:
+            return None
+        return min(max(self.sketch.quantile(q), self.min), self.max)
+
+    def summary(self, digits=3):
+        if not self.count:
+            return None
+        return {
+            "count": self.count,
+            "mean": round(self.mean, digits),
+            "std": round(math.sqrt(self.variance), digits + 2),
+            "min": round(self.min, digits),
+            "max": round(self.max, digits),
+            "p50": round(self.quantile(0.5), digits),
+            "p95": round(self.quantile(0.95), digits),
+            "p99": round(self.quantile(0.99), digits),
+        }
+
+
+class EfficiencyAccumulator:
+    """
+    Streaming, mergeable counterpart of evaluate_efficiency. Feed it
+    diagnostic dicts (update) or column batches from the fleet engine
+    (update_columns); summary() returns evaluate_efficiency's keys plus
+    distribution stats.
+    """
+
+    def __init__(self, relative_accuracy=0.001):
+        self.efficiency = RunningStats(relative_accuracy)
+        self.remaining_capacity = RunningStats(relative_accuracy)
+        self.total_miles = 0
+        self.total_kwh_lost = 0.0
+
+    def update(self, results):
+        results = results if isinstance(results, list) else [results]
+        self.update_columns({
+            "efficiency": [r["efficiency"] for r in results if r.get("efficiency") is not None],
+            "miles_driven": [r.get("miles_driven", 0) for r in results],
+            "capacity_loss_kWh": [r.get("capacity_loss_kWh", 0) for r in results],
+            "remaining_capacity_kWh": [r["remaining_capacity_kWh"] for r in results if "remaining_capacity_kWh" in r],
+        })
+        return self
+
+    def update_columns(self, columns):
+        if "efficiency" in columns:
+            self.efficiency.add(columns["efficiency"])
+        if "remaining_capacity_kWh" in columns:
+            self.remaining_capacity.add(columns["remaining_capacity_kWh"])
+        if "miles_driven" in columns:
+            self.total_miles += np.asarray(columns["miles_driven"]).sum().item()
+        if "capacity_loss_kWh" in columns:
+            self.total_kwh_lost += float(np.sum(columns["capacity_loss_kWh"]))
+        return self
+
+    def merge(self, other):
+        self.efficiency.merge(other.efficiency)
+        self.remaining_capacity.merge(other.remaining_capacity)
+        self.total_miles += other.total_miles
+        self.total_kwh_lost += other.total_kwh_lost
+        return self
+
+    def summary(self):
+        if not self.efficiency.count:
+            return {"error": "No valid efficiency data found"}
+        remaining = self.remaining_capacity.summary()
+        return {
+            "average_efficiency": round(self.efficiency.mean, 3),
+            "total_miles_driven": self.total_miles,
+            "total_capacity_loss_kWh": round(self.total_kwh_lost, 3),
+            "average_remaining_capacity_kWh": remaining["mean"] if remaining else None,
+            "efficiency_stats": self.efficiency.summary(4),
+            "remaining_capacity_stats": remaining,
+        }
+
+
+class HealingAccumulator:
+    """
+    Streaming, mergeable counterpart of analyze_battery_pack.
+    """
+
+    def __init__(self, relative_accuracy=0.001):
+        self.psi = RunningStats(relative_accuracy)
+        self.tension = RunningStats(relative_accuracy)
+
+    def update(self, healing_data):
+        healing_data = healing_data if isinstance(healing_data, list) else [healing_data]
+        valid = [
+            (entry["restored_psi"], entry["restored_tension"])
+            for entry in healing_data
+            if entry.get("restored_psi") is not None and entry.get("restored_tension") is not None
+        ]
+        if valid:
+            psi, tension = zip(*valid)
+            self.psi.add(psi)
+            self.tension.add(tension)
+        return self
+
+    def update_columns(self, columns):
+        self.psi.add(columns["restored_psi"])
+        self.tension.add(columns["restored_tension"])
+        return self
+
+    def merge(self, other):
+        self.psi.merge(other.psi)
+        self.tension.merge(other.tension)
+        return self
+
+    def summary(self):
+        if not self.psi.count:
+            return {"error": "No valid healing data found"}
+        psi_gain = round(self.psi.mean, 3)
+        tension_gain = round(self.tension.mean, 3)
+        return {
+            "average_restored_psi": psi_gain,
+            "average_restored_tension": tension_gain,
+            "overall_health_score": round((psi_gain + tension_gain) / 2, 3),
+            "restored_psi_stats": self.psi.summary(),
+            "restored_tension_stats": self.tension.summary(),
+        }
+
+
+def evaluate_efficiency_stream(batches, accumulator=None):
+    """
+    Consumes an iterable of diagnostic batches (lists of dicts or column dicts,
+    e.g. straight from ev_overlay.lifetime.iter_lifetime) in a single pass.
+
+    Returns:
+        EfficiencyAccumulator: Call .summary() for the result, or .merge() with other shards.
+    """
+    accumulator = accumulator or EfficiencyAccumulator()
+    for batch in batches:
+        if isinstance(batch, tuple):
+            batch = batch[1]
+        if isinstance(batch, dict) and "efficiency" in batch and not np.isscalar(batch["efficiency"]):
+            accumulator.update_columns(batch)
+        else:
+            accumulator.update(batch)
+    return accumulator
+
+
+def _healing_columns(healing_data):
+    if isinstance(healing_data, dict):
+        return {name: np.asarray(values) for name, values in healing_data.items()}
+    valid = [
+        entry for entry in healing_data
+        if entry.get("restored_psi") is not None and entry.get("restored_tension") is not None
+    ]
+    columns = {
+        "cell_index": np.array([entry.get("cell_index", 0) for entry in valid], dtype=np.int64),
+        "restored_psi": np.array([entry["restored_psi"] for entry in valid], dtype=np.float64),
+        "restored_tension": np.array([entry["restored_tension"] for entry in valid], dtype=np.float64),
+    }
+    for optional in ("pack_id", "timestamp"):
+        if valid and all(optional in entry for entry in valid):
+            columns[optional] = np.array([entry[optional] for entry in valid])
+    return columns
+
+
+def window_seconds(window):
+    """
+    Parses a time window such as "1D", "6h", "15min" or "1h30min" into whole
+    seconds. A lone unit ("D") counts as one of it.
+
+    Raises:
+        ValueError: For unknown units, a component without a unit ("1h30"),
+            "M" (minute or month?) or a width that is not a positive whole
+            number of seconds.
+    """
+    parts = []
+    pos = 0
+    text = str(window).strip()
+    while pos < len(text):
+        match = _WINDOW_PART.match(text, pos)
+        if match is None:
+            raise ValueError(f"Cannot parse time window {window!r}: expected e.g. '1D', '6h', '15min' or '1h30min'")
+        parts.append(match.groups())
+        pos = match.end()
+    if not parts or (len(parts) > 1 and any(count is None for count, _ in parts)):
+        raise ValueError(f"Cannot parse time window {window!r}: every component needs a count and a unit")
+
+    seconds = 0.0
+    for count, unit in parts:
+        if unit == "M":
+            raise ValueError(f"Ambiguous unit 'M' in time window {window!r}: use 'min' for minutes")
+        if unit.lower() not in WINDOW_UNITS:
+            raise ValueError(
+                f"Unknown unit {unit!r} in time window {window!r}; known units: {', '.join(WINDOW_UNITS)}"
+            )
+        seconds += float(count or 1) * WINDOW_UNITS[unit.lower()]
+    if seconds <= 0 or seconds != int(seconds):
+        raise ValueError(f"Time window {window!r} must be a positive whole number of seconds")
+    return int(seconds)
+
+
+@instrumented("analysis", items=count_rows, from_input=True)
+def analyze_cells(healing_data, window=None, as_columns=False):
+    """
+    Per-cell (and optionally per-pack, per-time-window) healing statistics in one pass.
+
+    Rows are sorted once by (pack_id, cell_index, window) and every statistic
+    is a segment reduction over the sorted arrays, so the cost is one sort
+    plus a few vectorized passes regardless of the number of groups.
+
+    Args:
+        healing_data (list or dict): Healing records, or columns with cell_index,
+            restored_psi, restored_tension and optional pack_id / timestamp.
+        window (str): Optional time bucket, e.g. "1D", "6h", "15min" or
+            "1h30min" (see window_seconds); requires a timestamp field.
+        as_columns (bool): Return a dict of arrays instead of a list of dicts.
+
+    Returns:
+        list or dict: One entry per group with reading count and psi/tension
+        mean, std, min and max plus a health score.
+
+    Raises:
+        ValueError: If `window` cannot be parsed.
+    """
+    width = window_seconds(window) if window is not None else None
+    columns = _healing_columns(healing_data)
+    size = columns["restored_psi"].shape[0] if "restored_psi" in columns else 0
+    if size == 0:
+        return {"error": "No valid healing data found"}
+
+    keys = {"cell_index": columns["cell_index"].astype(np.int64)}
+    sort_keys = [keys["cell_index"]]
+    if "pack_id" in columns:
+        packs, pack_codes = np.unique(columns["pack_id"], return_inverse=True)
+        sort_keys.append(pack_codes)
+    if window is not None:
+        if "timestamp" not in columns:
+            return {"error": "Time windows require a timestamp field"}
+        timestamps = columns["timestamp"]
+        if timestamps.dtype.kind in "UO":
+            timestamps = np.char.rstrip(timestamps.astype(str), "Z")
+        timestamps = timestamps.astype("datetime64[s]")
+        buckets = timestamps.astype(np.int64) // width
+        sort_keys.insert(0, buckets)
+
+    # Pack the group keys into one int64 when they fit, so a single argsort
+    # replaces a multi-key lexsort (np.lexsort sorts by the last key first)
+    offsets = [key - key.min() for key in sort_keys]
+    spans = [int(offset.max()) + 1 for offset in offsets]
+    if math.prod(spans) < 2 ** 62:
+        composite = np.zeros(size, dtype=np.int64)
+        for offset, span in zip(reversed(offsets), reversed(spans)):
+            composite = composite * span + offset
+        order = np.argsort(composite)
+        composite = composite[order]
+        change = np.empty(size, dtype=bool)
+        change[0] = True
+        np.not_equal(composite[1:], composite[:-1], out=change[1:])
+    else:
+        order = np.lexsort(sort_keys)
+        change = np.zeros(size, dtype=bool)
+        change[0] = True
+        for key in sort_keys:
+            sorted_key = key[order]
+            change[1:] |= sorted_key[1:] != sorted_key[:-1]
+    sorted_keys = [key[order] for key in sort_keys]
+    starts = np.flatnonzero(change)
+    group_ids = np.cumsum(change) - 1
+    counts = np.diff(np.append(starts, size))
+
+    result = {"cell_index": sorted_keys[0 if window is None else 1][starts]}
+    if "pack_id" in columns:
+        result["pack_id"] = packs[sorted_keys[-1][starts]]
+    if window is not None:
+        result["window_start"] = (sorted_keys[0][starts] * width).astype("datetime64[s]")
+    result["readings"] = counts
+
+    for name, label in (("restored_psi", "psi"), ("restored_tension", "tension")):
+        values = columns[name].astype(np.float64)[order]
+        means = np.add.reduceat(values, starts) / counts
+        squared = np.add.reduceat((values - means[group_ids]) ** 2, starts)
+        result[f"mean_{label}"] = np.round(means, 4)
+        result[f"std_{label}"] = np.round(np.sqrt(squared / np.maximum(counts - 1, 1)), 5)
+        result[f"min_{label}"] = np.minimum.reduceat(values, starts)
+        result[f"max_{label}"] = np.maximum.reduceat(values, starts)
+    result["health_score"] = np.round((result["mean_psi"] + result["mean_tension"]) / 2, 4)
+
+    if as_columns:
+        return result
+    names = list(result.keys())
+    rows = zip(*(result[name].tolist() for name in names))
+    return [dict(zip(names, row)) for row in rows]
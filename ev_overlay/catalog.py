@@ -0,0 +1,285 @@
+"""
+catalog.py
+
+Run catalog: a small SQLite index of every artifact the runners produce
+(converted inputs, diagnostics, plots, reports) with its runner prefix, run
+timestamp, content hash and lineage (which artifacts it was derived from).
+"Latest artifact of kind K for runner R" is a single indexed lookup instead
+of globbing reports/ and stat-ing every historical file, and every consumer
+agrees on what "latest" means: the most recently registered artifact.
+
+A catalog that is opened for the first time is backfilled once from the
+timestamped filenames already in reports/.
+
+Core Methods: RunCatalog(path), register(path, runner, kind, parents), latest(runner, kind), lineage(path)
+"""
+
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from ev_overlay.pipeline import hash_file
+
+CATALOG_PATH = "reports/run_catalog.sqlite"
+
+BMS_LOG = "bms_log"
+HEALING_INPUT = "healing_input"
+DIAGNOSTICS = "diagnostics"
+PLOT = "plot"
+REPORT = "report"
+
+_ARTIFACT_NAME = re.compile(
+    r"^(?:(?P<runner>.+?)_simulated_pack_diagnostics_(?P<run_id>\d{8}-\d{6})(?:_(?P<metric>[a-z_]+))?"
+    r"|converted_healing_input_(?P<input_run_id>\d{8}-\d{6}))"
+    r"(?P<extension>\.csv|\.npcols|\.parquet|\.png|\.json)$"
+)
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    runner TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    run_id TEXT,
+    content_hash TEXT,
+    created_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_latest ON artifacts (runner, kind, created_at DESC, id DESC);
+CREATE INDEX IF NOT EXISTS artifacts_recent ON artifacts (kind, created_at DESC, id DESC);
+CREATE TABLE IF NOT EXISTS lineage (
+    child_id INTEGER NOT NULL,
+    parent_id INTEGER NOT NULL,
+    PRIMARY KEY (child_id, parent_id)
+);
+"""
+
+
+def parse_artifact_name(path):
+    """
+    Recovers (runner, kind, run_id) from a timestamped output filename, or
+    None for files that don't follow the naming scheme (e.g. *_latest copies).
+    Plots get kind "plot_<metric>".
+    """
+    match = _ARTIFACT_NAME.match(os.path.basename(path))
+    if not match:
+        return None
+    if match.group("input_run_id"):
+        return "convert", HEALING_INPUT, match.group("input_run_id")
+    if match.group("extension") == ".png":
+        return match.group("runner"), f"{PLOT}_{match.group('metric')}", match.group("run_id")
+    if match.group("metric") or match.group("extension") == ".json":
+        return None
+    return match.group("runner"), DIAGNOSTICS, match.group("run_id")
+
+
+class RunCatalog:
+    """
+    SQLite-backed artifact index. Safe to share between the pipeline's
+    threads; separate processes open their own connection.
+
+    Args:
+        path (str): Catalog database file.
+        backfill_dir (str): Directory scanned once when the catalog is new
+            (default: the directory holding the catalog).
+    """
+
+    def __init__(self, path=CATALOG_PATH, backfill_dir=None):
+        self.path = path
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        is_new = not os.path.exists(path)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.executescript(_SCHEMA)
+        if is_new:
+            self.backfill(backfill_dir or os.path.dirname(path) or ".")
+
+    def close(self):
+        self._conn.close()
+
+    def register(self, path, runner, kind, run_id=None, parents=(), content_hash=None, created_at=None):
+        """
+        Records (or refreshes) one artifact and links it to the artifacts it
+        was derived from. Re-registering a path keeps its existing lineage.
+
+        Returns:
+            int: Artifact id.
+        """
+        path = os.path.normpath(path)
+        if content_hash is None and os.path.exists(path):
+            content_hash = hash_file(path)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO artifacts (path, runner, kind, run_id, content_hash, created_at) VALUES (?, ?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET runner=excluded.runner, kind=excluded.kind, "
+                "run_id=COALESCE(excluded.run_id, run_id), content_hash=excluded.content_hash, "
+                "created_at=excluded.created_at",
+                (path, runner, kind, run_id, content_hash, created_at or time.time())
+            )
+            child_id = self._conn.execute("SELECT id FROM artifacts WHERE path = ?", (path,)).fetchone()[0]
+            for parent in parents:
+                row = self._conn.execute("SELECT id FROM artifacts WHERE path = ?", (os.path.normpath(parent),)).fetchone()
+                if row:
+                    self._conn.execute("INSERT OR IGNORE INTO lineage VALUES (?, ?)", (child_id, row[0]))
+        return child_id
+
+    def latest(self, runner, kind, default=None):
+        """
+        Path of the most recently registered artifact of `kind` for `runner`
+        that still exists on disk. Entries for deleted files are dropped.
+        """
+        return self._first_existing(
+            "SELECT path FROM artifacts WHERE runner = ? AND kind = ? ORDER BY created_at DESC, id DESC",
+            (runner, kind), default
+        )
+
+    def latest_record(self, runner, kind):
+        """
+        Full catalog row (path, run_id, content_hash, created_at) of the
+        latest artifact, or None.
+        """
+        path = self.latest(runner, kind)
+        if path is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT path, run_id, content_hash, created_at FROM artifacts WHERE path = ?", (path,)
+            ).fetchone()
+        return dict(zip(("path", "run_id", "content_hash", "created_at"), row))
+
+    def recent(self, kind, limit=None):
+        """
+        Most recently registered artifacts of `kind` across all runners.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT path FROM artifacts WHERE kind = ? ORDER BY created_at DESC, id DESC", (kind,)
+            )
+            paths = []
+            for (path,) in rows:
+                if os.path.exists(path):
+                    paths.append(path)
+                    if limit is not None and len(paths) >= limit:
+                        break
+        return paths
+
+    def find(self, runner, kind, run_id, default=None):
+        """
+        Path of the artifact of `kind` produced by `runner` in run `run_id`.
+        """
+        return self._first_existing(
+            "SELECT path FROM artifacts WHERE runner = ? AND kind = ? AND run_id = ? ORDER BY created_at DESC, id DESC",
+            (runner, kind, run_id), default
+        )
+
+    def runs(self, kind=DIAGNOSTICS):
+        """
+        Artifacts of `kind` grouped by run, newest run first.
+
+        Returns:
+            dict: run_id -> {runner: path}
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT run_id, runner, path FROM artifacts WHERE kind = ? AND run_id IS NOT NULL "
+                "ORDER BY created_at DESC, id DESC", (kind,)
+            ).fetchall()
+        runs = {}
+        for run_id, runner, path in rows:
+            if os.path.exists(path):
+                runs.setdefault(run_id, {}).setdefault(runner, path)
+        return runs
+
+    def lineage(self, path):
+        """
+        Paths of all artifacts `path` was (transitively) derived from.
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "WITH RECURSIVE ancestors(id) AS ("
+                " SELECT parent_id FROM lineage JOIN artifacts ON artifacts.id = lineage.child_id WHERE artifacts.path = ?"
+                " UNION SELECT parent_id FROM lineage JOIN ancestors ON lineage.child_id = ancestors.id)"
+                " SELECT path FROM artifacts JOIN ancestors USING (id)",
+                (os.path.normpath(path),)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def backfill(self, reports_dir="reports"):
+        """
+        Indexes timestamped outputs already on disk (one scan, ordered by
+        mtime). Returns the number of artifacts registered.
+        """
+        found = []
+        for folder in (reports_dir, os.path.join(reports_dir, "plots")):
+            if not os.path.isdir(folder):
+                continue
+            for entry in os.scandir(folder):
+                parsed = parse_artifact_name(entry.name)
+                if parsed and entry.is_file():
+                    found.append((entry.stat().st_mtime, entry.path, parsed))
+        for mtime, path, (runner, kind, run_id) in sorted(found):
+            self.register(path, runner, kind, run_id, created_at=mtime)
+        return len(found)
+
+    def _first_existing(self, query, params, default):
+        # Newest row first; rows whose files were deleted are pruned as they
+        # are passed over, so the next lookup stays a single index probe
+        missing = []
+        found = default
+        with self._lock:
+            for (path,) in self._conn.execute(query, params):
+                if os.path.exists(path):
+                    found = path
+                    break
+                missing.append((path,))
+            if missing:
+                with self._conn:
+                    self._conn.executemany(
+                        "DELETE FROM lineage WHERE child_id IN (SELECT id FROM artifacts WHERE path = ?)", missing
+                    )
+                    self._conn.executemany("DELETE FROM artifacts WHERE path = ?", missing)
+        return found
+
+
+_catalogs = {}
+
+
+def get_catalog(path=CATALOG_PATH):
+    """
+    Shared RunCatalog per database path for this process.
+    """
+    key = (os.getpid(), os.path.abspath(path))
+    if key not in _catalogs:
+        _catalogs[key] = RunCatalog(path)
+    return _catalogs[key]
+
+
+def register_artifact(path, runner=None, kind=None, run_id=None, parents=(), catalog_path=CATALOG_PATH):
+    """
+    Registers an artifact in the shared catalog. runner/kind/run_id default to
+    what the filename encodes.
+    """
+    parsed = parse_artifact_name(path) or (None, None, None)
+    return get_catalog(catalog_path).register(
+        path, runner or parsed[0], kind or parsed[1], run_id or parsed[2], parents=parents
+    )
+
+
+def latest_artifact(runner, kind, default=None, catalog_path=CATALOG_PATH):
+    return get_catalog(catalog_path).latest(runner, kind, default)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Inspect or rebuild the AXVIAM run catalog")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index timestamped outputs in reports/")
+    parser.add_argument("--latest", nargs=2, metavar=("RUNNER", "KIND"))
+    args = parser.parse_args()
+    catalog = get_catalog()
+    if args.rebuild:
+        print(f"🗂️ Indexed {catalog.backfill()} artifacts into {catalog.path}")
+    if args.latest:
+        print(catalog.latest(*args.latest))
@@ -0,0 +1,98 @@
+"""
+columnar.py
+
+Typed columnar storage for simulation diagnostics. Two binary layouts are
+supported next to the existing CSV:
+
+- ".npcols": a directory with one .npy file per column, loaded back as
+  read-only memory maps (zero-copy, no parsing).
+- ".parquet": a Parquet file, used when pyarrow is installed.
+
+Core Methods: save_columns(columns, path), load_diagnostics(path), export_csv(path, csv_path)
+"""
+
+import csv
+import json
+import os
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pyarrow = None
+    pq = None
+
+NPCOLS_SUFFIX = ".npcols"
+PARQUET_SUFFIX = ".parquet"
+OUTPUT_FORMATS = {"csv": ".csv", "npcols": NPCOLS_SUFFIX, "parquet": PARQUET_SUFFIX}
+
+
+def records_to_columns(records):
+    """
+    Converts a list of diagnostic dicts into typed column arrays.
+    """
+    if isinstance(records, dict):
+        return {name: np.asarray(values) for name, values in records.items()}
+    if not records:
+        return {}
+    return {name: np.array([record[name] for record in records]) for name in records[0].keys()}
+
+
+def save_columns(columns, path):
+    """
+    Writes diagnostic columns in the layout implied by the path suffix
+    (.npcols directory, .parquet, or .csv).
+
+    Args:
+        columns (dict or list): Column name -> array, or a list of diagnostic dicts.
+        path (str): Output path.
+    """
+    columns = records_to_columns(columns)
+    if path.endswith(NPCOLS_SUFFIX):
+        os.makedirs(path, exist_ok=True)
+        for name, values in columns.items():
+            np.save(os.path.join(path, f"{name}.npy"), values)
+        with open(os.path.join(path, "columns.json"), "w") as f:
+            json.dump(list(columns.keys()), f)
+    elif path.endswith(PARQUET_SUFFIX):
+        if pyarrow is None:
+            raise ImportError("Parquet output requires pyarrow; use the .npcols format instead.")
+        pq.write_table(pyarrow.table(columns), path)
+    else:
+        _write_csv(columns, path)
+
+
+def load_diagnostics(path):
+    """
+    Loads diagnostics from any supported layout as a dict of NumPy arrays.
+    .npcols columns come back memory-mapped; CSV is parsed with pandas.
+    """
+    if path.endswith(NPCOLS_SUFFIX):
+        with open(os.path.join(path, "columns.json"), "r") as f:
+            names = json.load(f)
+        return {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode="r") for name in names}
+    if path.endswith(PARQUET_SUFFIX):
+        if pq is None:
+            raise ImportError("Reading Parquet diagnostics requires pyarrow.")
+        table = pq.read_table(path)
+        return {name: table.column(name).to_numpy() for name in table.column_names}
+    import pandas as pd
+    df = pd.read_csv(path)
+    return {name: df[name].to_numpy() for name in df.columns}
+
+
+def export_csv(path, csv_path):
+    """
+    Exports a columnar diagnostics file to CSV.
+    """
+    _write_csv(load_diagnostics(path), csv_path)
+
+
+def _write_csv(columns, path):
+    names = list(columns.keys())
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(names)
+        writer.writerows(zip(*(np.asarray(columns[name]).tolist() for name in names)))
@@ -0,0 +1,145 @@
+"""
+ensemble.py
+
+Adaptive Monte Carlo ensembles for drive-cycle diagnostics. Each pack is
+simulated as many independent replicates of the same drive cycle (from its
+unchanged starting state), run as vectorized batches through the fleet engine.
+Per-pack running means and variances are merged after every batch, and a pack
+stops drawing replicates once the confidence interval on its efficiency and
+remaining capacity is within the target half-width, so compute goes only to
+packs whose estimates are still noisy.
+
+Core Methods: run_ensemble(fleet, miles_each, targets, confidence, seed), ensemble_summary(columns)
+"""
+
+import math
+from statistics import NormalDist
+
+import numpy as np
+
+from ev_overlay.fleet import FleetState, simulate_fleet
+
+# Metric -> target confidence-interval half-width
+DEFAULT_TARGETS = {
+    "efficiency": 0.0005,
+    "remaining_capacity_kWh": 0.05,
+}
+MIN_REPLICATES = 32
+MAX_REPLICATES = 4096
+ROUND_SAMPLES = 1 << 22  # pack-replicates simulated per vectorized batch, at most
+
+
+class _RunningMoments:
+    # Per-pack count/mean/M2, merged batch-wise (Chan et al.)
+
+    def __init__(self, size):
+        self.count = np.zeros(size, dtype=np.int64)
+        self.mean = np.zeros(size, dtype=np.float64)
+        self.m2 = np.zeros(size, dtype=np.float64)
+
+    def merge(self, index, samples):
+        # samples: (len(index), batch) replicate values for the packs in index
+        batch = samples.shape[1]
+        batch_mean = samples.mean(axis=1)
+        batch_m2 = ((samples - batch_mean[:, None]) ** 2).sum(axis=1)
+        count = self.count[index]
+        total = count + batch
+        delta = batch_mean - self.mean[index]
+        self.mean[index] += delta * batch / total
+        self.m2[index] += batch_m2 + delta ** 2 * count * batch / total
+        self.count[index] = total
+
+    def half_width(self, z, index=None):
+        index = slice(None) if index is None else index
+        count = self.count[index]
+        variance = self.m2[index] / np.maximum(count - 1, 1)
+        return z * np.sqrt(variance / np.maximum(count, 1))
+
+
+def run_ensemble(fleet, miles_each=100, targets=None, confidence=0.95, seed=None,
+                 min_replicates=MIN_REPLICATES, max_replicates=MAX_REPLICATES):
+    """
+    Estimates every pack's expected drive-cycle efficiency and remaining
+    capacity with per-pack early stopping.
+
+    Args:
+        fleet (FleetState): Starting state per pack; not modified.
+        miles_each (float or np.ndarray): Miles per drive cycle, scalar or per pack.
+        targets (dict): Metric -> CI half-width to reach (default DEFAULT_TARGETS).
+        confidence (float): Two-sided confidence level of the intervals.
+        seed (int): Seed for reproducible ensembles.
+        min_replicates (int): Replicates every pack gets before stopping is considered.
+        max_replicates (int): Hard cap per pack; packs hitting it are reported unconverged.
+
+    Returns:
+        dict: Columns pack_index, replicates, converged, plus <metric>_mean and
+              <metric>_ci (half-width) for each target metric.
+    """
+    targets = dict(DEFAULT_TARGETS if targets is None else targets)
+    rng = np.random.default_rng(seed)
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    size = len(fleet)
+    miles = np.broadcast_to(np.asarray(miles_each, dtype=np.float64), (size,))
+    moments = {metric: _RunningMoments(size) for metric in targets}
+    converged = np.zeros(size, dtype=bool)
+    active = np.arange(size)
+    drawn = 0  # every active pack has drawn the same number of replicates
+    batch = min_replicates
+
+    while active.size:
+        batch = max(1, min(batch, max_replicates - drawn))
+        chunk = max(1, ROUND_SAMPLES // batch)
+        for start in range(0, active.size, chunk):
+            packs = active[start:start + chunk]
+            replicas = FleetState(
+                np.repeat(fleet.capacity_kWh[packs], batch),
+                np.repeat(fleet.cycles[packs], batch),
+            )
+            columns = simulate_fleet(replicas, np.repeat(miles[packs], batch), rng)
+            for metric, stats in moments.items():
+                stats.merge(packs, columns[metric].reshape(packs.size, batch))
+        drawn += batch
+
+        # worst metric's CI half-width relative to its target, per active pack
+        ratio = np.max([moments[metric].half_width(z, active) / targets[metric] for metric in targets], axis=0)
+        done = ratio <= 1.0 if drawn >= min_replicates else np.zeros(active.size, dtype=bool)
+        converged[active[done]] = True
+        active = active[~done] if drawn < max_replicates else active[:0]
+        if active.size:
+            # Next batch: the replicates the median remaining pack still needs (CI width ~ 1/sqrt(n))
+            needed = drawn * (ratio[~done] ** 2 - 1.0)
+            batch = int(np.clip(np.ceil(np.median(needed)), MIN_REPLICATES // 2, max_replicates))
+
+    result = {
+        "pack_index": np.arange(size),
+        "replicates": moments[next(iter(moments))].count,
+        "converged": converged,
+    }
+    for metric, stats in moments.items():
+        result[f"{metric}_mean"] = stats.mean
+        result[f"{metric}_ci"] = stats.half_width(z)
+    return result
+
+
+def ensemble_summary(columns, confidence=0.95):
+    """
+    Fleet-level view of an ensemble: total replicates, convergence rate and
+    the mean of each metric with a CI combining the per-pack intervals.
+    """
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    size = columns["pack_index"].size
+    summary = {
+        "packs": size,
+        "total_replicates": int(columns["replicates"].sum()),
+        "mean_replicates": round(float(columns["replicates"].mean()), 1),
+        "converged_fraction": round(float(columns["converged"].mean()), 4),
+    }
+    for name in columns:
+        if not name.endswith("_mean"):
+            continue
+        metric = name[:-len("_mean")]
+        # Per-pack means are independent, so their standard errors add in quadrature
+        standard_error = math.sqrt(float(np.sum((columns[f"{metric}_ci"] / z) ** 2))) / size
+        summary[f"average_{metric}"] = round(float(columns[name].mean()), 4)
+        summary[f"average_{metric}_ci"] = round(z * standard_error, 6)
+    return summary
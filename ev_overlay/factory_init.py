@@ -1,8 +1,12 @@
 import os, sys
 sys.path.append(os.path.join(os.path.dirname(__file__), '..', 'engine'))
 import json
+import functools
+import types
 from breath_core import generate_breath_signature
+from ev_overlay.instrumentation import instrumented
 
+@instrumented("factory_init", items=lambda pack: 1)
 def initialize_factory_pack(pack_id, metadata_path):
     """
     Initializes a battery pack at the factory level with its symbolic signature imprint.
@@ -14,9 +18,7 @@ def initialize_factory_pack(pack_id, metadata_path):
     Returns:
         dict: Factory-initialized pack data with symbolic imprint.
     """
-    with open(metadata_path, 'r') as file:
-        metadata = json.load(file)
-        metadata.setdefault("capacity_kWh", 75)  # Default to 75 kWh if not present
+    metadata = dict(load_factory_manifest(metadata_path))
 
     imprint = generate_breath_signature(pack_id, metadata)
 
@@ -30,6 +32,54 @@ def initialize_factory_pack(pack_id, metadata_path):
     return factory_initialized
 
 
+def load_factory_manifest(metadata_path):
+    """
+    Parses a factory metadata JSON file once and memoizes it by path and
+    modification time, so repeated initializations don't re-read the file.
+
+    Returns:
+        mappingproxy: Read-only view of the shared manifest (with capacity_kWh
+                      defaulted); dict() it for a mutable copy.
+    """
+    stat = os.stat(metadata_path)
+    return types.MappingProxyType(_load_manifest(os.path.abspath(metadata_path), stat.st_mtime_ns, stat.st_size))
+
+
+@functools.lru_cache(maxsize=32)
+def _load_manifest(path, mtime_ns, size):
+    with open(path, 'r') as file:
+        metadata = json.load(file)
+    metadata.setdefault("capacity_kWh", 75)  # Default to 75 kWh if not present
+    return metadata
+
+
+@instrumented("factory_init", items=len)
+def initialize_factory_packs(pack_ids, metadata_path):
+    """
+    Bulk factory initialization: parses the shared manifest once and imprints
+    every pack in one call. Signatures use a stable hash, so the same pack ID
+    yields the same imprint in any process or run.
+
+    Args:
+        pack_ids (iterable): Pack identifiers.
+        metadata_path (str): Path to the shared factory metadata JSON.
+
+    Returns:
+        list: Factory-initialized pack dicts, each with its own copy of the
+              metadata (as initialize_factory_pack returns).
+    """
+    metadata = load_factory_manifest(metadata_path)
+    return [
+        {
+            "pack_id": pack_id,
+            "factory_metadata": dict(metadata),
+            "symbolic_imprint": generate_breath_signature(pack_id, metadata),
+            "status": "factory_initialized"
+        }
+        for pack_id in pack_ids
+    ]
+
+
 def initialize_factory():
     """
     Initializes a default factory pack for use in the EV overlay pipeline.
@@ -0,0 +1,228 @@
+"""
+fleet.py
+
+Vectorized fleet engine for EV drive-cycle simulation. Pack state is held as
+contiguous NumPy arrays (one slot per pack) so a drive cycle for the whole
+fleet runs as a handful of batched array operations instead of a Python loop
+over pack dicts.
+
+Core Methods: FleetState, simulate_fleet_cycle(fleet, miles), simulate_fleet(fleet, miles_each), drive_cycle(...)
+"""
+
+import numpy as np
+
+DEFAULT_CAPACITY_KWH = 75
+CONSUMPTION_RATE = 0.25  # kWh per mile (nominal)
+DEGRADATION_FACTOR = 0.005  # percentage of capacity lost per 100 miles
+
+DIAGNOSTIC_COLUMNS = (
+    "miles_driven",
+    "total_consumed_kWh",
+    "capacity_loss_kWh",
+    "efficiency",
+    "remaining_capacity_kWh",
+    "cycle_count",
+)
+
+
+class FleetState:
+    """
+    Columnar pack state for a fleet of N packs.
+
+    Attributes:
+        capacity_kWh (np.ndarray): Current capacity per pack.
+        cycles (np.ndarray): Accumulated cycle count per pack.
+        restored_psi (np.ndarray): Restored psi per pack.
+        restored_tension (np.ndarray): Restored tension per pack.
+    """
+
+    def __init__(self, capacity_kWh, cycles=None, restored_psi=None, restored_tension=None):
+        self.capacity_kWh = np.asarray(capacity_kWh, dtype=np.float64)
+        size = self.capacity_kWh.shape[0]
+        self.cycles = _column(cycles, size, 0.0)
+        self.restored_psi = _column(restored_psi, size, np.nan)
+        self.restored_tension = _column(restored_tension, size, np.nan)
+
+    def __len__(self):
+        return self.capacity_kWh.shape[0]
+
+    @classmethod
+    def uniform(cls, size, capacity_kWh=DEFAULT_CAPACITY_KWH):
+        """
+        Creates a fleet of identical packs at the given capacity.
+        """
+        return cls(np.full(size, capacity_kWh, dtype=np.float64))
+
+    @classmethod
+    def from_packs(cls, packs):
+        """
+        Builds a fleet from a list of pack dicts as used by simulate_multiple_packs.
+        Missing keys fall back to the same defaults as simulate_drive_cycle.
+        """
+        return cls(
+            [pack.get("capacity_kWh", DEFAULT_CAPACITY_KWH) for pack in packs],
+            [pack.get("cycles", 0) for pack in packs],
+            [pack.get("restored_psi", np.nan) for pack in packs],
+            [pack.get("restored_tension", np.nan) for pack in packs],
+        )
+
+    def update_packs(self, packs):
+        """
+        Writes the fleet state back into the pack dicts it was built from.
+        """
+        capacity = self.capacity_kWh.tolist()
+        cycles = self.cycles.tolist()
+        psi = self.restored_psi.tolist()
+        tension = self.restored_tension.tolist()
+        for i, pack in enumerate(packs):
+            pack["capacity_kWh"] = capacity[i]
+            pack["cycles"] = cycles[i]
+            if psi[i] == psi[i]:
+                pack["restored_psi"] = psi[i]
+            if tension[i] == tension[i]:
+                pack["restored_tension"] = tension[i]
+        return packs
+
+
+def _column(values, size, fill):
+    if values is None:
+        return np.full(size, fill, dtype=np.float64)
+    return np.asarray(values, dtype=np.float64)
+
+
+def draw_cycle_noise(rng, size):
+    """
+    Draws one drive cycle's random perturbations for `size` packs, in the
+    order simulate_drive_cycle consumes them, for callers that apply the same
+    draws more than once (ev_overlay.sweep). All five arrays are live at
+    once; simulate_fleet_cycle draws them one at a time instead, from the
+    same stream.
+
+    Returns:
+        dict: capacity_jitter, cycle_jitter, psi_decay, tension_decay, efficiency_noise arrays.
+    """
+    return {
+        "capacity_jitter": rng.uniform(0.98, 1.02, size),
+        "cycle_jitter": rng.uniform(-0.1, 0.1, size),
+        "psi_decay": rng.uniform(0.98, 0.995, size),
+        "tension_decay": rng.uniform(0.985, 0.997, size),
+        "efficiency_noise": rng.uniform(-0.01, 0.01, size),
+    }
+
+
+def drive_cycle(capacity, cycles, miles, noise, consumption_rate=CONSUMPTION_RATE,
+                degradation_factor=DEGRADATION_FACTOR):
+    """
+    Drive-cycle arithmetic on plain arrays. Every argument broadcasts, so
+    per-pack state of shape (N,) combined with parameters of shape (G, 1)
+    evaluates G parameter sets for the whole fleet at once.
+
+    Returns:
+        tuple: (new capacity, new cycles, efficiency, capacity loss, total consumption)
+    """
+    capacity = capacity * noise["capacity_jitter"]
+    cycles = cycles + noise["cycle_jitter"]
+
+    total_consumption = miles * consumption_rate
+    capacity_loss = degradation_factor * (miles / 100) * capacity
+    capacity = capacity - capacity_loss
+    cycles = cycles + miles / 250
+
+    efficiency = capacity_loss / total_consumption
+    efficiency = 1.0 - efficiency
+    efficiency += noise["efficiency_noise"]
+    return capacity, cycles, efficiency, capacity_loss, total_consumption
+
+
+def simulate_fleet_cycle(fleet, miles=100, rng=None, consumption_rate=CONSUMPTION_RATE,
+                         degradation_factor=DEGRADATION_FACTOR):
+    """
+    Runs one drive cycle for every pack in the fleet, in place.
+
+    Mirrors simulate_drive_cycle: capacity and cycle jitter, distance-based
+    capacity loss, psi/tension decay and efficiency noise, all drawn as
+    whole-fleet arrays.
+
+    Args:
+        fleet (FleetState): Fleet to advance; mutated in place.
+        miles (float or np.ndarray): Miles driven, scalar or one value per pack.
+        rng (np.random.Generator): Random source; a fresh default generator if omitted.
+        consumption_rate (float or np.ndarray): kWh per mile.
+        degradation_factor (float or np.ndarray): Capacity fraction lost per 100 miles.
+
+    Returns:
+        dict: Diagnostic column name -> np.ndarray, same columns as simulate_drive_cycle.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    size = len(fleet)
+    miles_driven = np.array(np.broadcast_to(miles, (size,)))
+    miles = miles_driven.astype(np.float64, copy=False)
+
+    # Same arithmetic and draw order as drive_cycle / draw_cycle_noise, but
+    # each draw is consumed as it is made and the state is updated in place,
+    # so only one noise array is alive at a time
+    capacity = fleet.capacity_kWh
+    capacity *= rng.uniform(0.98, 1.02, size)
+    fleet.cycles += rng.uniform(-0.1, 0.1, size)
+
+    total_consumption = miles * consumption_rate
+    capacity_loss = degradation_factor * (miles / 100) * capacity
+    capacity -= capacity_loss
+    fleet.cycles += miles / 250
+
+    # NaN marks packs without healing data; decay leaves them NaN
+    fleet.restored_psi *= rng.uniform(0.98, 0.995, size)
+    fleet.restored_tension *= rng.uniform(0.985, 0.997, size)
+
+    efficiency = capacity_loss / total_consumption
+    np.subtract(1.0, efficiency, out=efficiency)
+    efficiency += rng.uniform(-0.01, 0.01, size)
+
+    return diagnostic_columns(miles_driven, total_consumption, capacity_loss, efficiency, capacity, fleet.cycles)
+
+
+def diagnostic_columns(miles_driven, total_consumption, capacity_loss, efficiency, capacity, cycles):
+    """
+    Rounds drive-cycle results into the diagnostic columns simulate_drive_cycle reports.
+    """
+    return {
+        "miles_driven": miles_driven,
+        "total_consumed_kWh": total_consumption,
+        "capacity_loss_kWh": np.round(capacity_loss, 3),
+        "efficiency": np.round(efficiency, 4),
+        "remaining_capacity_kWh": np.round(capacity, 2),
+        "cycle_count": np.round(cycles, 2),
+    }
+
+
+def simulate_fleet(fleet, miles_each=100, rng=None, consumption_rate=CONSUMPTION_RATE,
+                   degradation_factor=DEGRADATION_FACTOR):
+    """
+    Vectorized counterpart of simulate_multiple_packs: assigns fresh healing
+    variation to every pack, then runs one drive cycle for the whole fleet.
+
+    Args:
+        fleet (FleetState): Fleet to advance; mutated in place.
+        miles_each (float): Miles driven per pack.
+        rng (np.random.Generator): Random source; a fresh default generator if omitted.
+        consumption_rate (float): kWh per mile.
+        degradation_factor (float): Capacity fraction lost per 100 miles.
+
+    Returns:
+        dict: Diagnostic column name -> np.ndarray.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    size = len(fleet)
+    fleet.restored_psi = rng.uniform(0.45, 0.72, size)
+    fleet.restored_tension = rng.uniform(0.59, 0.615, size)
+    return simulate_fleet_cycle(fleet, miles_each, rng, consumption_rate, degradation_factor)
+
+
+def diagnostics_to_records(columns):
+    """
+    Converts diagnostic columns into the list-of-dicts shape returned by
+    simulate_multiple_packs, for CSV export and the existing analyzers.
+    """
+    names = [name for name in DIAGNOSTIC_COLUMNS if name in columns]
+    values = [columns[name].tolist() for name in names]
+    return [dict(zip(names, row)) for row in zip(*values)]
@@ -0,0 +1,270 @@
+"""
+fleet_store.py
+
+Out-of-core fleet state for lifetime runs that don't fit in RAM. Pack state
+lives on disk as memory-mapped .npy columns (capacity_kWh, cycles,
+restored_psi, restored_tension) and is advanced one fixed-size chunk at a
+time, so memory stays at a few chunk-sized arrays whatever the fleet size.
+
+The columns are double-buffered: cycle c reads the state left by cycle c-1
+and writes into the other buffer, so re-running a chunk is idempotent.
+Progress (cycle, next chunk, partial cycle statistics) is checkpointed
+after the written chunks are synced to disk, and an interrupted run
+resumes from the last checkpoint without recomputing finished chunks.
+Every (cycle, chunk) draws from its own SeedSequence stream, so a resumed
+run produces the same state as an uninterrupted one.
+
+Core Methods: FleetStore.create(directory, size), FleetStore.from_fleet(directory, fleet), run_out_of_core(store, cycles, miles_each, seed)
+"""
+
+import json
+import math
+import os
+
+import numpy as np
+
+from ev_overlay.fleet import DEFAULT_CAPACITY_KWH, FleetState, simulate_fleet, simulate_fleet_cycle
+
+FLEET_STORE_DIR = "reports/.fleet_store"
+STORE_CHUNK = 1 << 20  # packs per chunk; part of the reproducibility key
+CHECKPOINT_EVERY = 8  # chunks between checkpoints
+STORE_VERSION = 1
+
+STATE_COLUMNS = ("capacity_kWh", "cycles", "restored_psi", "restored_tension")
+_INITIAL_FILL = {"capacity_kWh": DEFAULT_CAPACITY_KWH, "cycles": 0.0, "restored_psi": np.nan, "restored_tension": np.nan}
+
+
+def _write_json(path, payload):
+    # Atomic replace, so a crash leaves either the old or the new file
+    with open(path + ".tmp", "w") as f:
+        json.dump(payload, f)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(path + ".tmp", path)
+
+
+class FleetStore:
+    """
+    Fleet state backed by memory-mapped column files in `directory`.
+
+    Args:
+        directory (str): Store directory created by FleetStore.create / from_fleet.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        with open(os.path.join(directory, "manifest.json")) as f:
+            manifest = json.load(f)
+        if manifest.get("version") != STORE_VERSION:
+            raise ValueError(f"Unsupported fleet store version in {directory}: {manifest.get('version')}")
+        self.size = manifest["size"]
+        self.chunk_size = manifest["chunk_size"]
+
+    def __len__(self):
+        return self.size
+
+    @classmethod
+    def create(cls, directory, size, capacity_kWh=DEFAULT_CAPACITY_KWH, chunk_size=STORE_CHUNK):
+        """
+        Creates a store of `size` identical packs, filled chunk by chunk.
+        """
+        fill = dict(_INITIAL_FILL, capacity_kWh=capacity_kWh)
+        return cls._create(directory, size, chunk_size, lambda name, start, stop: fill[name])
+
+    @classmethod
+    def from_fleet(cls, directory, fleet, chunk_size=STORE_CHUNK):
+        """
+        Creates a store holding a copy of an in-memory FleetState.
+        """
+        return cls._create(
+            directory, len(fleet), chunk_size, lambda name, start, stop: getattr(fleet, name)[start:stop]
+        )
+
+    @classmethod
+    def _create(cls, directory, size, chunk_size, values):
+        os.makedirs(directory, exist_ok=True)
+        for buffer in (0, 1):
+            for name in STATE_COLUMNS:
+                column = np.lib.format.open_memmap(
+                    os.path.join(directory, f"state{buffer}_{name}.npy"), mode="w+", dtype=np.float64, shape=(size,)
+                )
+                if buffer == 0:
+                    for start in range(0, size, chunk_size):
+                        column[start:start + chunk_size] = values(name, start, min(start + chunk_size, size))
+                    column.flush()
+                del column
+        checkpoint = os.path.join(directory, "checkpoint.json")
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        _write_json(
+            os.path.join(directory, "manifest.json"),
+            {"version": STORE_VERSION, "size": size, "chunk_size": chunk_size, "columns": list(STATE_COLUMNS)}
+        )
+        return cls(directory)
+
+    def _path(self, buffer, name):
+        return os.path.join(self.directory, f"state{buffer}_{name}.npy")
+
+    def read_chunk(self, buffer, start, stop):
+        # Copies out of the mapping, so only this chunk stays resident
+        return FleetState(*(
+            np.array(np.load(self._path(buffer, name), mmap_mode="r")[start:stop]) for name in STATE_COLUMNS
+        ))
+
+    def write_chunk(self, buffer, start, fleet):
+        for name in STATE_COLUMNS:
+            column = np.load(self._path(buffer, name), mmap_mode="r+")
+            column[start:start + len(fleet)] = getattr(fleet, name)
+            del column
+
+    def sync(self, buffer):
+        """
+        Forces written chunks of one buffer to disk before they are checkpointed.
+        """
+        for name in STATE_COLUMNS:
+            fd = os.open(self._path(buffer, name), os.O_RDONLY)
+            try:
+                os.fsync(fd)
+            finally:
+                os.close(fd)
+
+    def load_checkpoint(self):
+        path = os.path.join(self.directory, "checkpoint.json")
+        if not os.path.exists(path):
+            return None
+        with open(path) as f:
+            return json.load(f)
+
+    def save_checkpoint(self, checkpoint):
+        _write_json(os.path.join(self.directory, "checkpoint.json"), checkpoint)
+
+    @property
+    def cycles_done(self):
+        checkpoint = self.load_checkpoint()
+        return checkpoint["cycles_done"] if checkpoint else 0
+
+    def to_fleet(self):
+        """
+        Loads the current state into memory (for fleets that fit in RAM).
+        """
+        return self.read_chunk(self.cycles_done % 2, 0, self.size)
+
+
+def _empty_stats():
+    return {
+        "packs": 0, "mean_efficiency": 0.0, "m2_efficiency": 0.0,
+        "min_efficiency": math.inf, "max_efficiency": -math.inf,
+        "sum_remaining": 0.0, "min_remaining": math.inf,
+        "sum_loss": 0.0, "sum_cycle_count": 0.0,
+    }
+
+
+def _merge_stats(stats, columns):
+    # Chunk statistics merged into the running cycle totals (Chan et al. for the variance)
+    efficiency = columns["efficiency"]
+    remaining = columns["remaining_capacity_kWh"]
+    count = efficiency.shape[0]
+    if not count:
+        return stats
+    mean = float(efficiency.mean())
+    m2 = float(((efficiency - mean) ** 2).sum())
+    total = stats["packs"] + count
+    delta = mean - stats["mean_efficiency"]
+    return {
+        "packs": total,
+        "mean_efficiency": stats["mean_efficiency"] + delta * count / total,
+        "m2_efficiency": stats["m2_efficiency"] + m2 + delta ** 2 * stats["packs"] * count / total,
+        "min_efficiency": min(stats["min_efficiency"], float(efficiency.min())),
+        "max_efficiency": max(stats["max_efficiency"], float(efficiency.max())),
+        "sum_remaining": stats["sum_remaining"] + float(remaining.sum()),
+        "min_remaining": min(stats["min_remaining"], float(remaining.min())),
+        "sum_loss": stats["sum_loss"] + float(columns["capacity_loss_kWh"].sum()),
+        "sum_cycle_count": stats["sum_cycle_count"] + float(columns["cycle_count"].sum()),
+    }
+
+
+def _cycle_summary(cycle, stats):
+    # Same row as ev_overlay.lifetime.summarize_cycle, from merged chunk statistics
+    packs = max(stats["packs"], 1)
+    return {
+        "cycle": cycle,
+        "packs": stats["packs"],
+        "mean_efficiency": round(stats["mean_efficiency"], 4),
+        "std_efficiency": round(math.sqrt(stats["m2_efficiency"] / packs), 5),
+        "min_efficiency": stats["min_efficiency"],
+        "max_efficiency": stats["max_efficiency"],
+        "mean_remaining_capacity_kWh": round(stats["sum_remaining"] / packs, 3),
+        "min_remaining_capacity_kWh": stats["min_remaining"],
+        "total_capacity_loss_kWh": round(stats["sum_loss"], 3),
+        "mean_cycle_count": round(stats["sum_cycle_count"] / packs, 3),
+    }
+
+
+def run_out_of_core(store, cycles, miles_each=100, seed=None, checkpoint_every=CHECKPOINT_EVERY, on_cycle=None):
+    """
+    Advances the stored fleet to `cycles` completed drive cycles, chunk by
+    chunk, resuming from the store's checkpoint if there is one.
+
+    The first cycle assigns fresh healing variation (as simulate_multiple_packs
+    does); later cycles let psi and tension keep decaying, as in
+    ev_overlay.lifetime.iter_lifetime.
+
+    Args:
+        store (FleetStore): Fleet state on disk; advanced in place.
+        cycles (int): Total drive cycles the fleet should have completed.
+        miles_each (float): Miles per pack per cycle.
+        seed (int): Root seed of the per-(cycle, chunk) streams. On resume it
+            must match the checkpoint (None picks up the checkpoint's seed).
+        checkpoint_every (int): Chunks between checkpoints.
+        on_cycle (callable): Called with each newly completed cycle's summary.
+
+    Returns:
+        list: Per-cycle summary dicts (SUMMARY_COLUMNS) for every completed cycle.
+    """
+    checkpoint = store.load_checkpoint()
+    if checkpoint is None:
+        checkpoint = {
+            "seed": np.random.SeedSequence(seed).entropy,
+            "miles_each": float(miles_each),
+            "cycles_done": 0,
+            "next_chunk": 0,
+            "stats": _empty_stats(),
+            "summaries": [],
+        }
+    else:
+        # Each parameter is checked on its own; a resume must match all of them
+        if seed is not None and seed != checkpoint["seed"]:
+            raise ValueError(f"Store {store.directory} was started with seed {checkpoint['seed']}, not {seed}")
+        if float(miles_each) != checkpoint["miles_each"]:
+            raise ValueError(
+                f"Store {store.directory} was started with miles_each={checkpoint['miles_each']}, not {miles_each}"
+            )
+
+    root = checkpoint["seed"]
+    chunks = range(0, store.size, store.chunk_size)
+    while checkpoint["cycles_done"] < cycles:
+        cycle = checkpoint["cycles_done"] + 1
+        source, target = (cycle - 1) % 2, cycle % 2
+        for chunk in range(checkpoint["next_chunk"], len(chunks)):
+            start = chunks[chunk]
+            fleet = store.read_chunk(source, start, min(start + store.chunk_size, store.size))
+            rng = np.random.default_rng(np.random.SeedSequence(root, spawn_key=(cycle, chunk)))
+            if cycle == 1:
+                columns = simulate_fleet(fleet, miles_each, rng)
+            else:
+                columns = simulate_fleet_cycle(fleet, miles_each, rng)
+            store.write_chunk(target, start, fleet)
+            checkpoint["stats"] = _merge_stats(checkpoint["stats"], columns)
+            checkpoint["next_chunk"] = chunk + 1
+            if checkpoint["next_chunk"] % checkpoint_every == 0 and checkpoint["next_chunk"] < len(chunks):
+                store.sync(target)
+                store.save_checkpoint(checkpoint)
+
+        summary = _cycle_summary(cycle, checkpoint["stats"])
+        checkpoint.update(cycles_done=cycle, next_chunk=0, stats=_empty_stats())
+        checkpoint["summaries"].append(summary)
+        store.sync(target)
+        store.save_checkpoint(checkpoint)
+        if on_cycle is not None:
+            on_cycle(summary)
+    return checkpoint["summaries"]
@@ -1,10 +1,24 @@
 
 import csv
 
+import numpy as np
+
+from ev_overlay.instrumentation import count_rows, instrumented
+
+HEALING_DTYPES = {
+    "cell_index": np.int64,
+    "restored_psi": np.float64,
+    "restored_tension": np.float64,
+}
+PARSE_CHUNK_ROWS = 1_000_000
+
+@instrumented("parsing", items=len)
 def parse_healing_report(csv_file_path):
     """
     Parses the symbolic healing report and returns structured data.
     Each row is converted into a dictionary of cell metrics.
+    For large reports use parse_healing_columns or iter_healing_chunks,
+    which return typed arrays instead of one dict per cell.
     """
     parsed_data = []
     with open(csv_file_path, newline='') as csvfile:
@@ -19,6 +33,46 @@ def parse_healing_report(csv_file_path):
     return parsed_data
 
 
+def _read_healing_csv(csv_file_path, chunksize=None):
+    import pandas as pd
+    # pandas' C tokenizer parses straight into typed columns
+    return pd.read_csv(
+        csv_file_path,
+        usecols=list(HEALING_DTYPES),
+        dtype=HEALING_DTYPES,
+        engine="c",
+        chunksize=chunksize,
+    )
+
+
+def _frame_columns(frame):
+    return {name: frame[name].to_numpy() for name in HEALING_DTYPES}
+
+
+@instrumented("parsing", items=count_rows)
+def parse_healing_columns(csv_file_path):
+    """
+    Columnar parse of a healing report.
+
+    Returns:
+        dict: cell_index (int64), restored_psi and restored_tension (float64)
+              arrays, in file order. Other columns in the report are skipped.
+    """
+    return _frame_columns(_read_healing_csv(csv_file_path))
+
+
+def iter_healing_chunks(csv_file_path, chunk_rows=PARSE_CHUNK_ROWS):
+    """
+    Lazily parses a healing report in chunks of `chunk_rows`, yielding one
+    dict of typed column arrays per chunk, so memory is bounded by the chunk
+    size rather than the report size. Chunks feed directly into
+    HealingAccumulator.update_columns.
+    """
+    with _read_healing_csv(csv_file_path, chunksize=chunk_rows) as reader:
+        for frame in reader:
+            yield _frame_columns(frame)
+
+
 def run_healing_diagnostics(report_path="reports/healing_report.csv"):
     """
     Wrapper function that parses the healing report and returns structured data.
@@ -0,0 +1,254 @@
+"""
+instrumentation.py
+
+Lightweight stage timing and memory instrumentation for the pipeline.
+Each instrumented stage records wall time, CPU time (of the calling thread),
+peak memory and item counts. When instrumentation is disabled (the default),
+stage() hands back a shared no-op context and instrumented functions cost a
+single flag check.
+
+Enable with AXVIAM_INSTRUMENT=1, enable(), or the runners' --instrument flag.
+A stage's peak_memory_bytes is how far it raised the process peak RSS; with
+trace_memory=True it is the tracemalloc peak of Python allocations during the
+stage instead (tracked per stage, so nested and concurrent stages don't reset
+each other, though concurrent stages share one process-wide counter).
+process_peak_rss_bytes is the process-lifetime high-water mark at stage end.
+RSS figures need the Unix `resource` module and are None elsewhere.
+
+Core Methods: stage(name, items), instrumented(name, items, from_input), export_json(path), to_prometheus()
+"""
+
+import functools
+import json
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+_enabled = os.environ.get("AXVIAM_INSTRUMENT", "") not in ("", "0")
+_records = []
+_lock = threading.Lock()
+_traced_stages = []  # open stages measuring tracemalloc peaks, guarded by _lock
+
+
+def enable(trace_memory=False):
+    global _enabled
+    _enabled = True
+    if trace_memory and not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def disable():
+    global _enabled
+    _enabled = False
+    if tracemalloc.is_tracing():
+        tracemalloc.stop()
+
+
+def is_enabled():
+    return _enabled
+
+
+def reset():
+    with _lock:
+        _records.clear()
+
+
+def records():
+    with _lock:
+        return list(_records)
+
+
+def _peak_rss_bytes():
+    # Process-lifetime high-water mark, not the current RSS
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def _credit_traced_peak():
+    # Caller holds _lock. Credits the tracemalloc peak since the last reset to
+    # every open stage, so resetting it for a new stage loses nothing.
+    peak = tracemalloc.get_traced_memory()[1]
+    for open_stage in _traced_stages:
+        open_stage.traced_peak = max(open_stage.traced_peak, peak)
+
+
+class _NullStage:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add_items(self, count):
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class _Stage:
+    def __init__(self, name, items):
+        self.name = name
+        self.items = items or 0
+
+    def add_items(self, count):
+        self.items += count
+
+    def __enter__(self):
+        if tracemalloc.is_tracing():
+            with _lock:
+                _credit_traced_peak()
+                tracemalloc.reset_peak()
+                self.traced_peak = tracemalloc.get_traced_memory()[0]
+                _traced_stages.append(self)
+        self._rss = _peak_rss_bytes()
+        self._wall = time.perf_counter()
+        self._cpu = time.thread_time()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        wall = time.perf_counter() - self._wall
+        cpu = time.thread_time() - self._cpu
+        process_peak = _peak_rss_bytes()
+        with _lock:
+            if self in _traced_stages:
+                _credit_traced_peak()
+                _traced_stages.remove(self)
+                peak, source = self.traced_peak, "tracemalloc"
+            elif process_peak is not None:
+                peak, source = process_peak - self._rss, "rss_growth"
+            else:
+                peak, source = None, "unavailable"
+            _records.append({
+                "stage": self.name,
+                "wall_seconds": round(wall, 6),
+                "cpu_seconds": round(cpu, 6),
+                "peak_memory_bytes": peak,
+                "memory_source": source,
+                "process_peak_rss_bytes": process_peak,
+                "items": self.items,
+                "ok": exc_type is None,
+                "finished_at": time.time()
+            })
+        return False
+
+
+def stage(name, items=None):
+    """
+    Context manager timing one stage. Call .add_items(n) on the returned
+    object to count processed items as they go.
+    """
+    if not _enabled:
+        return _NULL_STAGE
+    return _Stage(name, items)
+
+
+def count_rows(value):
+    """
+    Item count for a list of records or a dict of equal-length columns.
+    """
+    if isinstance(value, dict):
+        first = next(iter(value.values()), ())
+        return len(first) if hasattr(first, "__len__") else 1
+    return len(value)
+
+
+def instrumented(name, items=None, from_input=False):
+    """
+    Decorator form of stage(). `items` is a function giving the item count
+    (e.g. count_rows), applied to the return value, or to the first argument
+    when from_input=True.
+    """
+    def decorate(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return func(*args, **kwargs)
+            with _Stage(name, None) as current:
+                result = func(*args, **kwargs)
+                source = args[0] if from_input and args else result
+                if items is not None and source is not None:
+                    try:
+                        current.add_items(items(source))
+                    except (TypeError, KeyError):
+                        pass
+                return result
+        return wrapper
+    return decorate
+
+
+def summarize():
+    """
+    Aggregates records per stage: calls, total wall/CPU, max stage peak
+    memory, max process peak RSS, items.
+    """
+    summary = {}
+    for record in records():
+        entry = summary.setdefault(record["stage"], {
+            "calls": 0, "wall_seconds": 0.0, "cpu_seconds": 0.0, "peak_memory_bytes": 0,
+            "process_peak_rss_bytes": 0, "items": 0, "errors": 0
+        })
+        entry["calls"] += 1
+        entry["wall_seconds"] = round(entry["wall_seconds"] + record["wall_seconds"], 6)
+        entry["cpu_seconds"] = round(entry["cpu_seconds"] + record["cpu_seconds"], 6)
+        entry["peak_memory_bytes"] = max(entry["peak_memory_bytes"], record["peak_memory_bytes"] or 0)
+        entry["process_peak_rss_bytes"] = max(entry["process_peak_rss_bytes"], record["process_peak_rss_bytes"] or 0)
+        entry["items"] += record["items"]
+        entry["errors"] += 0 if record["ok"] else 1
+    return summary
+
+
+def export_json(path, run_id=None):
+    with open(path, "w") as f:
+        json.dump({"run_id": run_id, "stages": summarize(), "records": records()}, f, indent=2)
+
+
+def to_prometheus(run_id=None):
+    """
+    Renders the per-stage summary in Prometheus text exposition format.
+    """
+    metrics = (
+        ("axviam_stage_calls_total", "counter", "calls", "Stage invocations"),
+        ("axviam_stage_wall_seconds_total", "counter", "wall_seconds", "Wall-clock time spent in the stage"),
+        ("axviam_stage_cpu_seconds_total", "counter", "cpu_seconds", "Thread CPU time spent in the stage"),
+        ("axviam_stage_peak_memory_bytes", "gauge", "peak_memory_bytes",
+         "Traced peak memory of the stage, or how far it raised the process peak RSS"),
+        ("axviam_process_peak_rss_bytes", "gauge", "process_peak_rss_bytes",
+         "Process-lifetime peak RSS when the stage finished"),
+        ("axviam_stage_items_total", "counter", "items", "Items processed by the stage"),
+        ("axviam_stage_errors_total", "counter", "errors", "Stage invocations that raised"),
+    )
+    summary = summarize()
+    run_label = f',run="{run_id}"' if run_id else ""
+    lines = []
+    for metric, kind, field, help_text in metrics:
+        lines.append(f"# HELP {metric} {help_text}")
+        lines.append(f"# TYPE {metric} {kind}")
+        for name, entry in sorted(summary.items()):
+            lines.append(f'{metric}{{stage="{name}"{run_label}}} {entry[field]}')
+    return "\n".join(lines) + "\n"
+
+
+def export_run_metrics(prefix, run_id, reports_dir="reports"):
+    """
+    Writes <prefix>_metrics_<run_id>.json and .prom into reports_dir when
+    instrumentation is enabled. Returns the written paths.
+    """
+    if not _enabled or not records():
+        return []
+    os.makedirs(reports_dir, exist_ok=True)
+    base = os.path.join(reports_dir, f"{prefix}_metrics_{run_id}")
+    export_json(f"{base}.json", run_id)
+    with open(f"{base}.prom", "w") as f:
+        f.write(to_prometheus(run_id))
+    print(f"⏱️ Stage metrics saved to: {base}.json / .prom")
+    return [f"{base}.json", f"{base}.prom"]
@@ -0,0 +1,156 @@
+"""
+lifetime.py
+
+Multi-cycle lifetime trajectories for a fleet. Every pack is advanced through
+N consecutive drive cycles on the vectorized fleet engine, and per-cycle
+diagnostics are streamed to disk one cycle at a time so the full
+(cycles x packs) trajectory never has to sit in memory.
+
+Core Methods: iter_lifetime(fleet, cycles), summarize_cycle(cycle, columns), stream_lifetime(fleet, cycles, path)
+"""
+
+import csv
+import itertools
+import math
+
+import numpy as np
+
+from ev_overlay.fleet import DIAGNOSTIC_COLUMNS, simulate_fleet, simulate_fleet_cycle
+
+TRACE_COLUMNS = ("cycle", "pack_index") + DIAGNOSTIC_COLUMNS
+TRACE_WRITE_CHUNK = 1 << 16  # rows formatted per block when writing traces
+
+SUMMARY_COLUMNS = (
+    "cycle",
+    "packs",
+    "mean_efficiency",
+    "std_efficiency",
+    "min_efficiency",
+    "max_efficiency",
+    "mean_remaining_capacity_kWh",
+    "min_remaining_capacity_kWh",
+    "total_capacity_loss_kWh",
+    "mean_cycle_count",
+)
+
+
+def iter_lifetime(fleet, cycles, miles_each=100, rng=None):
+    """
+    Advances the fleet through consecutive drive cycles, yielding each cycle's diagnostics.
+
+    The first cycle assigns fresh healing variation (as simulate_multiple_packs does);
+    later cycles let psi and tension keep decaying from there.
+
+    Args:
+        fleet (FleetState): Fleet to advance; mutated in place.
+        cycles (int): Number of drive cycles to run.
+        miles_each (float or np.ndarray): Miles per pack per cycle.
+        rng (np.random.Generator): Random source; a fresh default generator if omitted.
+
+    Yields:
+        tuple: (cycle number starting at 1, dict of diagnostic columns).
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    for cycle in range(1, cycles + 1):
+        if cycle == 1:
+            yield cycle, simulate_fleet(fleet, miles_each, rng)
+        else:
+            yield cycle, simulate_fleet_cycle(fleet, miles_each, rng)
+
+
+def summarize_cycle(cycle, columns):
+    """
+    Reduces one cycle's diagnostic columns to fleet-level summary statistics.
+    An empty fleet gives a zero-pack row, as the out-of-core store reports.
+    """
+    efficiency = columns["efficiency"]
+    remaining = columns["remaining_capacity_kWh"]
+    if not efficiency.shape[0]:
+        return {
+            "cycle": cycle,
+            "packs": 0,
+            "mean_efficiency": 0.0,
+            "std_efficiency": 0.0,
+            "min_efficiency": math.inf,
+            "max_efficiency": -math.inf,
+            "mean_remaining_capacity_kWh": 0.0,
+            "min_remaining_capacity_kWh": math.inf,
+            "total_capacity_loss_kWh": 0.0,
+            "mean_cycle_count": 0.0,
+        }
+    return {
+        "cycle": cycle,
+        "packs": int(efficiency.shape[0]),
+        "mean_efficiency": round(float(efficiency.mean()), 4),
+        "std_efficiency": round(float(efficiency.std()), 5),
+        "min_efficiency": float(efficiency.min()),
+        "max_efficiency": float(efficiency.max()),
+        "mean_remaining_capacity_kWh": round(float(remaining.mean()), 3),
+        "min_remaining_capacity_kWh": float(remaining.min()),
+        "total_capacity_loss_kWh": round(float(columns["capacity_loss_kWh"].sum()), 3),
+        "mean_cycle_count": round(float(columns["cycle_count"].mean()), 3),
+    }
+
+
+def _column_text(values):
+    # Floats go through repr (shortest round-trip text, e.g. "74.94" for a
+    # column rounded to 2 places); a constant column is formatted once
+    if values.shape[0] and values[0] == values[-1] and (values == values[0]).all():
+        return itertools.repeat(repr(values[0].item()), values.shape[0])
+    return map(repr, values.tolist())
+
+
+def write_trace_block(f, cycle, pack_index, columns, chunk_size=TRACE_WRITE_CHUNK):
+    """
+    Appends one cycle's per-pack trace rows (TRACE_COLUMNS) to an open CSV.
+
+    np.savetxt makes a Python-level format call per row; here every column
+    is converted to text in one pass and rows are joined in bulk, a chunk at
+    a time so the text buffer stays bounded.
+    """
+    cycle_text = str(cycle)
+    values = [np.broadcast_to(columns[name], pack_index.shape) for name in DIAGNOSTIC_COLUMNS]
+    for start in range(0, pack_index.shape[0], chunk_size):
+        rows = pack_index[start:start + chunk_size]
+        fields = [itertools.repeat(cycle_text, rows.shape[0]), map(str, rows.tolist())]
+        fields.extend(_column_text(column[start:start + chunk_size]) for column in values)
+        f.write("\n".join(map(",".join, zip(*fields))) + "\n")
+
+
+def stream_lifetime(fleet, cycles, path, miles_each=100, rng=None, summary_only=False):
+    """
+    Runs a lifetime simulation and streams it to CSV as it goes.
+
+    With summary_only=False each cycle's per-pack rows are appended to `path`
+    (columns: cycle, pack_index, then the usual diagnostics), formatted in
+    TRACE_WRITE_CHUNK-row blocks. With
+    summary_only=True only one summary row per cycle is written.
+
+    Args:
+        fleet (FleetState): Fleet to advance; mutated in place.
+        cycles (int): Number of drive cycles to run.
+        path (str): Output CSV path.
+        miles_each (float or np.ndarray): Miles per pack per cycle.
+        rng (np.random.Generator): Random source; a fresh default generator if omitted.
+        summary_only (bool): Keep only per-cycle summary statistics.
+
+    Returns:
+        list: Per-cycle summary dicts (always returned, whatever was written).
+    """
+    summaries = []
+    pack_index = np.arange(len(fleet))
+    with open(path, "w", newline="") as f:
+        if summary_only:
+            writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+            writer.writeheader()
+        else:
+            f.write(",".join(TRACE_COLUMNS) + "\n")
+
+        for cycle, columns in iter_lifetime(fleet, cycles, miles_each, rng):
+            summary = summarize_cycle(cycle, columns)
+            summaries.append(summary)
+            if summary_only:
+                writer.writerow(summary)
+                continue
+            write_trace_block(f, cycle, pack_index, columns)
+    return summaries
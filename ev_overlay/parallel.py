@@ -0,0 +1,96 @@
+"""
+parallel.py
+
+Deterministic multi-process fleet simulation. The fleet is cut into fixed-size
+blocks and every block gets its own random stream spawned from one seed, so
+the output depends only on (seed, block_size) and is bit-identical whatever
+the worker count. Blocks are then spread across a process pool.
+
+Core Methods: block_streams(seed, count), simulate_fleet_parallel(fleet, miles_each, seed, workers)
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from ev_overlay.fleet import DIAGNOSTIC_COLUMNS, FleetState, simulate_fleet
+
+BLOCK_SIZE = 65536
+
+
+def block_streams(seed, count):
+    """
+    Spawns one independent SeedSequence per block from a root seed.
+
+    Args:
+        seed (int or None): Root seed; None draws fresh OS entropy (not reproducible).
+        count (int): Number of blocks.
+
+    Returns:
+        list: np.random.SeedSequence children, one per block.
+    """
+    return np.random.SeedSequence(seed).spawn(count)
+
+
+def _simulate_block(task):
+    capacity, cycles, miles, stream = task
+    fleet = FleetState(capacity, cycles)
+    columns = simulate_fleet(fleet, miles, np.random.default_rng(stream))
+    return fleet.capacity_kWh, fleet.cycles, fleet.restored_psi, fleet.restored_tension, columns
+
+
+def simulate_fleet_parallel(fleet, miles_each=100, seed=None, workers=None, block_size=BLOCK_SIZE):
+    """
+    Runs simulate_fleet over the fleet in fixed-size blocks across a process pool.
+
+    Args:
+        fleet (FleetState): Fleet to advance; updated in place from the block results.
+        miles_each (float or np.ndarray): Miles per pack, scalar or one value per pack.
+        seed (int): Root seed for the per-block random streams.
+        workers (int): Worker processes; defaults to os.cpu_count(). 1 runs inline.
+        block_size (int): Packs per block. Part of the reproducibility key, keep it fixed.
+
+    Returns:
+        dict: Diagnostic column name -> np.ndarray, in pack order.
+    """
+    size = len(fleet)
+    workers = workers or os.cpu_count() or 1
+    miles = np.broadcast_to(np.asarray(miles_each), (size,))
+    starts = range(0, size, block_size)
+    streams = block_streams(seed, len(starts))
+    tasks = (
+        (
+            fleet.capacity_kWh[start:start + block_size],
+            fleet.cycles[start:start + block_size],
+            miles[start:start + block_size],
+            stream,
+        )
+        for start, stream in zip(starts, streams)
+    )
+
+    if workers == 1 or len(starts) <= 1:
+        blocks = map(_simulate_block, tasks)
+        pool = None
+    else:
+        pool = ProcessPoolExecutor(max_workers=workers)
+        blocks = pool.map(_simulate_block, tasks, chunksize=max(1, len(starts) // (workers * 4)))
+
+    columns = {}
+    fleet.restored_psi = np.empty(size)
+    fleet.restored_tension = np.empty(size)
+    try:
+        for start, (capacity, cycles, psi, tension, block_columns) in zip(starts, blocks):
+            end = start + capacity.shape[0]
+            fleet.capacity_kWh[start:end] = capacity
+            fleet.cycles[start:end] = cycles
+            fleet.restored_psi[start:end] = psi
+            fleet.restored_tension[start:end] = tension
+            for name in DIAGNOSTIC_COLUMNS:
+                if name not in columns:
+                    columns[name] = np.empty(size, dtype=block_columns[name].dtype)
+                columns[name][start:end] = block_columns[name]
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return columns
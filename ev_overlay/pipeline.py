@@ -0,0 +1,165 @@
+"""
+pipeline.py
+
+In-process DAG orchestrator for the evaluation pipeline. Stages are plain
+Python callables that receive their upstream stages' results as keyword
+arguments, so data moves between stages in memory instead of through files
+and fresh interpreters. Stages whose dependencies are satisfied run
+concurrently, and a stage is skipped when the content hash of its inputs
+(input files plus upstream results) matches a cached run. A stage's `after`
+step runs on every run, cached or not, for per-run side effects such as
+registering outputs.
+
+Core Methods: Stage(name, func, deps, input_files), Pipeline(stages).run()
+"""
+
+import hashlib
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+
+from ev_overlay import instrumentation
+
+CACHE_DIR = "reports/.pipeline_cache"
+
+
+class Stage:
+    """
+    One pipeline step.
+
+    Args:
+        name (str): Unique stage name; also the keyword its result is passed under.
+        func (callable): Called as func(**{dep: result}) and returns the stage result.
+        deps (tuple): Names of upstream stages.
+        input_files (tuple): Files whose content is part of the cache key.
+        label (str): Human-readable progress label.
+        cacheable (bool): False forces the stage to run every time.
+        after (callable): Called with the stage result on every run, cache hit
+            or not; its return value is what downstream stages receive. The
+            cache key still derives from the result before `after`.
+    """
+
+    def __init__(self, name, func, deps=(), input_files=(), label=None, cacheable=True, after=None):
+        self.name = name
+        self.func = func
+        self.deps = tuple(deps)
+        self.input_files = tuple(input_files)
+        self.label = label or name
+        self.cacheable = cacheable
+        self.after = after
+
+
+def hash_file(path, block_size=1 << 20):
+    """
+    SHA-256 of a file's content; directories (e.g. .npcols outputs) hash
+    their files' names and contents in sorted order.
+    """
+    digest = hashlib.sha256()
+    paths = [path]
+    if os.path.isdir(path):
+        paths = [os.path.join(path, name) for name in sorted(os.listdir(path))]
+    for member in paths:
+        digest.update(os.path.basename(member).encode())
+        with open(member, "rb") as f:
+            for block in iter(lambda: f.read(block_size), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_value(value):
+    return hashlib.sha256(pickle.dumps(value, protocol=4)).hexdigest()
+
+
+class Pipeline:
+    """
+    Runs stages in dependency order, independent stages in parallel threads.
+
+    A stage result that is a dict with an "artifacts" list of paths is only
+    reused from cache while all of those files still exist.
+
+    Args:
+        stages (list): Stage objects.
+        cache_dir (str): Where cached stage results are stored.
+        max_workers (int): Maximum stages running at once.
+        use_cache (bool): Disable to force every stage to run.
+    """
+
+    def __init__(self, stages, cache_dir=CACHE_DIR, max_workers=4, use_cache=True):
+        self.stages = {stage.name: stage for stage in stages}
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.use_cache = use_cache
+        self.results = {}
+        self.hashes = {}
+        self.skipped = []
+
+    def run(self):
+        """
+        Executes the pipeline.
+
+        Returns:
+            dict: Stage name -> result.
+        """
+        pending = dict(self.stages)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+            while pending:
+                ready = [stage for stage in pending.values() if all(dep in self.results for dep in stage.deps)]
+                if not ready:
+                    raise ValueError(f"Unresolvable stage dependencies: {sorted(pending)}")
+                futures = {stage.name: pool.submit(self._run_stage, stage) for stage in ready}
+                for name, future in futures.items():
+                    self.results[name] = future.result()
+                    del pending[name]
+        return self.results
+
+    def _run_stage(self, stage):
+        result = self._compute_stage(stage)
+        if stage.after is not None:
+            result = stage.after(result)
+        return result
+
+    def _compute_stage(self, stage):
+        key = self._stage_key(stage)
+        cache_path = os.path.join(self.cache_dir, f"{stage.name}.pkl")
+        if self.use_cache and stage.cacheable:
+            cached = self._load_cached(cache_path, key)
+            if cached is not None:
+                print(f"\n⏭️ {stage.label}: inputs unchanged, reusing cached result")
+                self.skipped.append(stage.name)
+                self.hashes[stage.name] = cached[0]
+                return cached[1]
+
+        print(f"\n🔹 {stage.label}...")
+        with instrumentation.stage(f"pipeline.{stage.name}"):
+            result = stage.func(**{dep: self.results[dep] for dep in stage.deps})
+        result_hash = hash_value(result)
+        self.hashes[stage.name] = result_hash
+        if stage.cacheable:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            with open(cache_path, "wb") as f:
+                pickle.dump({"key": key, "hash": result_hash, "result": result}, f)
+        return result
+
+    def _stage_key(self, stage):
+        parts = [stage.name]
+        for path in stage.input_files:
+            parts.append(f"{path}:{hash_file(path) if os.path.exists(path) else 'missing'}")
+        for dep in stage.deps:
+            parts.append(f"{dep}:{self.hashes[dep]}")
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    def _load_cached(self, cache_path, key):
+        if not os.path.exists(cache_path):
+            return None
+        try:
+            with open(cache_path, "rb") as f:
+                cached = pickle.load(f)
+        except (OSError, pickle.UnpicklingError, EOFError):
+            return None
+        if cached.get("key") != key:
+            return None
+        result = cached["result"]
+        artifacts = result.get("artifacts", []) if isinstance(result, dict) else []
+        if not all(os.path.exists(path) for path in artifacts):
+            return None
+        return cached["hash"], result
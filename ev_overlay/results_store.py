@@ -0,0 +1,276 @@
+"""
+results_store.py
+
+SQLite results store for simulation diagnostics and healing records. Rows are
+bulk-inserted in batched transactions (WAL journal, synchronous=NORMAL), and
+the diagnostics table is indexed on runner/run, pack and cycle, so dashboard
+aggregates and cross-run comparisons are indexed SQL queries rather than
+full re-reads of the CSV outputs.
+
+Rows carry the same column names as ev_overlay.lifetime.TRACE_COLUMNS:
+`cycle` is the drive cycle number (0 for single-drive runs) and `pack_index`
+the pack's position in the fleet.
+
+Core Methods: ResultsStore(path), insert_diagnostics(runner, run_id, results), insert_healing(runner, run_id, healing_data), summary(runner, run_id), compare_runs(runner)
+"""
+
+import os
+import sqlite3
+import threading
+import time
+
+import numpy as np
+
+from ev_overlay.fleet import DIAGNOSTIC_COLUMNS
+
+RESULTS_DB = "reports/results.sqlite"
+BATCH_ROWS = 50000
+
+HEALING_COLUMNS = ("cell_index", "restored_psi", "restored_tension")
+
+_SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS runs (
+    runner TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    rows INTEGER NOT NULL DEFAULT 0,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (runner, run_id, kind)
+);
+CREATE INDEX IF NOT EXISTS runs_latest ON runs (runner, kind, created_at DESC);
+CREATE TABLE IF NOT EXISTS diagnostics (
+    runner TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    cycle INTEGER NOT NULL,
+    pack_index INTEGER NOT NULL,
+    {", ".join(f"{name} REAL" for name in DIAGNOSTIC_COLUMNS)}
+);
+CREATE INDEX IF NOT EXISTS diagnostics_run ON diagnostics (runner, run_id);
+CREATE INDEX IF NOT EXISTS diagnostics_pack ON diagnostics (pack_index, cycle);
+CREATE INDEX IF NOT EXISTS diagnostics_cycle ON diagnostics (cycle);
+CREATE TABLE IF NOT EXISTS healing (
+    runner TEXT NOT NULL,
+    run_id TEXT NOT NULL,
+    cell_index INTEGER NOT NULL,
+    restored_psi REAL,
+    restored_tension REAL
+);
+CREATE INDEX IF NOT EXISTS healing_run ON healing (runner, run_id);
+CREATE INDEX IF NOT EXISTS healing_cell ON healing (cell_index);
+"""
+
+# (summary key, SQL aggregate) for per-run diagnostics summaries
+_DIAGNOSTIC_AGGREGATES = (
+    ("rows", "COUNT(*)"),
+    ("average_efficiency", "AVG(efficiency)"),
+    ("total_miles_driven", "SUM(miles_driven)"),
+    ("total_capacity_loss_kWh", "SUM(capacity_loss_kWh)"),
+    ("average_remaining_capacity_kWh", "AVG(remaining_capacity_kWh)"),
+    ("max_cycle_count", "MAX(cycle_count)"),
+)
+
+
+def _column_rows(runner, run_id, columns, names):
+    # Rows from a dict of equal-length columns; missing columns become NULL
+    size = len(next(iter(columns.values())))
+    values = []
+    for name in names:
+        column = columns.get(name)
+        values.append(np.asarray(column).tolist() if column is not None else [None] * size)
+    return zip([runner] * size, [run_id] * size, *values)
+
+
+class ResultsStore:
+    """
+    Indexed SQLite store of diagnostics and healing rows. One connection is
+    shared between threads behind a lock; writers in other processes wait on
+    SQLite's own locking.
+
+    Args:
+        path (str): Database file.
+        batch_rows (int): Rows per executemany batch within a transaction.
+    """
+
+    def __init__(self, path=RESULTS_DB, batch_rows=BATCH_ROWS):
+        self.path = path
+        self.batch_rows = batch_rows
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(_SCHEMA)
+
+    def close(self):
+        self._conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def insert_diagnostics(self, runner, run_id, results, cycle=0):
+        """
+        Bulk-inserts one run's diagnostics, replacing any rows already stored
+        for (runner, run_id).
+
+        Args:
+            results (list | dict): Diagnostic dicts, or a dict of column arrays
+                (e.g. from ev_overlay.fleet or a lifetime trace, which may carry
+                its own `cycle` and `pack_index` columns).
+            cycle (int): Drive cycle recorded when results carry no `cycle` column.
+
+        Returns:
+            int: Rows inserted.
+        """
+        if not isinstance(results, dict):
+            from ev_overlay.columnar import records_to_columns
+            results = records_to_columns(results)
+        if not results:
+            return 0
+        size = len(next(iter(results.values())))
+        columns = dict(results)
+        columns.setdefault("cycle", np.full(size, cycle, dtype=np.int64))
+        columns.setdefault("pack_index", np.arange(size, dtype=np.int64))
+        names = ("cycle", "pack_index") + DIAGNOSTIC_COLUMNS
+        query = f"INSERT INTO diagnostics (runner, run_id, {', '.join(names)}) VALUES ({', '.join('?' * (len(names) + 2))})"
+        return self._replace_run("diagnostics", runner, run_id, query, _column_rows(runner, run_id, columns, names))
+
+    def insert_healing(self, runner, run_id, healing_data):
+        """
+        Bulk-inserts healing records (dicts or columns with cell_index,
+        restored_psi, restored_tension). Returns rows inserted.
+        """
+        if not isinstance(healing_data, dict):
+            healing_data = {
+                name: [entry.get(name) for entry in healing_data] for name in HEALING_COLUMNS
+            } if healing_data else {}
+        if not healing_data:
+            return 0
+        query = f"INSERT INTO healing (runner, run_id, {', '.join(HEALING_COLUMNS)}) VALUES (?, ?, ?, ?, ?)"
+        return self._replace_run("healing", runner, run_id, query, _column_rows(runner, run_id, healing_data, HEALING_COLUMNS))
+
+    def _replace_run(self, table, runner, run_id, query, rows):
+        inserted = 0
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {table} WHERE runner = ? AND run_id = ?", (runner, run_id))
+            batch = []
+            for row in rows:
+                batch.append(row)
+                if len(batch) >= self.batch_rows:
+                    self._conn.executemany(query, batch)
+                    inserted += len(batch)
+                    batch = []
+            if batch:
+                self._conn.executemany(query, batch)
+                inserted += len(batch)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO runs (runner, run_id, kind, rows, created_at) VALUES (?, ?, ?, ?, ?)",
+                (runner, run_id, table, inserted, time.time())
+            )
+        return inserted
+
+    def latest_run(self, runner, kind="diagnostics"):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT run_id FROM runs WHERE runner = ? AND kind = ? ORDER BY created_at DESC LIMIT 1",
+                (runner, kind)
+            ).fetchone()
+        return row[0] if row else None
+
+    def summary(self, runner, run_id=None):
+        """
+        Aggregates one run's diagnostics (latest run for the runner by default).
+
+        Returns:
+            dict: run_id, rows, average_efficiency, total_miles_driven,
+                  total_capacity_loss_kWh, average_remaining_capacity_kWh,
+                  max_cycle_count; None if the run isn't stored.
+        """
+        run_id = run_id or self.latest_run(runner)
+        if run_id is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT {', '.join(sql for _, sql in _DIAGNOSTIC_AGGREGATES)} FROM diagnostics "
+                "WHERE runner = ? AND run_id = ?",
+                (runner, run_id)
+            ).fetchone()
+        if not row[0]:
+            return None
+        summary = {"runner": runner, "run_id": run_id}
+        summary.update(zip((key for key, _ in _DIAGNOSTIC_AGGREGATES), row))
+        return summary
+
+    def healing_summary(self, runner="convert", run_id=None):
+        """
+        Cell count and mean restored values for one stored healing run.
+        """
+        run_id = run_id or self.latest_run(runner, "healing")
+        if run_id is None:
+            return None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT COUNT(*), COUNT(DISTINCT cell_index), AVG(restored_psi), AVG(restored_tension) "
+                "FROM healing WHERE runner = ? AND run_id = ?",
+                (runner, run_id)
+            ).fetchone()
+        return dict(zip(("run_id", "records", "cells", "average_restored_psi", "average_restored_tension"),
+                        (run_id,) + row))
+
+    def compare_runs(self, runner=None, limit=None):
+        """
+        Per-run diagnostics aggregates across stored runs, newest first,
+        optionally for one runner.
+        """
+        where = "WHERE d.runner = ?" if runner else ""
+        params = (runner,) if runner else ()
+        query = (
+            f"SELECT d.runner, d.run_id, {', '.join(sql for _, sql in _DIAGNOSTIC_AGGREGATES)} "
+            f"FROM diagnostics d JOIN runs r ON r.runner = d.runner AND r.run_id = d.run_id AND r.kind = 'diagnostics' "
+            f"{where} GROUP BY d.runner, d.run_id ORDER BY MAX(r.created_at) DESC"
+        )
+        if limit is not None:
+            query += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+        keys = ("runner", "run_id") + tuple(key for key, _ in _DIAGNOSTIC_AGGREGATES)
+        return [dict(zip(keys, row)) for row in rows]
+
+    def pack_history(self, pack_index, runner=None):
+        """
+        Diagnostics of one pack across cycles and runs, ordered by cycle.
+        """
+        where = "pack_index = ?" + (" AND runner = ?" if runner else "")
+        params = (pack_index, runner) if runner else (pack_index,)
+        with self._lock:
+            cursor = self._conn.execute(
+                f"SELECT runner, run_id, cycle, {', '.join(DIAGNOSTIC_COLUMNS)} FROM diagnostics "
+                f"WHERE {where} ORDER BY cycle", params
+            )
+            names = [column[0] for column in cursor.description]
+            return [dict(zip(names, row)) for row in cursor.fetchall()]
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Load diagnostics into the AXVIAM results store and compare runs")
+    parser.add_argument("--ingest", nargs="*", default=[], help="Timestamped diagnostics files to load")
+    parser.add_argument("--runner", default=None, help="Restrict the comparison to one runner")
+    args = parser.parse_args()
+
+    from ev_overlay.catalog import parse_artifact_name
+    from ev_overlay.columnar import load_diagnostics
+
+    with ResultsStore() as store:
+        for path in args.ingest:
+            runner, _, run_id = parse_artifact_name(path) or (None, None, None)
+            if runner is None:
+                print(f"⚠️ Skipping {path}: not a timestamped diagnostics file")
+                continue
+            columns = {name: np.asarray(values) for name, values in load_diagnostics(path).items()}
+            print(f"📥 {path}: {store.insert_diagnostics(runner, run_id, columns)} rows")
+        for run in store.compare_runs(args.runner):
+            print(run)
@@ -0,0 +1,214 @@
+"""
+service.py
+
+Async telemetry ingestion service. BMS samples are POSTed in batches, queued
+on a bounded asyncio queue, and a background consumer drains the queue in
+micro-batches: each micro-batch is converted to healing values with NumPy and
+folded into per-pack HealingAccumulators held in memory. The queue is bounded
+by queued samples (MAX_QUEUED_SAMPLES), not just request count: when it is
+full, POSTs are rejected with 503 + Retry-After so clients back off instead of
+growing server memory, and a single batch over MAX_BATCH_SAMPLES gets 413.
+
+Micro-batches are processed on a worker thread; the pack state they update
+is guarded by IngestState.lock, and the read endpoints take a snapshot under
+the same lock.
+
+Run with:  uvicorn ev_overlay.service:app
+           python -m ev_overlay.service --port 8000
+
+Core Methods: app, ingest_telemetry(batch), pack_health(pack_id)
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional
+
+import numpy as np
+from fastapi import FastAPI, HTTPException
+from pydantic import BaseModel
+
+from engine.trace_signature import temperature_to_tension, voltage_to_psi
+from ev_overlay.analyzer import HealingAccumulator
+
+QUEUE_MAXSIZE = 1024  # queued request batches
+MAX_QUEUED_SAMPLES = 1 << 20  # samples waiting in the queue, across all batches
+MAX_BATCH_SAMPLES = 65536  # samples in one POST
+MICRO_BATCH_SAMPLES = 8192
+MICRO_BATCH_INTERVAL = 0.05  # seconds to wait for a micro-batch to fill
+
+logger = logging.getLogger(__name__)
+
+
+class TelemetrySample(BaseModel):
+    pack_id: str
+    cell_id: int
+    voltage: float
+    temperature: float
+    timestamp: Optional[str] = None
+
+
+class TelemetryBatch(BaseModel):
+    samples: List[TelemetrySample]
+
+
+class PackHealth:
+    """
+    In-memory health state for one pack.
+    """
+
+    def __init__(self):
+        self.accumulator = HealingAccumulator()
+        self.cells = set()
+        self.samples = 0
+        self.last_timestamp = None
+
+    def summary(self):
+        summary = self.accumulator.summary()
+        summary.update({
+            "samples": self.samples,
+            "cells_reporting": len(self.cells),
+            "last_timestamp": self.last_timestamp
+        })
+        return summary
+
+
+class IngestState:
+    def __init__(self, maxsize=QUEUE_MAXSIZE):
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.queued_samples = 0  # only touched on the event loop
+        self.lock = threading.Lock()  # guards packs and the counters below
+        self.packs = {}
+        self.samples_processed = 0
+        self.micro_batches = 0
+        self.rejected_requests = 0
+        self.started = time.time()
+
+
+def process_micro_batch(state, samples):
+    """
+    Converts one micro-batch of samples to healing values and folds them into
+    the per-pack accumulators. Conversion is vectorized over the batch and
+    runs outside the state lock; only the fold into the accumulators holds it.
+    """
+    pack_ids = np.array([sample.pack_id for sample in samples])
+    psi = voltage_to_psi([sample.voltage for sample in samples])
+    tension = temperature_to_tension([sample.temperature for sample in samples])
+
+    packs, codes = np.unique(pack_ids, return_inverse=True)
+    order = np.argsort(codes, kind="stable")
+    bounds = np.searchsorted(codes[order], np.arange(1, packs.size))
+    with state.lock:
+        for pack_id, selected in zip(packs.tolist(), np.split(order, bounds)):
+            health = state.packs.setdefault(pack_id, PackHealth())
+            health.accumulator.update_columns({"restored_psi": psi[selected], "restored_tension": tension[selected]})
+            health.samples += selected.size
+            for i in selected.tolist():
+                health.cells.add(samples[i].cell_id)
+                if samples[i].timestamp:
+                    health.last_timestamp = samples[i].timestamp
+
+        state.samples_processed += len(samples)
+        state.micro_batches += 1
+
+
+async def consume(state):
+    """
+    Background task: waits for queued batches and processes them in
+    micro-batches of up to MICRO_BATCH_SAMPLES or MICRO_BATCH_INTERVAL.
+    """
+    loop = asyncio.get_running_loop()
+    while True:
+        samples = list(await state.queue.get())
+        state.queued_samples -= len(samples)
+        deadline = loop.time() + MICRO_BATCH_INTERVAL
+        while len(samples) < MICRO_BATCH_SAMPLES:
+            remaining = deadline - loop.time()
+            if remaining <= 0:
+                break
+            try:
+                batch = await asyncio.wait_for(state.queue.get(), remaining)
+            except asyncio.TimeoutError:
+                break
+            state.queued_samples -= len(batch)
+            samples.extend(batch)
+        # CPU-bound work runs off the event loop so requests keep being accepted
+        try:
+            await loop.run_in_executor(None, process_micro_batch, state, samples)
+        except Exception:
+            # A bad micro-batch must not kill the consumer, or the queue fills and every POST gets 503
+            logger.exception("Dropped micro-batch of %d samples", len(samples))
+
+
+@asynccontextmanager
+async def lifespan(app):
+    app.state.ingest = IngestState()
+    consumer = asyncio.create_task(consume(app.state.ingest))
+    yield
+    consumer.cancel()
+
+
+app = FastAPI(title="AXVIAM Telemetry Ingest", lifespan=lifespan)
+
+
+@app.post("/telemetry", status_code=202)
+async def ingest_telemetry(batch: TelemetryBatch):
+    state = app.state.ingest
+    size = len(batch.samples)
+    if size > MAX_BATCH_SAMPLES:
+        state.rejected_requests += 1
+        raise HTTPException(status_code=413, detail=f"Batch exceeds {MAX_BATCH_SAMPLES} samples; split it")
+    if state.queued_samples + size > MAX_QUEUED_SAMPLES or state.queue.full():
+        state.rejected_requests += 1
+        raise HTTPException(status_code=503, detail="Ingest queue full", headers={"Retry-After": "1"})
+    state.queue.put_nowait(batch.samples)
+    state.queued_samples += size
+    return {"accepted": len(batch.samples), "queue_depth": state.queue.qsize()}
+
+
+@app.get("/packs")
+async def list_packs():
+    state = app.state.ingest
+    with state.lock:
+        packs = list(state.packs)
+    return {"packs": sorted(packs)}
+
+
+@app.get("/packs/{pack_id}/health")
+async def pack_health(pack_id: str):
+    state = app.state.ingest
+    with state.lock:
+        health = state.packs.get(pack_id)
+        summary = health.summary() if health is not None else None
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"No telemetry for pack {pack_id}")
+    return summary
+
+
+@app.get("/stats")
+async def ingest_stats():
+    state = app.state.ingest
+    with state.lock:
+        samples_processed, micro_batches, packs = state.samples_processed, state.micro_batches, len(state.packs)
+    return {
+        "samples_processed": samples_processed,
+        "micro_batches": micro_batches,
+        "queue_depth": state.queue.qsize(),
+        "queued_samples": state.queued_samples,
+        "rejected_requests": state.rejected_requests,
+        "packs": packs,
+        "uptime_s": round(time.time() - state.started, 3)
+    }
+
+
+if __name__ == "__main__":
+    import argparse
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="AXVIAM telemetry ingestion service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -1,6 +1,8 @@
 import random
 import csv
 
+from ev_overlay.instrumentation import count_rows, instrumented
+
 def simulate_drive_cycle(pack_state, miles=100):
     """
     Simulates an EV drive cycle for a given number of miles.
@@ -53,26 +55,151 @@ def simulate_multiple_packs(packs, miles_each=100):
 
 import time
 
-def generate_output_filename(prefix=None):
+def generate_output_filename(prefix=None, kind="simulated_pack_diagnostics", extension=".csv"):
     timestamp = time.strftime("%Y%m%d-%H%M%S")
     if prefix:
-        return f"reports/{prefix}_simulated_pack_diagnostics_{timestamp}.csv"
-    return f"reports/simulated_pack_diagnostics_{timestamp}.csv"
+        return f"reports/{prefix}_{kind}_{timestamp}{extension}"
+    return f"reports/{kind}_{timestamp}{extension}"
 
 def save_simulation_results(results, filename=None):
+    """
+    Saves diagnostics to CSV, or to a columnar binary layout when the filename
+    ends in .npcols or .parquet (see ev_overlay.columnar). `results` may be a
+    list of diagnostic dicts or a dict of column arrays.
+    """
     if filename is None:
         timestamp = time.strftime("%Y%m%d-%H%M%S")
         filename = f"reports/simulated_pack_diagnostics_{timestamp}.csv"
+    if isinstance(results, dict) or not filename.endswith(".csv"):
+        from ev_overlay.columnar import save_columns
+        save_columns(results, filename)
+        return
     keys = results[0].keys()
     with open(filename, "w", newline="") as f:
         writer = csv.DictWriter(f, fieldnames=keys)
         writer.writeheader()
         writer.writerows(results)
 
-def simulate_ev_drive(packs, miles_each=100, output_prefix=None):
+@instrumented("simulation", items=count_rows)
+def simulate_ev_drive(packs, miles_each=100, output_prefix=None, vectorized=False, workers=None, seed=None,
+                      output_format="csv", output_file=None):
     """
     Wrapper for simulate_multiple_packs to match expected interface.
+    With vectorized=True, workers or seed the packs are run through the NumPy
+    fleet engine (ev_overlay.fleet) in per-block seeded streams
+    (ev_overlay.parallel) and their dicts are updated from the fleet state.
+    Any seeded run takes this path, so for a given seed the results are the
+    same whether vectorized, inline or spread over any number of workers.
+    Without a seed the default path draws from the global `random` module.
+    output_format selects "csv", "npcols" or "parquet" for the saved diagnostics;
+    output_file overrides the generated timestamped filename. The output is
+    not registered in the run catalog; the runner scripts and pipeline do that.
     """
-    results = simulate_multiple_packs(packs, miles_each)
-    save_simulation_results(results, filename=generate_output_filename(output_prefix))
+    from ev_overlay.columnar import OUTPUT_FORMATS
+    filename = output_file or generate_output_filename(output_prefix, extension=OUTPUT_FORMATS[output_format])
+    if vectorized or workers is not None or seed is not None:
+        from ev_overlay.fleet import FleetState, diagnostics_to_records
+        from ev_overlay.parallel import simulate_fleet_parallel
+        fleet = FleetState.from_packs(packs)
+        columns = simulate_fleet_parallel(fleet, miles_each, seed=seed, workers=workers or 1)
+        results = diagnostics_to_records(columns)
+        fleet.update_packs(packs)
+        save_simulation_results(columns if output_format != "csv" else results, filename=filename)
+    else:
+        results = simulate_multiple_packs(packs, miles_each)
+        save_simulation_results(results, filename=filename)
     return results
+
+@instrumented("simulation", items=len, from_input=True)
+def simulate_ev_ensemble(packs, miles_each=100, output_prefix=None, targets=None, confidence=0.95, seed=None,
+                         max_replicates=None):
+    """
+    Ensemble mode: runs each pack's drive cycle as repeated Monte Carlo
+    replicates until the confidence intervals on efficiency and remaining
+    capacity reach their targets (see ev_overlay.ensemble), and saves the
+    per-pack means and CI half-widths. Packs are not modified.
+    Returns the fleet-level summary.
+    """
+    from ev_overlay.ensemble import MAX_REPLICATES, ensemble_summary, run_ensemble
+    from ev_overlay.fleet import FleetState
+    columns = run_ensemble(
+        FleetState.from_packs(packs), miles_each, targets=targets, confidence=confidence, seed=seed,
+        max_replicates=max_replicates or MAX_REPLICATES
+    )
+    save_simulation_results(columns, filename=generate_output_filename(output_prefix, "ensemble_diagnostics"))
+    return ensemble_summary(columns, confidence)
+
+@instrumented("simulation", items=len)
+def simulate_ev_sweep(packs, consumption_rates, degradation_factors, miles, seed=0, output_prefix=None,
+                      use_cache=True):
+    """
+    Sweep mode: evaluates the packs' drive cycle over a grid of consumption
+    rates, degradation factors and mileages (see ev_overlay.sweep), reusing
+    cached grid points, and saves one summary row per point. Packs are not
+    modified. Returns the summary rows.
+    """
+    from ev_overlay.fleet import FleetState
+    from ev_overlay.sweep import run_sweep
+    rows = run_sweep(
+        FleetState.from_packs(packs), consumption_rates, degradation_factors, miles, seed=seed, use_cache=use_cache
+    )
+    save_simulation_results(rows, filename=generate_output_filename(output_prefix, "parameter_sweep"))
+    return rows
+
+@instrumented("simulation", items=len)
+def simulate_ev_lifetime(packs, cycles, miles_each=100, output_prefix=None, summary_only=False):
+    """
+    Lifetime mode: advances every pack through `cycles` consecutive drive cycles
+    and streams per-cycle diagnostics (or only per-cycle summaries) to CSV.
+    Returns the per-cycle summary dicts.
+    """
+    from ev_overlay.fleet import FleetState
+    from ev_overlay.lifetime import stream_lifetime
+    fleet = FleetState.from_packs(packs)
+    kind = "lifetime_summary" if summary_only else "lifetime_diagnostics"
+    summaries = stream_lifetime(
+        fleet, cycles, generate_output_filename(output_prefix, kind),
+        miles_each=miles_each, summary_only=summary_only
+    )
+    fleet.update_packs(packs)
+    return summaries
+
+@instrumented("simulation", items=len)
+def simulate_ev_out_of_core(store_dir, cycles, miles_each=100, output_prefix=None, packs=None, size=None,
+                            seed=None, chunk_size=None):
+    """
+    Out-of-core lifetime mode: keeps pack state in a memory-mapped store
+    (see ev_overlay.fleet_store) and advances it chunk by chunk with periodic
+    checkpoints. An existing store in `store_dir` is resumed; otherwise one is
+    created from `packs` (updated in place at the end) or `size` default packs.
+    On resume, packs, size and chunk_size must match the store: packs only
+    receive the stored state, they don't replace it.
+    Writes the per-cycle summaries to CSV and returns them.
+    """
+    import os
+    from ev_overlay.fleet import FleetState
+    from ev_overlay.fleet_store import STORE_CHUNK, FleetStore, run_out_of_core
+    from ev_overlay.lifetime import SUMMARY_COLUMNS
+    if os.path.exists(os.path.join(store_dir, "manifest.json")):
+        store = FleetStore(store_dir)
+        if packs is not None and len(packs) != len(store):
+            raise ValueError(f"Store {store_dir} holds {len(store)} packs; cannot resume it with {len(packs)} packs")
+        if size is not None and size != len(store):
+            raise ValueError(f"Store {store_dir} holds {len(store)} packs, not size={size}")
+        if chunk_size is not None and chunk_size != store.chunk_size:
+            raise ValueError(f"Store {store_dir} was created with chunk_size={store.chunk_size}, not {chunk_size}")
+    elif packs is not None:
+        store = FleetStore.from_fleet(store_dir, FleetState.from_packs(packs), chunk_size or STORE_CHUNK)
+    elif size is not None:
+        store = FleetStore.create(store_dir, size, chunk_size=chunk_size or STORE_CHUNK)
+    else:
+        raise ValueError(f"No fleet store in {store_dir}: pass packs or size to create one")
+    summaries = run_out_of_core(store, cycles, miles_each, seed=seed)
+    filename = generate_output_filename(output_prefix, "lifetime_summary")
+    with open(filename, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=SUMMARY_COLUMNS)
+        writer.writeheader()
+        writer.writerows(summaries)
+    if packs is not None:
+        store.to_fleet().update_packs(packs)
+    return summaries
@@ -0,0 +1,162 @@
+"""
+sweep.py
+
+Vectorized parameter sweeps over consumption rate, degradation factor and
+miles per cycle. Every grid point sees the same per-pack random draws (common
+random numbers, from one seed), so differences between points come from the
+parameters alone, and the whole grid is evaluated by broadcasting the
+fleet's (N,) state against (G, 1) parameter columns in one pass.
+
+Each grid point's summary (and, for sweeps that keep them, its per-pack
+diagnostics) is cached on disk under a hash of its parameters, the seed and
+the input fleet, so repeated or overlapping sweeps only compute points they
+have not seen.
+
+Core Methods: run_sweep(fleet, consumption_rates, degradation_factors, miles, seed), sweep_point_key(...)
+"""
+
+import hashlib
+import itertools
+import json
+import os
+
+import numpy as np
+
+from ev_overlay.fleet import (
+    CONSUMPTION_RATE,
+    DEGRADATION_FACTOR,
+    diagnostic_columns,
+    draw_cycle_noise,
+    drive_cycle,
+)
+
+SWEEP_CACHE_DIR = "reports/.sweep_cache"
+SWEEP_BLOCK = 1 << 22  # pack-evaluations per broadcast block
+SWEEP_VERSION = 1  # bump when the drive-cycle model changes to invalidate cached points
+
+SWEEP_PARAMETERS = ("consumption_rate", "degradation_factor", "miles")
+
+
+def hash_fleet(fleet):
+    """
+    Content hash of the fleet state a sweep starts from.
+    """
+    digest = hashlib.sha256()
+    for values in (fleet.capacity_kWh, fleet.cycles):
+        digest.update(np.ascontiguousarray(values, dtype=np.float64).tobytes())
+    return digest.hexdigest()
+
+
+def sweep_point_key(consumption_rate, degradation_factor, miles, seed, fleet_hash):
+    payload = json.dumps(
+        [SWEEP_VERSION, float(consumption_rate), float(degradation_factor), float(miles), seed, fleet_hash]
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def summarize_point(columns):
+    """
+    Fleet-level figures for one grid point's diagnostics.
+    """
+    return {
+        "average_efficiency": round(float(columns["efficiency"].mean()), 4),
+        "min_efficiency": round(float(columns["efficiency"].min()), 4),
+        "average_remaining_capacity_kWh": round(float(columns["remaining_capacity_kWh"].mean()), 3),
+        "total_capacity_loss_kWh": round(float(columns["capacity_loss_kWh"].sum()), 3),
+        "total_consumed_kWh": round(float(columns["total_consumed_kWh"].sum()), 3),
+    }
+
+
+def _evaluate_block(fleet, points, noise):
+    # points: list of (consumption_rate, degradation_factor, miles) -> one (G, N) evaluation
+    params = np.array(points, dtype=np.float64)
+    consumption_rate, degradation_factor, miles = (params[:, i:i + 1] for i in range(3))
+    capacity, cycles, efficiency, capacity_loss, total_consumption = drive_cycle(
+        fleet.capacity_kWh, fleet.cycles, miles, noise, consumption_rate, degradation_factor
+    )
+    size = len(fleet)
+    miles_driven = np.broadcast_to(miles, (len(points), size))
+    total_consumption = np.broadcast_to(total_consumption, (len(points), size))
+    columns = diagnostic_columns(miles_driven, total_consumption, capacity_loss, efficiency, capacity, cycles)
+    return [{name: values[g] for name, values in columns.items()} for g in range(len(points))]
+
+
+def run_sweep(fleet, consumption_rates=(CONSUMPTION_RATE,), degradation_factors=(DEGRADATION_FACTOR,),
+              miles=(100,), seed=0, cache_dir=SWEEP_CACHE_DIR, use_cache=True, keep_columns=False):
+    """
+    Evaluates one drive cycle for the fleet at every point of the
+    consumption_rate x degradation_factor x miles grid.
+
+    A grid point at the default parameters reproduces
+    simulate_fleet(fleet, miles, np.random.default_rng(seed)) exactly.
+
+    Args:
+        fleet (FleetState): Starting state; not modified.
+        consumption_rates, degradation_factors, miles (iterable): Grid axes.
+        seed (int): Seed of the per-pack random draws shared by all points.
+        cache_dir (str): Directory of cached grid points: a .json summary per
+            point, plus a .npz of its columns for keep_columns sweeps.
+        use_cache (bool): Read and write cached points.
+        keep_columns (bool): Include each point's per-pack diagnostic columns.
+
+    Returns:
+        list: One dict per grid point with its parameters, fleet summary,
+              `cached` flag and (if keep_columns) `columns`.
+    """
+    fleet_hash = hash_fleet(fleet)
+    grid = list(itertools.product(consumption_rates, degradation_factors, miles))
+    keys = [sweep_point_key(*point, seed, fleet_hash) for point in grid]
+    results = [None] * len(grid)
+
+    pending = []
+    for i, key in enumerate(keys):
+        summary_path = os.path.join(cache_dir, f"{key}.json")
+        columns_path = os.path.join(cache_dir, f"{key}.npz")
+        if use_cache and os.path.exists(summary_path) and (not keep_columns or os.path.exists(columns_path)):
+            with open(summary_path) as f:
+                summary = json.load(f)
+            columns = None
+            if keep_columns:
+                with np.load(columns_path) as cached:
+                    columns = dict(cached)
+            results[i] = (summary, columns, True)
+        else:
+            pending.append(i)
+
+    if pending:
+        # Same draws (and draw order) as simulate_fleet, shared by every grid point
+        rng = np.random.default_rng(seed)
+        size = len(fleet)
+        rng.uniform(0.45, 0.72, size)  # restored_psi
+        rng.uniform(0.59, 0.615, size)  # restored_tension
+        noise = draw_cycle_noise(rng, size)
+        block = max(1, SWEEP_BLOCK // max(size, 1))
+        if use_cache:
+            os.makedirs(cache_dir, exist_ok=True)
+        for start in range(0, len(pending), block):
+            indices = pending[start:start + block]
+            for i, columns in zip(indices, _evaluate_block(fleet, [grid[i] for i in indices], noise)):
+                summary = summarize_point(columns)
+                if keep_columns:
+                    columns = {name: np.ascontiguousarray(values) for name, values in columns.items()}
+                else:
+                    columns = None
+                if use_cache:
+                    path = os.path.join(cache_dir, keys[i])
+                    if columns is not None:
+                        np.savez(path + ".tmp.npz", **columns)
+                        os.replace(path + ".tmp.npz", path + ".npz")
+                    with open(path + ".json.tmp", "w") as f:
+                        json.dump(summary, f)
+                    os.replace(path + ".json.tmp", path + ".json")
+                results[i] = (summary, columns, False)
+
+    rows = []
+    for point, (summary, columns, cached) in zip(grid, results):
+        row = dict(zip(SWEEP_PARAMETERS, point))
+        row.update(summary)
+        row["cached"] = cached
+        if keep_columns:
+            row["columns"] = columns
+        rows.append(row)
+    return rows
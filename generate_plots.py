@@ -1,51 +1,184 @@
 import os
-import glob
-import pandas as pd
-import matplotlib.pyplot as plt
+import hashlib
+import shutil
+import argparse
+from concurrent.futures import ProcessPoolExecutor
 
-def find_latest_csvs(reports_dir="reports"):
-    pattern = os.path.join(reports_dir, "*_simulated_pack_diagnostics_*.csv")
-    return sorted(glob.glob(pattern), key=os.path.getmtime, reverse=True)[:3]
+import matplotlib
+matplotlib.use("Agg")  # non-interactive: plots are only ever written to disk
+from matplotlib.figure import Figure
+import numpy as np
 
-def plot_simulation_results(csv_path, output_dir="reports/plots"):
+from ev_overlay.catalog import CATALOG_PATH, DIAGNOSTICS, PLOT, get_catalog
+from ev_overlay.columnar import load_diagnostics
+from ev_overlay.instrumentation import count_rows, instrumented
+from ev_overlay.pipeline import hash_file
+
+# (column, file suffix, title, y label, line style)
+PLOT_SPECS = (
+    ("efficiency", "efficiency", "Efficiency Over Drive Cycles", "Efficiency", {"marker": "o"}),
+    ("remaining_capacity_kWh", "capacity", "Remaining Capacity (kWh)", "kWh", {"marker": "s", "color": "green"}),
+    ("cycle_count", "cycle_count", "Cycle Count Per Simulation Step", "Cycles", {"marker": "x", "color": "red"}),
+)
+
+def find_latest_csvs(reports_dir="reports", limit=3):
+    """
+    Returns the most recently registered diagnostics outputs, in any saved
+    format (CSV, .npcols or .parquet), from the run catalog. limit=None
+    returns all of them.
+    """
+    return get_catalog(reports_catalog(reports_dir)).recent(DIAGNOSTICS, limit)
+
+def reports_catalog(reports_dir="reports"):
+    """
+    The run catalog database kept in reports_dir.
+    """
+    return os.path.join(reports_dir, os.path.basename(CATALOG_PATH))
+
+def hash_columns(df):
+    digest = hashlib.sha256()
+    for name, values in df.items():
+        digest.update(name.encode())
+        digest.update(np.ascontiguousarray(values).tobytes())
+    return digest.hexdigest()
+
+def _cache_marker(output_dir, name_tag):
+    return os.path.join(output_dir, f".{name_tag}.sha256")
+
+def is_cached(name_tag, content_hash, output_dir="reports/plots"):
+    """
+    True when the plots for name_tag were rendered from identical input and
+    all of them are still on disk.
+    """
+    marker = _cache_marker(output_dir, name_tag)
+    if not os.path.exists(marker):
+        return False
+    with open(marker, "r") as f:
+        cached = f.read().split()
+    if not cached or cached[0] != content_hash:
+        return False
+    return all(os.path.exists(os.path.join(output_dir, name)) for name in cached[1:])
+
+def plot_simulation_results(csv_path, output_dir="reports/plots", catalog_path=CATALOG_PATH):
+    """
+    Plots one diagnostics file, skipping the render (and the parse) when its
+    content hash matches the cached plots, and registers the plots in the
+    catalog at catalog_path. Returns True if plots were rendered.
+    """
+    name_tag = os.path.splitext(os.path.basename(csv_path))[0]
+    content_hash = hash_file(csv_path)
+    if is_cached(name_tag, content_hash, output_dir):
+        register_plots(name_tag, output_dir, csv_path, catalog_path)
+        return False
+    return plot_diagnostics(
+        load_diagnostics(csv_path), name_tag, output_dir, content_hash, source_path=csv_path, catalog_path=catalog_path
+    )
+
+def reuse_plots(source_tag, name_tag, content_hash, output_dir="reports/plots"):
+    """
+    Copies the cached plots of source_tag to name_tag when they were rendered
+    from the same content, e.g. for a pipeline stage reused from an earlier
+    run's cache. Returns True if the plots were copied.
+    """
+    if source_tag == name_tag or not is_cached(source_tag, content_hash, output_dir):
+        return False
+    with open(_cache_marker(output_dir, source_tag), "r") as f:
+        names = f.read().split()[1:]
+    written = []
+    for name in names:
+        target = name_tag + name[len(source_tag):]
+        shutil.copyfile(os.path.join(output_dir, name), os.path.join(output_dir, target))
+        written.append(target)
+    with open(_cache_marker(output_dir, name_tag), "w") as f:
+        f.write(" ".join([content_hash] + written))
+    return True
+
+def register_plots(name_tag, output_dir="reports/plots", source_path=None, catalog_path=CATALOG_PATH):
+    """
+    Records the plots of one run in the run catalog at catalog_path, linked to
+    the diagnostics file they were drawn from.
+    """
+    catalog = get_catalog(catalog_path)
+    runner = name_tag.split("_simulated_pack_diagnostics")[0]
+    run_id = name_tag.rsplit("_", 1)[-1]
+    parents = [source_path] if source_path else []
+    for _, suffix, _, _, _ in PLOT_SPECS:
+        path = os.path.join(output_dir, f"{name_tag}_{suffix}.png")
+        if os.path.exists(path):
+            catalog.register(path, runner, f"{PLOT}_{suffix}", run_id, parents=parents)
+
+@instrumented("plotting", items=count_rows, from_input=True)
+def plot_diagnostics(df, name_tag, output_dir="reports/plots", content_hash=None, source_path=None,
+                     catalog_path=CATALOG_PATH):
+    """
+    Renders the efficiency, capacity and cycle-count plots for diagnostics
+    already in memory as a dict of columns. One Agg figure is reused for all
+    metrics and dropped afterwards, so nothing accumulates in pyplot's global
+    figure registry. Rendered (or reused) plots are registered in the run
+    catalog. Returns True if plots were rendered, False on a cache hit.
+
+    The cache key is the hash of the diagnostics file (source_path) when
+    there is one, the same key plot_simulation_results checks, so plots
+    rendered in-memory by the pipeline are reused when re-plotting from disk.
+    """
     os.makedirs(output_dir, exist_ok=True)
-    df = pd.read_csv(csv_path)
-    name_tag = os.path.basename(csv_path).replace(".csv", "")
-
-    x = range(len(df))
-    if "efficiency" in df.columns:
-        plt.figure()
-        plt.plot(x, df["efficiency"], marker="o")
-        plt.title("Efficiency Over Drive Cycles")
-        plt.xlabel("Cycle #")
-        plt.ylabel("Efficiency")
-        plt.grid(True)
-        plt.savefig(f"{output_dir}/{name_tag}_efficiency.png")
-
-    if "remaining_capacity_kWh" in df.columns:
-        plt.figure()
-        plt.plot(x, df["remaining_capacity_kWh"], marker="s", color="green")
-        plt.title("Remaining Capacity (kWh)")
-        plt.xlabel("Cycle #")
-        plt.ylabel("kWh")
-        plt.grid(True)
-        plt.savefig(f"{output_dir}/{name_tag}_capacity.png")
-
-    if "cycle_count" in df.columns:
-        plt.figure()
-        plt.plot(x, df["cycle_count"], marker="x", color="red")
-        plt.title("Cycle Count Per Simulation Step")
-        plt.xlabel("Cycle #")
-        plt.ylabel("Cycles")
-        plt.grid(True)
-        plt.savefig(f"{output_dir}/{name_tag}_cycle_count.png")
-
-def generate_all_plots():
-    csv_files = find_latest_csvs()
+    if content_hash is None:
+        content_hash = hash_file(source_path) if source_path else hash_columns(df)
+    if is_cached(name_tag, content_hash, output_dir):
+        register_plots(name_tag, output_dir, source_path, catalog_path)
+        return False
+
+    x = range(len(next(iter(df.values()), [])))
+    fig = Figure()
+    written = []
+    for column, suffix, title, ylabel, style in PLOT_SPECS:
+        if column not in df:
+            continue
+        fig.clear()
+        ax = fig.add_subplot()
+        ax.plot(x, df[column], **style)
+        ax.set_title(title)
+        ax.set_xlabel("Cycle #")
+        ax.set_ylabel(ylabel)
+        ax.grid(True)
+        filename = f"{name_tag}_{suffix}.png"
+        fig.savefig(os.path.join(output_dir, filename))
+        written.append(filename)
+
+    with open(_cache_marker(output_dir, name_tag), "w") as f:
+        f.write(" ".join([content_hash] + written))
+    register_plots(name_tag, output_dir, source_path, catalog_path)
+    return True
+
+def generate_all_plots(csv_files=None, output_dir="reports/plots", workers=None, reports_dir="reports"):
+    """
+    Plots the given diagnostics files (default: the three most recent),
+    rendering in parallel worker processes when there is more than one.
+    Files are looked up in, and plots registered to, the catalog in reports_dir.
+    """
+    catalog_path = reports_catalog(reports_dir)
+    csv_files = find_latest_csvs(reports_dir) if csv_files is None else csv_files
+    workers = workers or min(len(csv_files), os.cpu_count() or 1)
     for csv_file in csv_files:
         print(f"📊 Generating plots for: {csv_file}")
-        plot_simulation_results(csv_file)
+    if workers > 1 and len(csv_files) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            rendered = list(pool.map(
+                plot_simulation_results, csv_files, [output_dir] * len(csv_files), [catalog_path] * len(csv_files)
+            ))
+    else:
+        rendered = [plot_simulation_results(csv_file, output_dir, catalog_path) for csv_file in csv_files]
+    print(f"♻️ {rendered.count(False)} of {len(csv_files)} runs unchanged, reused cached plots")
     print("✅ Plots saved to /reports/plots/")
+    return rendered
 
 if __name__ == "__main__":
-    generate_all_plots()
+    parser = argparse.ArgumentParser(description="Render diagnostics plots")
+    parser.add_argument("--all", action="store_true", help="Plot every diagnostics run, not just the latest three")
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--reports-dir", default="reports", help="Directory holding the run catalog")
+    args, _ = parser.parse_known_args()
+    generate_all_plots(
+        find_latest_csvs(args.reports_dir, limit=None) if args.all else None, workers=args.workers,
+        reports_dir=args.reports_dir
+    )
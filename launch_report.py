@@ -1,123 +1,316 @@
 import os
 import datetime
-import glob
-import subprocess
+import html
+
+from ev_overlay.catalog import DIAGNOSTICS, HEALING_INPUT, PLOT, REPORT, get_catalog
+from ev_overlay.instrumentation import instrumented
 
 PLOT_DIR = "reports/plots"
 
 OUTPUT_HTML = "launch_report.html"
+RUN_REPORTS_DIR = "reports/html"
 
-def get_latest_report_timestamp():
-    files = glob.glob("reports/run_overlay_simulated_pack_diagnostics_*.csv")
-    if not files:
-        return "Unknown"
-    latest = max(files, key=os.path.getctime)
-    ts = os.path.basename(latest).split("_")[-1].split(".")[0]
-    return ts
-
-def get_latest_plot(pattern):
-    matches = glob.glob(pattern)
-    return max(matches, key=os.path.getctime) if matches else ""
-
-def generate_html():
-    timestamp = get_latest_report_timestamp()
-    # Ensure plots are generated before report
-    subprocess.run(["python", "generate_plots.py"])
-    import pandas as pd
-    html_content = f"""<!DOCTYPE html>
+TOTAL_CELLS = 96  # known total cells count for now
+EFFICIENCY_START = 0.77  # baseline known from metadata in the factory initialization
+MILES_START = 231  # base miles per charge (example)
+
+# (runner prefix, section title)
+REPORT_SECTIONS = (
+    ("run_overlay", "Overlay Simulation Results"),
+    ("sim_runner_real", "Real Log Simulation Results"),
+    ("demo_runner_real", "Demonstration Simulation"),
+)
+
+# (plot metric, alt text, caption)
+REPORT_FIGURES = (
+    ("efficiency", "Efficiency", "Efficiency improvement across simulated drive cycles"),
+    ("capacity", "Capacity", "Remaining battery capacity over time"),
+    ("cycle_count", "Cycle Count", "Charge-discharge cycles per simulation step"),
+)
+
+HTML_HEAD = """<!DOCTYPE html>
 <html>
 <head>
     <meta charset="UTF-8">
     <meta name="viewport" content="width=device-width, initial-scale=1.0">
     <title>AXVIAM Battery Overlay – Evaluation Summary</title>
     <style>
-        body {{ font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 40px; color: #222; background-color: #f9f9f9; }}
-        h1, h2 {{ color: #2a2a2a; border-bottom: 2px solid #ccc; padding-bottom: 5px; }}
-        img {{ max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ccc; box-shadow: 2px 2px 8px rgba(0,0,0,0.1); display: block; }}
-        .section {{ margin-bottom: 50px; background: white; padding: 20px; border-radius: 6px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }}
-        figure {{ margin: 0 0 30px 0; }}
-        figcaption {{ font-size: 0.98em; color: #666; text-align: center; margin-top: 5px; }}
-        @media print {{
-            button#print-btn {{ display: none; }}
-            body {{ background: white; color: black; }}
-            .section {{ box-shadow: none; border: none; }}
-        }}
+        body { font-family: 'Segoe UI', Tahoma, Geneva, Verdana, sans-serif; margin: 40px; color: #222; background-color: #f9f9f9; }
+        h1, h2 { color: #2a2a2a; border-bottom: 2px solid #ccc; padding-bottom: 5px; }
+        img { max-width: 100%; height: auto; margin: 20px 0; border: 1px solid #ccc; box-shadow: 2px 2px 8px rgba(0,0,0,0.1); display: block; }
+        .section { margin-bottom: 50px; background: white; padding: 20px; border-radius: 6px; box-shadow: 0 1px 3px rgba(0,0,0,0.05); }
+        figure { margin: 0 0 30px 0; }
+        figcaption { font-size: 0.98em; color: #666; text-align: center; margin-top: 5px; }
+        @media print {
+            button#print-btn { display: none; }
+            body { background: white; color: black; }
+            .section { box-shadow: none; border: none; }
+        }
     </style>
 </head>
-<body>
+"""
+
+def get_latest_report_timestamp():
+    latest = get_catalog().latest_record("run_overlay", DIAGNOSTICS)
+    if latest is None or not latest["run_id"]:
+        return "Unknown"
+    return latest["run_id"]
+
+def get_latest_plot(runner, metric):
+    return get_catalog().latest(runner, f"{PLOT}_{metric}", default="")
+
+def get_run_plot(runner, metric, run_id):
+    return get_catalog().find(runner, f"{PLOT}_{metric}", run_id, default="")
+
+def evaluation_summary(healed_cells, efficiency_end, input_file, metadata_path="metadata.json"):
+    """
+    Evaluation summary figures for one run, from already-computed results.
+
+    Args:
+        healed_cells (int): Converted healing records in the run's input.
+        efficiency_end (float): Average overlay efficiency (None keeps the baseline).
+        input_file (str): Converted input the run used.
+
+    Returns:
+        dict: total/healed cells, efficiency and miles-per-charge start/end,
+              factory signature and input file name.
+    """
+    from ev_overlay.factory_init import initialize_factory_pack
+
+    if efficiency_end is None:
+        efficiency_end = EFFICIENCY_START
+    # Signatures use a stable hash, so this matches the run_overlay factory imprint
+    imprint = initialize_factory_pack("default_pack", metadata_path)["symbolic_imprint"]
+    return {
+        "total_cells": TOTAL_CELLS,
+        "healed_cells": healed_cells,
+        "efficiency_start": EFFICIENCY_START,
+        "efficiency_end": efficiency_end,
+        "miles_start": MILES_START,
+        # Estimate end miles per charge by ratio of efficiency gain
+        "miles_end": round(MILES_START * (efficiency_end / EFFICIENCY_START)),
+        "signature": imprint["signature"].replace("-", " "),
+        "input_file": os.path.basename(input_file) if input_file else "Unknown"
+    }
+
+def stored_run_metrics(run_id, store=None):
+    """
+    Collects a run's evaluation summary and per-runner analysis from the
+    results store, falling back to the run's diagnostics files for runs
+    that were never loaded into the store.
+
+    Returns:
+        tuple: (summary dict, {runner: analysis dict})
+    """
+    from ev_overlay.results_store import ResultsStore
+
+    if store is None:
+        with ResultsStore() as store:
+            return stored_run_metrics(run_id, store)
+
+    catalog = get_catalog()
+    runner_metrics = {}
+    for runner, _ in REPORT_SECTIONS:
+        metrics = store.summary(runner, run_id)
+        if metrics is None:
+            path = catalog.find(runner, DIAGNOSTICS, run_id)
+            metrics = _file_metrics(path) if path else None
+        if metrics is not None:
+            runner_metrics[runner] = metrics
+
+    input_file = catalog.find("convert", HEALING_INPUT, run_id)
+    # Runs without stored healing data fall back to counting the input file's records
+    healing = store.healing_summary("convert", run_id) or {}
+    healed_cells = healing.get("records") or _count_healing_records(input_file)
+    overlay = runner_metrics.get("run_overlay", {})
+    summary = evaluation_summary(healed_cells, overlay.get("average_efficiency"), input_file)
+    return summary, runner_metrics
+
+def _file_metrics(path):
+    from ev_overlay.analyzer import EfficiencyAccumulator
+    from ev_overlay.columnar import load_diagnostics
+
+    return EfficiencyAccumulator().update_columns(load_diagnostics(path)).summary()
+
+def _count_healing_records(path):
+    if not path:
+        return None
+    import json
+    with open(path, "r") as f:
+        return len(json.load(f))
+
+def _format_metric(value, digits=3):
+    if value is None:
+        return "n/a"
+    return f"{value:.{digits}f}" if isinstance(value, float) else str(value)
+
+def render_report(run_id, summary, runner_plots, runner_metrics=None, base_dir="."):
+    """
+    Renders one evaluation report as an HTML string.
+
+    Args:
+        run_id (str): Run timestamp shown in the header.
+        summary (dict): From evaluation_summary().
+        runner_plots (dict): {runner: {metric: plot path}}.
+        runner_metrics (dict): {runner: analysis dict} shown under each section.
+        base_dir (str): Directory the HTML is written to; image paths are made relative to it.
+    """
+    runner_metrics = runner_metrics or {}
+    parts = [HTML_HEAD, f"""<body>
     <button id="print-btn" onclick="window.print()">Export to PDF</button>
     <h1>AXVIAM Evaluation Report</h1>
     <p>This report summarizes simulation and diagnostic evaluations performed on EV battery packs using AXVIAM’s healing overlay system.</p>
-    <p><strong>Run Timestamp:</strong> {timestamp}</p>
+    <p><strong>Run Timestamp:</strong> {html.escape(str(run_id))}</p>
 
     <div class="section">
         <h2>Evaluation Summary</h2>
         <ul>
-            <li><strong>Analyzed Cells:</strong> 96</li>
-            <li><strong>Healed Cells:</strong> 20 (from real-world log)</li>
-            <li><strong>Avg Efficiency Gain:</strong> from 0.77 → 0.985</li>
-            <li><strong>Miles per Charge:</strong> estimated 231 → 295 mi</li>
-            <li><strong>Signature:</strong> ψₐ:8356 ∇̃:5 Ω</li>
-            <li><strong>Input File:</strong> converted_healing_input_20250710-032042.json</li>
+            <li><strong>Analyzed Cells:</strong> {summary['total_cells']}</li>
+            <li><strong>Healed Cells:</strong> {_format_metric(summary['healed_cells'])} (from real-world log)</li>
+            <li><strong>Avg Efficiency Gain:</strong> from {summary['efficiency_start']:.2f} → {summary['efficiency_end']:.3f}</li>
+            <li><strong>Miles per Charge:</strong> estimated {summary['miles_start']} → {summary['miles_end']} mi</li>
+            <li><strong>Signature:</strong> {html.escape(summary['signature'])}</li>
+            <li><strong>Input File:</strong> {html.escape(summary['input_file'])}</li>
         </ul>
     </div>
-
+"""]
+    for runner, title in REPORT_SECTIONS:
+        plots = runner_plots.get(runner, {})
+        parts.append(f"""
     <div class="section">
-        <h2>Overlay Simulation Results</h2>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/run_overlay_simulated_pack_diagnostics_*_efficiency.png')}" alt="Efficiency">
-          <figcaption>Efficiency improvement across simulated drive cycles</figcaption>
+        <h2>{title}</h2>
+""")
+        metrics = runner_metrics.get(runner)
+        if metrics and "average_efficiency" in metrics:
+            parts.append(
+                f"        <p>Average efficiency {_format_metric(metrics.get('average_efficiency'))} · "
+                f"{_format_metric(metrics.get('total_miles_driven'), 0)} miles · "
+                f"capacity loss {_format_metric(metrics.get('total_capacity_loss_kWh'))} kWh · "
+                f"remaining {_format_metric(metrics.get('average_remaining_capacity_kWh'))} kWh</p>\n"
+            )
+        for metric, alt, caption in REPORT_FIGURES:
+            path = plots.get(metric, "")
+            src = os.path.relpath(path, base_dir) if path else ""
+            parts.append(f"""        <figure>
+          <img src="{html.escape(src)}" alt="{alt}">
+          <figcaption>{caption}</figcaption>
         </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/run_overlay_simulated_pack_diagnostics_*_capacity.png')}" alt="Capacity">
-          <figcaption>Remaining battery capacity over time</figcaption>
-        </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/run_overlay_simulated_pack_diagnostics_*_cycle_count.png')}" alt="Cycle Count">
-          <figcaption>Charge-discharge cycles per simulation step</figcaption>
-        </figure>
-    </div>
-
-    <div class="section">
-        <h2>Real Log Simulation Results</h2>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/sim_runner_real_simulated_pack_diagnostics_*_efficiency.png')}" alt="Efficiency">
-          <figcaption>Efficiency improvement across simulated drive cycles</figcaption>
-        </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/sim_runner_real_simulated_pack_diagnostics_*_capacity.png')}" alt="Capacity">
-          <figcaption>Remaining battery capacity over time</figcaption>
-        </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/sim_runner_real_simulated_pack_diagnostics_*_cycle_count.png')}" alt="Cycle Count">
-          <figcaption>Charge-discharge cycles per simulation step</figcaption>
-        </figure>
-    </div>
-
-    <div class="section">
-        <h2>Demonstration Simulation</h2>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/demo_runner_real_simulated_pack_diagnostics_*_efficiency.png')}" alt="Efficiency">
-          <figcaption>Efficiency improvement across simulated drive cycles</figcaption>
-        </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/demo_runner_real_simulated_pack_diagnostics_*_capacity.png')}" alt="Capacity">
-          <figcaption>Remaining battery capacity over time</figcaption>
-        </figure>
-        <figure>
-          <img src="{get_latest_plot('reports/plots/demo_runner_real_simulated_pack_diagnostics_*_cycle_count.png')}" alt="Cycle Count">
-          <figcaption>Charge-discharge cycles per simulation step</figcaption>
-        </figure>
-    </div>
-    <footer style="margin-top: 60px; font-size: 0.9em; color: #777;">
+""")
+        parts.append("    </div>\n")
+    parts.append(f"""    <footer style="margin-top: 60px; font-size: 0.9em; color: #777;">
         <p>AXVIAM Technology © {datetime.datetime.now().year} – All simulations are illustrative.</p>
     </footer>
 </body>
 </html>
-"""
-    with open(OUTPUT_HTML, "w") as f:
+""")
+    return "".join(parts)
+
+@instrumented("reporting")
+def generate_html(regenerate_plots=True, summary=None, runner_metrics=None, run_id=None, output_html=OUTPUT_HTML):
+    """
+    Builds the evaluation report in-process.
+
+    Args:
+        regenerate_plots (bool): Render missing or stale plots for the latest
+            diagnostics first; plots whose content hash is unchanged are reused.
+        summary (dict): From evaluation_summary(); read from the results store when omitted.
+        runner_metrics (dict): {runner: analysis dict} from the runners; read
+            from the results store when omitted.
+        run_id (str): Run to report, with that run's plots (default: the
+            latest overlay run, with each runner's latest plots).
+    """
+    catalog = get_catalog()
+    if run_id is None:
+        run_id = get_latest_report_timestamp()
+        find_diagnostics = lambda runner: catalog.latest(runner, DIAGNOSTICS)
+        find_plot = get_latest_plot
+    else:
+        find_diagnostics = lambda runner: catalog.find(runner, DIAGNOSTICS, run_id)
+        find_plot = lambda runner, metric: get_run_plot(runner, metric, run_id)
+    if regenerate_plots:
+        from generate_plots import plot_simulation_results
+        for runner, _ in REPORT_SECTIONS:
+            path = find_diagnostics(runner)
+            if path:
+                plot_simulation_results(path, PLOT_DIR)
+    if summary is None or runner_metrics is None:
+        stored_summary, stored_metrics = stored_run_metrics(run_id)
+        summary = summary or stored_summary
+        runner_metrics = runner_metrics if runner_metrics is not None else stored_metrics
+
+    runner_plots = {
+        runner: {metric: find_plot(runner, metric) for metric, _, _ in REPORT_FIGURES}
+        for runner, _ in REPORT_SECTIONS
+    }
+    html_content = render_report(run_id, summary, runner_plots, runner_metrics, os.path.dirname(output_html) or ".")
+    with open(output_html, "w") as f:
         f.write(html_content)
-    print(f"✅ HTML report generated at {OUTPUT_HTML}")
+    plots = [path for metrics in runner_plots.values() for path in metrics.values() if path]
+    catalog.register(output_html, "report", REPORT, run_id, parents=plots)
+    print(f"✅ HTML report generated at {output_html}")
+    return output_html
+
+@instrumented("reporting")
+def build_run_reports(run_ids=None, output_dir=RUN_REPORTS_DIR, render_plots=True, workers=None):
+    """
+    Renders one HTML report per historical run in a single pass, plus an
+    index page. Plots are rendered only where cached assets are missing or
+    stale (in worker processes when there are many); metrics come from the
+    results store.
+
+    Args:
+        run_ids (list): Runs to build (default: every cataloged run).
+
+    Returns:
+        list: Written report paths, index first.
+    """
+    from ev_overlay.results_store import ResultsStore
+
+    catalog = get_catalog()
+    runs = catalog.runs(DIAGNOSTICS)
+    run_ids = [run_id for run_id in (run_ids or list(runs)) if run_id in runs]
+    os.makedirs(output_dir, exist_ok=True)
+
+    if render_plots and run_ids:
+        from generate_plots import generate_all_plots
+        generate_all_plots([path for run_id in run_ids for path in runs[run_id].values()], PLOT_DIR, workers=workers)
+
+    written = []
+    rows = []
+    with ResultsStore() as store:
+        metrics = {run_id: stored_run_metrics(run_id, store) for run_id in run_ids}
+    for run_id in run_ids:
+        summary, runner_metrics = metrics[run_id]
+        runner_plots = {
+            runner: {metric: get_run_plot(runner, metric, run_id) for metric, _, _ in REPORT_FIGURES}
+            for runner in runs[run_id]
+        }
+        path = os.path.join(output_dir, f"report_{run_id}.html")
+        with open(path, "w") as f:
+            f.write(render_report(run_id, summary, runner_plots, runner_metrics, output_dir))
+        plots = [plot for metrics in runner_plots.values() for plot in metrics.values() if plot]
+        catalog.register(path, "report", REPORT, run_id, parents=plots + list(runs[run_id].values()))
+        written.append(path)
+        rows.append(
+            f'            <li><a href="{os.path.basename(path)}">{run_id}</a> – efficiency '
+            f"{_format_metric(summary['efficiency_end'])}, {_format_metric(summary['healed_cells'])} healed cells</li>"
+        )
+
+    index = os.path.join(output_dir, "index.html")
+    with open(index, "w") as f:
+        f.write(HTML_HEAD + "<body>\n    <h1>AXVIAM Evaluation Runs</h1>\n    <div class=\"section\">\n        <ul>\n"
+                + "\n".join(rows) + "\n        </ul>\n    </div>\n</body>\n</html>\n")
+    print(f"✅ {len(written)} run reports generated in {output_dir}/")
+    return [index] + written
 
 if __name__ == "__main__":
-    generate_html()
\ No newline at end of file
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the AXVIAM HTML evaluation report")
+    parser.add_argument("--all-runs", action="store_true", help=f"Build a report for every cataloged run into {RUN_REPORTS_DIR}/")
+    parser.add_argument("--workers", type=int, default=None, help="Plot rendering processes for --all-runs")
+    args, _ = parser.parse_known_args()
+    if args.all_runs:
+        build_run_reports(workers=args.workers)
+    else:
+        generate_html()
@@ -0,0 +1,102 @@
+import argparse
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+# Local load generator for the telemetry ingestion service (ev_overlay/service.py)
+
+
+def make_batch(rng, packs, cells, batch_size):
+    return {
+        "samples": [
+            {
+                "pack_id": f"pack_{rng.randrange(packs):05d}",
+                "cell_id": rng.randrange(cells),
+                "voltage": round(rng.uniform(3.4, 4.1), 3),
+                "temperature": round(rng.uniform(22.0, 38.0), 1),
+            }
+            for _ in range(batch_size)
+        ]
+    }
+
+
+def run_load(url, requests_total, batch_size, concurrency, packs=1000, cells=96, seed=0):
+    """
+    POSTs `requests_total` telemetry batches from `concurrency` threads and
+    measures per-request latency. 503 responses (backpressure) are retried
+    after the server's Retry-After and counted separately; a request's
+    latency runs from its first attempt to its accepted response.
+
+    Returns:
+        dict: throughput and latency percentiles.
+    """
+    local = threading.local()
+    latencies = []
+    rejected = [0]
+    lock = threading.Lock()
+    payloads = [
+        json.dumps(make_batch(random.Random(seed + i), packs, cells, batch_size))
+        for i in range(min(requests_total, 64))
+    ]
+
+    def send(i):
+        session = getattr(local, "session", None)
+        if session is None:
+            session = local.session = requests.Session()
+        body = payloads[i % len(payloads)]
+        # Latency spans every attempt, including time spent backing off on 503s
+        start = time.perf_counter()
+        while True:
+            response = session.post(f"{url}/telemetry", data=body, headers={"Content-Type": "application/json"})
+            if response.status_code != 503:
+                break
+            with lock:
+                rejected[0] += 1
+            time.sleep(float(response.headers.get("Retry-After", 1)))
+        elapsed = time.perf_counter() - start
+        response.raise_for_status()
+        with lock:
+            latencies.append(elapsed)
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(send, range(requests_total)))
+    duration = time.perf_counter() - started
+
+    latency_ms = np.array(latencies) * 1000
+
+    def percentile(q):
+        # None when no request was sent (requests_total=0)
+        return round(float(np.percentile(latency_ms, q)), 2) if latency_ms.size else None
+
+    return {
+        "requests": requests_total,
+        "samples": requests_total * batch_size,
+        "duration_s": round(duration, 3),
+        "requests_per_s": round(requests_total / duration, 1),
+        "samples_per_s": round(requests_total * batch_size / duration, 1),
+        "latency_p50_ms": percentile(50),
+        "latency_p99_ms": percentile(99),
+        "latency_max_ms": percentile(100),
+        "backpressure_retries": rejected[0],
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load-test the AXVIAM telemetry ingestion service")
+    parser.add_argument("--url", default="http://127.0.0.1:8000")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--batch-size", type=int, default=100)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--packs", type=int, default=1000)
+    args = parser.parse_args()
+
+    print(f"🚦 Sending {args.requests} batches of {args.batch_size} samples to {args.url}...")
+    result = run_load(args.url, args.requests, args.batch_size, args.concurrency, packs=args.packs)
+    print("📊 Load test result:", result)
+    print("🩺 Server stats:", requests.get(f"{args.url}/stats").json())
@@ -1,191 +1,257 @@
 import os
-import subprocess
 from datetime import datetime
 import webbrowser
-import pandas as pd
+from ev_overlay import instrumentation
+from ev_overlay.catalog import BMS_LOG, DIAGNOSTICS, HEALING_INPUT, get_catalog
+from ev_overlay.results_store import ResultsStore
 
 # One-click master runner for AXVIAM EV Battery Overlay
 
-def run_command(command, label):
-    print(f"\n🔹 {label}...")
-    result = subprocess.run(command, shell=True, text=True, capture_output=True)
-    print(result.stdout)
-    if result.stderr:
-        print(f"⚠️ {label} Error:\n{result.stderr}")
-
-
-def print_summary(csv_files):
+def print_summary(store, runners):
     print("\n📈 Summary of Latest AXVIAM Evaluation Outputs:")
-    for csv_file in csv_files:
-        path = os.path.join("reports", csv_file)
-        if not os.path.exists(path):
-            print(f"⚠️ File not found: {csv_file}")
+    for runner in runners:
+        # Aggregated in SQL over the runner's latest stored run
+        summary = store.summary(runner)
+        if summary is None:
+            print(f"⚠️ No stored results for: {runner}")
             continue
-        df = pd.read_csv(path)
-        avg_eff = None
-        total_miles = None
-        total_capacity_loss = None
-        avg_remaining_capacity = None
-        # Attempt to read metrics if columns exist
-        if "efficiency" in df.columns:
-            avg_eff = df["efficiency"].mean()
-        if "miles_driven" in df.columns:
-            total_miles = df["miles_driven"].sum()
-        if "capacity_loss_kWh" in df.columns:
-            total_capacity_loss = df["capacity_loss_kWh"].sum()
-        if "remaining_capacity_kWh" in df.columns:
-            avg_remaining_capacity = df["remaining_capacity_kWh"].mean()
-
-        print(f"\n- {csv_file}:")
+        avg_eff = summary["average_efficiency"]
+        total_miles = summary["total_miles_driven"]
+        total_capacity_loss = summary["total_capacity_loss_kWh"]
+        avg_remaining_capacity = summary["average_remaining_capacity_kWh"]
+
+        print(f"\n- {runner}_simulated_pack_diagnostics_{summary['run_id']}:")
         if avg_eff is not None:
             print(f"  • Average Efficiency: {avg_eff:.3f}")
         if total_miles is not None:
-            print(f"  • Total Miles Driven: {total_miles}")
+            print(f"  • Total Miles Driven: {total_miles:g}")
         if total_capacity_loss is not None:
             print(f"  • Total Capacity Loss (kWh): {total_capacity_loss:.3f}")
         if avg_remaining_capacity is not None:
             print(f"  • Average Remaining Capacity (kWh): {avg_remaining_capacity:.3f}")
 
-def print_evaluation_summary():
-    import json
-    import os
-
-    summary_file = None
+def print_evaluation_summary(store):
+    catalog = get_catalog()
     # Find the latest converted healing input json
-    candidates = [f for f in os.listdir("reports") if f.startswith("converted_healing_input_") and f.endswith(".json")]
-    if candidates:
-        summary_file = sorted(candidates)[-1]
+    summary_path = catalog.latest("convert", HEALING_INPUT)
+    healing = store.healing_summary("convert")
 
-    if summary_file is None:
+    if summary_path is None or healing is None:
         print("\n⚠️ Evaluation Summary: No converted healing input file found.")
         return
 
-    summary_path = os.path.join("reports", summary_file)
-    try:
-        with open(summary_path, "r") as f:
-            data = json.load(f)
-    except Exception as e:
-        print(f"\n⚠️ Evaluation Summary: Failed to load {summary_file}: {e}")
-        return
-
-    # Extract summary info
-    total_cells = 96  # hardcoded known total cells count for now
-    healed_cells = len(data) if isinstance(data, list) else 0
-    avg_efficiency_start = 0.77  # baseline known from metadata in the factory initialization (hardcoded)
-    avg_efficiency_end = None
-    input_file = summary_file
-
-    # Try to read the final efficiency from the CSVs
-    # Prefer run_overlay CSV (latest)
-    import pandas as pd
-    overlay_csv_candidates = [f for f in os.listdir("reports") if f.startswith("run_overlay_simulated_pack_diagnostics_") and f.endswith(".csv")]
-    if overlay_csv_candidates:
-        overlay_csv = sorted(overlay_csv_candidates)[-1]
-        try:
-            df = pd.read_csv(os.path.join("reports", overlay_csv))
-            if "efficiency" in df.columns:
-                avg_efficiency_end = df["efficiency"].mean()
-        except Exception:
-            pass
-
-    if avg_efficiency_end is None:
-        avg_efficiency_end = avg_efficiency_start
-
-    # Approximate miles per charge based on capacity and efficiency
-    # Base miles per charge start at 231 (arbitrary example)
-    miles_start = 231
-    # Estimate end miles per charge by ratio of efficiency gain
-    miles_end = round(miles_start * (avg_efficiency_end / avg_efficiency_start))
-
-    # Construct symbolic signature (placeholder, can be read from factory metadata file or hardcoded)
-    signature = "ψₐ:8356 ∇̃:5 Ω"  # for now hardcoded to last run_overlay signature
+    # Final efficiency from the latest stored run_overlay diagnostics
+    from launch_report import evaluation_summary
+    overlay = store.summary("run_overlay")
+    summary = evaluation_summary(
+        healing["records"], overlay["average_efficiency"] if overlay else None, summary_path, METADATA_PATH
+    )
 
     print("\n📋 Evaluation Summary")
-    print(f"  Analyzed Cells: {total_cells}")
-    print(f"  Healed Cells: {healed_cells} (from real-world log)")
-    print(f"  Avg Efficiency Gain: from {avg_efficiency_start:.3f} → {avg_efficiency_end:.3f}")
-    print(f"  Miles per Charge: estimated {miles_start} → {miles_end} mi")
-    print(f"  Signature: {signature}")
-    print(f"  Input File: {input_file}")
+    print(f"  Analyzed Cells: {summary['total_cells']}")
+    print(f"  Healed Cells: {summary['healed_cells']} (from real-world log)")
+    print(f"  Avg Efficiency Gain: from {summary['efficiency_start']:.3f} → {summary['efficiency_end']:.3f}")
+    print(f"  Miles per Charge: estimated {summary['miles_start']} → {summary['miles_end']} mi")
+    print(f"  Signature: {summary['signature']}")
+    print(f"  Input File: {summary['input_file']}")
     print()
 
 
-def main():
-    print("\n🚀 AXVIAM One-Click Evaluation Runner")
-    timestamp = "latest"
-
-    # Clean old outputs (except previous zip bundles)
-    print("🧹 Cleaning old evaluation outputs...")
-    for folder in ["reports", "reports/plots"]:
-        for fname in os.listdir(folder):
-            fpath = os.path.join(folder, fname)
-            if os.path.isfile(fpath) and not fname.endswith(".zip"):
-                os.remove(fpath)
+BMS_LOG_PATH = "real_input/sample_bms_log.json"
+METADATA_PATH = "metadata.json"
 
-    # Step 1: Convert real-world BMS log to healing format
-    run_command("python convert_bms_log.py --output_suffix latest", "Converting BMS log")
 
-    # Step 2: Run full overlay process with converted healing data
-    run_command("python run_overlay.py --output_suffix latest", "Running AXVIAM overlay")
-
-    # Step 3: Run simulation using the real-world converted input
-    run_command("python sim_runner.py --output_suffix latest", "Running Simulation Runner")
+def build_pipeline(run_timestamp, use_cache=True, store=None):
+    """
+    Declares the evaluation DAG. Conversion feeds the overlay and demo
+    runners; the real-log runner is independent, so all three runners
+    execute concurrently. Plotting and the HTML report run in-process on
+    the runners' in-memory results. Each stage's outputs are registered in
+    the run catalog and its healing records or diagnostics bulk-loaded into
+    the results store under this run_timestamp, including stages reused
+    from cache.
+    """
+    import shutil
+    from convert_bms_log import convert_json_to_healing_format
+    from run_overlay import run_overlay
+    from sim_runner import load_simulation_log, run_sim
+    from demo_runner import run_demo
+    from generate_plots import plot_diagnostics, reuse_plots
+    from launch_report import evaluation_summary, generate_html, OUTPUT_HTML
+    from ev_overlay.columnar import records_to_columns
+    from ev_overlay.pipeline import Pipeline, Stage, hash_file
+
+    catalog = get_catalog()
+    store = store or ResultsStore()
+    published = {}
+
+    def with_latest(path, latest):
+        shutil.copyfile(path, latest)
+        return [path, latest]
+
+    def diagnostics_path(prefix):
+        return f"reports/{prefix}_simulated_pack_diagnostics_{run_timestamp}.csv"
+
+    def publish(result, output, latest):
+        # Stage results reused from an earlier run's cache point at that run's
+        # file; copy it so every run has its own timestamped outputs
+        source = result["artifacts"][0]
+        if os.path.normpath(source) != os.path.normpath(output):
+            shutil.copyfile(source, output)
+        return dict(result, artifacts=with_latest(output, latest), source_artifact=source)
+
+    # Stage bodies compute and are cached; the publish_* steps run on every
+    # run (cache hit or not) so this run_timestamp always reaches the catalog
+    # and the results store
+    def convert():
+        output = f"reports/converted_healing_input_{run_timestamp}.json"
+        healing_data = convert_json_to_healing_format(BMS_LOG_PATH, output)
+        return {"healing_data": healing_data, "artifacts": [output]}
+
+    def publish_convert(result):
+        output = f"reports/converted_healing_input_{run_timestamp}.json"
+        result = publish(result, output, "reports/converted_healing_input_latest.json")
+        catalog.register(BMS_LOG_PATH, "input", BMS_LOG)
+        catalog.register(output, "convert", HEALING_INPUT, run_timestamp, parents=[BMS_LOG_PATH])
+        store.insert_healing("convert", run_timestamp, result["healing_data"])
+        published["convert"] = output
+        return result
+
+    def publish_runner(prefix, parents):
+        def after(result):
+            output = diagnostics_path(prefix)
+            result = publish(result, output, f"reports/{prefix}_simulated_pack_diagnostics_latest.csv")
+            catalog.register(output, prefix, DIAGNOSTICS, run_timestamp, parents=parents())
+            store.insert_diagnostics(prefix, run_timestamp, result["simulation"])
+            print("📊 Efficiency analysis:", result["analysis"])
+            return result
+        return after
+
+    def overlay(convert):
+        output = diagnostics_path("run_overlay")
+        result = run_overlay([dict(entry) for entry in convert["healing_data"]], METADATA_PATH, output)
+        result["artifacts"] = [output]
+        return result
+
+    def sim():
+        output = diagnostics_path("sim_runner_real")
+        result = run_sim(load_simulation_log(BMS_LOG_PATH), output)
+        result["artifacts"] = [output]
+        return result
+
+    def demo(convert):
+        output = diagnostics_path("demo_runner_real")
+        result = run_demo(convert["healing_data"], METADATA_PATH, output)
+        result["artifacts"] = [output]
+        return result
+
+    def plots(overlay, sim, demo):
+        artifacts = []
+        for result in (overlay, sim, demo):
+            source = result["artifacts"][0]
+            name_tag = os.path.splitext(os.path.basename(source))[0]
+            content_hash = hash_file(source)
+            # A runner reused from cache: its earlier run's plots are still valid
+            reuse_plots(
+                os.path.splitext(os.path.basename(result["source_artifact"]))[0], name_tag, content_hash
+            )
+            plot_diagnostics(
+                records_to_columns(result["simulation"]), name_tag, content_hash=content_hash, source_path=source
+            )
+            artifacts.extend(
+                f"reports/plots/{name_tag}_{metric}.png" for metric in ("efficiency", "capacity", "cycle_count")
+            )
+        print("✅ Plots saved to /reports/plots/")
+        return {"artifacts": artifacts}
+
+    def report(plots, convert, overlay, sim, demo):
+        # Metrics come straight from the runners' analysis results
+        summary = evaluation_summary(
+            len(convert["healing_data"]), overlay["analysis"].get("average_efficiency"),
+            convert["artifacts"][0], METADATA_PATH
+        )
+        runner_metrics = {
+            "run_overlay": overlay["analysis"],
+            "sim_runner_real": sim["analysis"],
+            "demo_runner_real": demo["analysis"],
+        }
+        generate_html(regenerate_plots=False, summary=summary, runner_metrics=runner_metrics, run_id=run_timestamp)
+        return {"artifacts": [OUTPUT_HTML]}
+
+    def converted():
+        return [published["convert"]]
+
+    # plots and report name this run's files, so they always run; the plot
+    # cache still skips unchanged renders
+    return Pipeline([
+        Stage("convert", convert, input_files=[BMS_LOG_PATH], label="Converting BMS log", after=publish_convert),
+        Stage("overlay", overlay, deps=["convert"], input_files=[METADATA_PATH], label="Running AXVIAM overlay",
+              after=publish_runner("run_overlay", converted)),
+        Stage("sim", sim, input_files=[BMS_LOG_PATH], label="Running Simulation Runner",
+              after=publish_runner("sim_runner_real", lambda: [BMS_LOG_PATH])),
+        Stage("demo", demo, deps=["convert"], input_files=[METADATA_PATH], label="Running Demo Runner",
+              after=publish_runner("demo_runner_real", converted)),
+        Stage("plots", plots, deps=["overlay", "sim", "demo"], label="Generating Output Visuals", cacheable=False),
+        Stage("report", report, deps=["plots", "convert", "overlay", "sim", "demo"],
+              label="Generating HTML Output Summary", cacheable=False),
+    ], use_cache=use_cache)
 
-    # Step 4: Run demo with factory healing example
-    run_command("python demo_runner.py --output_suffix latest", "Running Demo Runner")
-    
-    run_command("python generate_plots.py --output_suffix latest", "Generating Output Visuals")
 
-    latest_csvs = [
-        "reports/demo_runner_real_simulated_pack_diagnostics_latest.csv",
-        "reports/sim_runner_real_simulated_pack_diagnostics_latest.csv",
-        "reports/run_overlay_simulated_pack_diagnostics_latest.csv"
-    ]
-    # update_command = f"python update_readme_summary.py {' '.join(latest_csvs)}"
-    # run_command(update_command, "Updating README summary")
-    run_command("python launch_report.py", "Generating HTML Output Summary")
+def main():
+    import argparse
+    import zipfile
 
-    # Copy latest timestamped outputs to _latest versions
-    import shutil
-    def copy_latest(source_pattern, target_latest):
-        matches = [f for f in os.listdir("reports") if (f.startswith(source_pattern) and (f.endswith(".csv") or f.endswith(".json")))]
-        if matches:
-            latest_file = sorted(matches)[-1]
-            shutil.copyfile(os.path.join("reports", latest_file), os.path.join("reports", target_latest))
+    parser = argparse.ArgumentParser(description="AXVIAM one-click evaluation")
+    parser.add_argument("--clean", action="store_true", help="Remove previous outputs and rerun every stage")
+    parser.add_argument("--instrument", action="store_true", help="Record per-stage timing and memory metrics")
+    args, _ = parser.parse_known_args()
+    if args.instrument:
+        instrumentation.enable()
 
-    copy_latest("converted_healing_input_", "converted_healing_input_latest.json")
-    copy_latest("demo_runner_real_simulated_pack_diagnostics_", "demo_runner_real_simulated_pack_diagnostics_latest.csv")
-    copy_latest("sim_runner_real_simulated_pack_diagnostics_", "sim_runner_real_simulated_pack_diagnostics_latest.csv")
-    copy_latest("run_overlay_simulated_pack_diagnostics_", "run_overlay_simulated_pack_diagnostics_latest.csv")
+    print("\n🚀 AXVIAM One-Click Evaluation Runner")
+    run_timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    os.makedirs("reports/plots", exist_ok=True)
+
+    if args.clean:
+        # Clean old outputs (except previous zip bundles)
+        print("🧹 Cleaning old evaluation outputs...")
+        for folder in ["reports", "reports/plots"]:
+            for fname in os.listdir(folder):
+                fpath = os.path.join(folder, fname)
+                if os.path.isfile(fpath) and not fname.endswith(".zip"):
+                    os.remove(fpath)
+
+    # Steps 1-6: conversion, runners, plots and HTML report, in-process
+    store = ResultsStore()
+    pipeline = build_pipeline(run_timestamp, use_cache=not args.clean, store=store)
+    pipeline.run()
+    if pipeline.skipped:
+        print(f"\n⏭️ Reused cached stages: {', '.join(pipeline.skipped)}")
+    metrics_files = instrumentation.export_run_metrics("evaluation", run_timestamp)
 
     # Step 7: Zip the latest evaluation outputs
-    zip_name = f"evaluation_bundle_{datetime.now().strftime('%Y%m%d-%H%M%S')}.zip"
-    zip_command = (
-        f"zip -r {zip_name} "
-        f"reports/converted_healing_input_latest.json "
-        f"reports/demo_runner_real_simulated_pack_diagnostics_latest.csv "
-        f"reports/sim_runner_real_simulated_pack_diagnostics_latest.csv "
-        f"reports/run_overlay_simulated_pack_diagnostics_latest.csv "
-        f"reports/plots/*.png "
-        f"launch_report.html"
-    )
-    run_command(zip_command, f"Creating evaluation snapshot: {zip_name}")
+    zip_name = f"evaluation_bundle_{run_timestamp}.zip"
+    print(f"\n🔹 Creating evaluation snapshot: {zip_name}...")
+    bundle = [
+        "reports/converted_healing_input_latest.json",
+        "reports/demo_runner_real_simulated_pack_diagnostics_latest.csv",
+        "reports/sim_runner_real_simulated_pack_diagnostics_latest.csv",
+        "reports/run_overlay_simulated_pack_diagnostics_latest.csv",
+        "launch_report.html",
+    ] + pipeline.results["plots"]["artifacts"] + metrics_files
+    with zipfile.ZipFile(zip_name, "w", zipfile.ZIP_DEFLATED) as bundle_zip:
+        for path in bundle:
+            if os.path.exists(path):
+                bundle_zip.write(path)
 
     # --- Summary Report ---
-    import pandas as pd
-
-    print_summary([
-        "demo_runner_real_simulated_pack_diagnostics_latest.csv",
-        "sim_runner_real_simulated_pack_diagnostics_latest.csv",
-        "run_overlay_simulated_pack_diagnostics_latest.csv"
-    ])
+    print_summary(store, ["demo_runner_real", "sim_runner_real", "run_overlay"])
 
-    print_evaluation_summary()
+    print_evaluation_summary(store)
 
     print("\n✅ All AXVIAM tests complete. Review output files in /reports.")
 
     # Automatically open the HTML summary report in the default web browser
-    import webbrowser
     report_path = os.path.abspath("launch_report.html")
     try:
         browser = webbrowser.get()
@@ -1,31 +1,47 @@
 import os
 import sys
-import csv
-import glob
 import json
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "ev_overlay"))
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "engine"))
 from ev_overlay.factory_init import initialize_factory_pack
 from ev_overlay.healing_parser import run_healing_diagnostics
-from ev_overlay.simulator import simulate_ev_drive
+from ev_overlay.simulator import generate_output_filename, simulate_ev_drive
 from analyzer import evaluate_efficiency
+from ev_overlay import instrumentation
+from ev_overlay.catalog import DIAGNOSTICS, HEALING_INPUT, latest_artifact, register_artifact
+
+def run_overlay(healing_data, metadata_path="metadata.json", output_file=None):
+    """
+    Runs factory initialization, drive simulation and efficiency analysis on
+    already-loaded healing data. Used in-process by the pipeline orchestrator.
+
+    Returns:
+        dict: manifest, simulation output and efficiency analysis.
+    """
+    manifest = initialize_factory_pack("default_pack", metadata_path)
+    simulation_output = simulate_ev_drive(healing_data, output_prefix="run_overlay", output_file=output_file)
+    return {
+        "manifest": manifest,
+        "simulation": simulation_output,
+        "analysis": evaluate_efficiency(simulation_output)
+    }
 
 def main():
-    print("🚗 Starting AXVIAM EV Battery Overlay...")
+    import argparse
+    import time
 
-    # Step 1: Initialize factory settings
-    manifest = initialize_factory_pack("default_pack", "metadata.json")
-    print("✅ Factory initialized:", manifest)
+    parser = argparse.ArgumentParser(description="AXVIAM EV battery overlay")
+    parser.add_argument("--instrument", action="store_true", help="Record per-stage timing and memory metrics")
+    args, _ = parser.parse_known_args()
+    if args.instrument:
+        instrumentation.enable()
 
-    # Look for the most recent converted healing input
-    healing_input_files = sorted(
-        glob.glob(os.path.join("reports", "converted_healing_input_*.json")),
-        key=os.path.getmtime,
-        reverse=True
-    )
+    print("🚗 Starting AXVIAM EV Battery Overlay...")
+
+    # Look up the most recent converted healing input in the run catalog
+    latest_file = latest_artifact("convert", HEALING_INPUT)
 
-    if healing_input_files:
-        latest_file = healing_input_files[0]
+    if latest_file:
         print(f"📥 Using real-world input from: {latest_file}")
         with open(latest_file, "r") as f:
             healing_data = json.load(f)
@@ -33,13 +49,14 @@ def main():
         healing_data = run_healing_diagnostics()
         print(f"🩺 Healing diagnostics result: {healing_data}")
 
-    # Step 3: Simulate EV drive performance
-    simulation_output = simulate_ev_drive(healing_data, output_prefix="run_overlay")
+    # Steps 1, 3 and 4: factory init, EV drive simulation and evaluation
+    output_file = generate_output_filename("run_overlay")
+    result = run_overlay(healing_data, output_file=output_file)
+    register_artifact(output_file, kind=DIAGNOSTICS, parents=[latest_file] if latest_file else ())
+    print("✅ Factory initialized:", result["manifest"])
     print("🔋 Drive simulation complete.")
-
-    # Step 4: Evaluate results
-    analysis_result = evaluate_efficiency(simulation_output)
-    print("📊 Efficiency analysis:", analysis_result)
+    print("📊 Efficiency analysis:", result["analysis"])
+    instrumentation.export_run_metrics("run_overlay", time.strftime("%Y%m%d-%H%M%S"))
 
 if __name__ == "__main__":
     main()
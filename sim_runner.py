@@ -1,6 +1,8 @@
 import json
-from ev_overlay.simulator import simulate_ev_drive
+from ev_overlay.simulator import generate_output_filename, simulate_ev_drive
 from ev_overlay.analyzer import evaluate_efficiency
+from ev_overlay import instrumentation
+from ev_overlay.catalog import BMS_LOG, DIAGNOSTICS, register_artifact
 
 def load_simulation_log(path):
     with open(path, 'r') as f:
@@ -16,21 +18,54 @@ def convert_log_to_healing(log_data):
         for idx, entry in enumerate(log_data)
     ]
 
+def run_sim(log_data, output_file=None):
+    """
+    Converts a loaded BMS log, simulates the healed pack and evaluates it.
+
+    Returns:
+        dict: healing data, simulation output and efficiency analysis.
+    """
+    with instrumentation.stage("conversion", items=len(log_data)):
+        healing_data = convert_log_to_healing(log_data)
+    # simulate_ev_drive updates pack dicts in place; keep the converted values intact
+    packs = [dict(cell) for cell in healing_data]
+    simulation_result = simulate_ev_drive(packs, output_prefix="sim_runner_real", output_file=output_file)
+    return {
+        "healing_data": healing_data,
+        "simulation": simulation_result,
+        "analysis": evaluate_efficiency(simulation_result)
+    }
+
 def main():
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="AXVIAM EV simulation runner")
+    parser.add_argument("--instrument", action="store_true", help="Record per-stage timing and memory metrics")
+    args, _ = parser.parse_known_args()
+    if args.instrument:
+        instrumentation.enable()
+
     print("🧪 Running AXVIAM EV Simulation Runner...")
-    log_data = load_simulation_log("real_input/sample_bms_log.json")
-    healing_data = convert_log_to_healing(log_data)
+    log_path = "real_input/sample_bms_log.json"
+    with instrumentation.stage("parsing") as parsing:
+        log_data = load_simulation_log(log_path)
+        parsing.add_items(len(log_data))
+    output_file = generate_output_filename("sim_runner_real")
+    result = run_sim(log_data, output_file)
+    register_artifact(log_path, "input", BMS_LOG)
+    register_artifact(output_file, kind=DIAGNOSTICS, parents=[log_path])
 
     print("🔧 Converted healing diagnostics:")
-    for cell in healing_data:
+    for cell in result["healing_data"]:
         print(cell)
 
     print("\n🚦 Simulating EV drive with healed pack...")
-    simulation_result = simulate_ev_drive(healing_data, output_prefix="sim_runner_real")
-    print(f"\n🔋 Simulation output:\n{simulation_result}")
+    print(f"\n🔋 Simulation output:\n{result['simulation']}")
 
     print("\n📊 Efficiency analysis:")
-    print(evaluate_efficiency(simulation_result))
+    print(result["analysis"])
+    instrumentation.export_run_metrics("sim_runner", time.strftime("%Y%m%d-%H%M%S"))
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
@@ -0,0 +1,30 @@
+import numpy as np
+import pytest
+
+from engine.breath_core import BatchBreathCore, BreathCore
+
+
+@pytest.mark.parametrize("cycles", [1, 7, 250])
+def test_fast_forward_matches_stepping(cycles):
+    stepped, jumped = BreathCore(1.3), BreathCore(1.3)
+    for _ in range(cycles):
+        expected = stepped.cycle(0.2, 0.7)
+
+    assert jumped.fast_forward(cycles, 0.2, 0.7) == pytest.approx(expected)
+    assert jumped.phase == stepped.phase
+    assert jumped.tension == pytest.approx(stepped.tension)
+    assert jumped.curvature == pytest.approx(stepped.curvature)
+
+
+def test_batch_fast_forward_matches_stepping_per_pack():
+    cycles = np.array([0, 1, 5, 40])
+    delta = np.array([0.1, 0.05, 0.3, 0.2])
+    batch = BatchBreathCore(len(cycles))
+    batch.fast_forward(cycles, delta, 1.5)
+
+    for i, core in enumerate(BreathCore() for _ in cycles):
+        for _ in range(cycles[i]):
+            core.cycle(delta[i], 1.5)
+        assert batch.pressure[i] == pytest.approx(core.pressure)
+        assert batch.tension[i] == pytest.approx(core.tension)
+        assert batch.curvature[i] == pytest.approx(core.curvature)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+
+from ev_overlay import fleet_store
+from ev_overlay.fleet import FleetState
+from ev_overlay.fleet_store import STATE_COLUMNS, FleetStore, run_out_of_core
+from ev_overlay.simulator import simulate_ev_out_of_core
+
+
+def _fleet(size=100):
+    return FleetState(70 + np.arange(size) % 6)
+
+
+def test_resumed_run_matches_uninterrupted(tmp_path, monkeypatch):
+    whole = FleetStore.from_fleet(str(tmp_path / "whole"), _fleet(), chunk_size=16)
+    expected = run_out_of_core(whole, 3, seed=5, checkpoint_every=2)
+
+    resumed = FleetStore.from_fleet(str(tmp_path / "resumed"), _fleet(), chunk_size=16)
+    calls = []
+    simulate_fleet_cycle = fleet_store.simulate_fleet_cycle
+
+    def crash_mid_cycle(*args, **kwargs):
+        # Cycle 2, chunk 4 of 7: after a checkpoint, before the cycle completes
+        calls.append(1)
+        if len(calls) == 4:
+            raise KeyboardInterrupt
+        return simulate_fleet_cycle(*args, **kwargs)
+
+    monkeypatch.setattr(fleet_store, "simulate_fleet_cycle", crash_mid_cycle)
+    with pytest.raises(KeyboardInterrupt):
+        run_out_of_core(resumed, 3, seed=5, checkpoint_every=2)
+    monkeypatch.undo()
+    assert resumed.load_checkpoint()["next_chunk"] == 2
+
+    assert run_out_of_core(FleetStore(resumed.directory), 3, checkpoint_every=2) == expected
+    final, reference = resumed.to_fleet(), whole.to_fleet()
+    for name in STATE_COLUMNS:
+        np.testing.assert_array_equal(getattr(final, name), getattr(reference, name))
+
+
+def test_resume_rejects_packs_of_another_size(tmp_path):
+    FleetStore.create(str(tmp_path / "store"), 10, chunk_size=4)
+    with pytest.raises(ValueError, match="10 packs"):
+        simulate_ev_out_of_core(str(tmp_path / "store"), 1, packs=[{} for _ in range(3)])
@@ -0,0 +1,34 @@
+import numpy as np
+import pytest
+
+from ev_overlay.fleet import FleetState
+from ev_overlay.parallel import simulate_fleet_parallel
+from ev_overlay.simulator import simulate_ev_drive
+
+
+def _fleet(size=300):
+    return FleetState(70 + np.arange(size) % 11, np.arange(size) % 5 * 0.1)
+
+
+@pytest.mark.parametrize("workers", [2, 4])
+def test_seeded_blocks_identical_across_worker_counts(workers):
+    inline, pooled = _fleet(), _fleet()
+    expected = simulate_fleet_parallel(inline, 100, seed=42, workers=1, block_size=64)
+    columns = simulate_fleet_parallel(pooled, 100, seed=42, workers=workers, block_size=64)
+
+    for name, values in expected.items():
+        np.testing.assert_array_equal(columns[name], values)
+    for name in ("capacity_kWh", "cycles", "restored_psi", "restored_tension"):
+        np.testing.assert_array_equal(getattr(pooled, name), getattr(inline, name))
+
+
+def test_seeded_simulate_ev_drive_same_on_every_path(tmp_path):
+    runs = []
+    for i, options in enumerate([{}, {"vectorized": True}, {"workers": 2}]):
+        packs = [{"capacity_kWh": 70 + j % 7, "cycles": j % 3} for j in range(50)]
+        results = simulate_ev_drive(packs, seed=7, output_file=str(tmp_path / f"run{i}.csv"), **options)
+        runs.append((results, packs))
+
+    for results, packs in runs[1:]:
+        assert results == runs[0][0]
+        assert packs == runs[0][1]
@@ -0,0 +1,28 @@
+import numpy as np
+
+from ev_overlay.fleet import FleetState, simulate_fleet
+from ev_overlay.sweep import run_sweep, summarize_point
+
+
+def _fleet():
+    return FleetState(70 + np.arange(200) % 9, np.arange(200) % 4 * 0.25)
+
+
+def test_default_point_matches_simulate_fleet(tmp_path):
+    expected = simulate_fleet(_fleet(), 100, np.random.default_rng(11))
+
+    for _ in range(2):  # computed, then read back from the cache
+        row = run_sweep(_fleet(), seed=11, cache_dir=str(tmp_path), keep_columns=True)[0]
+        for name, values in expected.items():
+            np.testing.assert_array_equal(row["columns"][name], values)
+        assert {name: row[name] for name in summarize_point(expected)} == summarize_point(expected)
+    assert row["cached"]
+
+
+def test_cached_summaries_match_computed(tmp_path):
+    grid = ((0.2, 0.25), (0.004, 0.006), (50, 100))
+    computed = run_sweep(_fleet(), *grid, seed=3, cache_dir=str(tmp_path))
+    cached = run_sweep(_fleet(), *grid, seed=3, cache_dir=str(tmp_path))
+
+    assert all(row["cached"] for row in cached)
+    assert [dict(row, cached=None) for row in cached] == [dict(row, cached=None) for row in computed]